@@ -0,0 +1,24 @@
+"""
+Carga los módulos puros de ``l10n_ar_afip_iva_tur`` (afip_utils, f8089) sin Odoo.
+
+El ``__init__`` del addon importa los modelos, que necesitan Odoo; acá se registra el paquete
+apuntando a su carpeta sin ejecutar ese ``__init__``, de modo que los imports relativos
+entre los módulos puros sigan funcionando.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+ADDON_NAME = "l10n_ar_afip_iva_tur"
+ADDON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ADDON_NAME)
+
+
+def load(module_name):
+    """ Importa ``l10n_ar_afip_iva_tur.<module_name>`` sin cargar el addon completo. """
+    if ADDON_NAME not in sys.modules:
+        package = types.ModuleType(ADDON_NAME)
+        package.__path__ = [ADDON_PATH]
+        sys.modules[ADDON_NAME] = package
+    return importlib.import_module("%s.%s" % (ADDON_NAME, module_name))
@@ -0,0 +1,88 @@
+"""
+Memoria por comprobante de los objetos de ``afip_utils`` (con ``__slots__``) frente a clases comunes con ``__dict__``.
+
+Parsea ``--count`` comprobantes (request + response) y mide con tracemalloc la memoria de mantenerlos
+vivos, copiados en las clases actuales y en clases equivalentes sin ``__slots__`` (mismo ``__init__``,
+atributos en un ``__dict__`` por instancia), como eran antes.
+
+Uso:
+    python benchmarks/bench_memory.py [--count 10000] [--items 3] [--subtotals 1] [--asociados 0]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+import _addon
+import envelopes
+
+afip_utils = _addon.load("afip_utils")
+
+SLOTTED_CLASSES = [
+    afip_utils.Item, afip_utils.SubtotalIVA, afip_utils.ComprobanteAsociado,
+    afip_utils.ComprobanteRequest, afip_utils.ComprobanteResponse,
+]
+# Clase con __slots__ -> clase equivalente con __dict__
+DICT_CLASSES = {cls: type(cls.__name__, (), {"__init__": cls.__init__}) for cls in SLOTTED_CLASSES}
+SAME_CLASSES = {cls: cls for cls in SLOTTED_CLASSES}
+
+
+def copy_as(value, classes):
+    """ Copia ``value`` (y sus listas de items, subtotales y asociados) con las clases de ``classes``.
+    Las copias comparten los textos y enteros del original, así se mide solo lo que ocupan los objetos. """
+    if isinstance(value, list):
+        return [copy_as(item, classes) for item in value]
+    klass = classes.get(type(value))
+    if klass is None:
+        return value
+    copy = klass.__new__(klass)
+    for name in type(value).__slots__:
+        setattr(copy, name, copy_as(getattr(value, name), classes))
+    return copy
+
+
+def measure(build):
+    """ Memoria (bytes) que queda asignada por lo que devuelve ``build()``. """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--subtotals", type=int, default=1)
+    parser.add_argument("--asociados", type=int, default=0)
+    args = parser.parse_args()
+
+    batch = envelopes.make_batch(args.count, args.items, args.subtotals, args.asociados)
+    parsed = [
+        (afip_utils.parse_autorizar_comprobante(xml_request).comprobante, afip_utils.parse_afip_response(xml_response))
+        for xml_request, xml_response in batch
+    ]
+    del batch
+    results = {}
+    for name, classes in (("__slots__", SAME_CLASSES), ("__dict__", DICT_CLASSES)):
+        results[name] = measure(lambda: [
+            (copy_as(comprobante, classes), copy_as(response, classes)) for comprobante, response in parsed
+        ]) / args.count
+
+    print("%s comprobantes, %s items, %s subtotales, %s asociados" % (args.count, args.items, args.subtotals, args.asociados))
+    for name, per_invoice in results.items():
+        print("con %-9s %7.0f bytes por comprobante" % (name, per_invoice))
+    saved = results["__dict__"] - results["__slots__"]
+    print("ahorro:       %7.0f bytes por comprobante (%.0f%%, sin contar textos ni importes)" % (
+        saved, 100.0 * saved / results["__dict__"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de los backends de parseo de ``afip_utils`` (stdlib vs lxml).
+
+Uso:
+    python benchmarks/bench_parser.py [--count 2000] [--items 3] [--subtotals 1] [--asociados 0]
+
+Verifica primero que ambos backends devuelvan los mismos objetos y luego informa
+parseos por segundo de ``parse_autorizar_comprobante`` y ``parse_afip_response``.
+"""
+
+import argparse
+import time
+
+import _addon
+import envelopes
+
+afip_utils = _addon.load("afip_utils")
+
+
+def as_dict(value):
+    """ Convierte los objetos de afip_utils en dicts/listas para poder compararlos. """
+    if isinstance(value, list):
+        return [as_dict(item) for item in value]
+    if hasattr(value, "__dict__") or hasattr(value, "__slots__"):
+        names = getattr(value, "__slots__", None) or vars(value)
+        return {name: as_dict(getattr(value, name)) for name in names}
+    return value
+
+
+def backends():
+    res = {"etree": (afip_utils._parse_autorizar_comprobante_etree, afip_utils._parse_afip_response_etree)}
+    if afip_utils.lxml_etree is not None:
+        res["lxml"] = (afip_utils._parse_autorizar_comprobante_lxml, afip_utils._parse_afip_response_lxml)
+    return res
+
+
+def check_equivalence(batch, available):
+    reference_request, reference_response = available["etree"]
+    for name, (parse_request, parse_response) in available.items():
+        for xml_request, xml_response in batch:
+            if as_dict(parse_request(xml_request)) != as_dict(reference_request(xml_request)):
+                raise AssertionError("El backend %s devuelve un request distinto" % name)
+            if as_dict(parse_response(xml_response)) != as_dict(reference_response(xml_response)):
+                raise AssertionError("El backend %s devuelve un response distinto" % name)
+
+
+def measure(func, payloads, repeat=3):
+    """ Devuelve los parseos por segundo (mejor de ``repeat`` corridas). """
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            func(payload)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(payloads) / best if best else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--subtotals", type=int, default=1)
+    parser.add_argument("--asociados", type=int, default=0)
+    args = parser.parse_args()
+
+    batch = envelopes.make_batch(args.count, args.items, args.subtotals, args.asociados)
+    available = backends()
+    check_equivalence(batch[:100], available)
+
+    requests = [xml_request for xml_request, _xml_response in batch]
+    responses = [xml_response for _xml_request, xml_response in batch]
+    print("%-8s %18s %18s" % ("backend", "requests/s", "responses/s"))
+    for name, (parse_request, parse_response) in available.items():
+        print("%-8s %18.0f %18.0f" % (name, measure(parse_request, requests), measure(parse_response, responses)))
+    if "lxml" not in available:
+        print("lxml no está instalado: solo se midió el backend de la stdlib")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Servidor SOAP local que imita CTService (WSCT) para pruebas de carga, sin pasar por AFIP.
+
+Responde ``autorizarComprobante``, ``consultarUltimoComprobanteAutorizado``, ``consultarPuntosVenta``,
+``consultarTiposComprobante`` y ``dummy``. Lleva el último número autorizado por CUIT, tipo de
+comprobante y punto de venta: autoriza solo el número siguiente (con un CAE correlativo) y rechaza
+los demás con el error de numeración, como AFIP. Permite agregar latencia y errores:
+
+* ``--latency-ms`` / ``--jitter-ms``: demora de cada respuesta (media y desvío uniforme)
+* ``--error-rate``: fracción de autorizaciones rechazadas con ``arrayErrores``
+* ``--fault-rate``: fracción de pedidos que responden un SOAP Fault (HTTP 500)
+
+Con ``--wsdl`` sirve en ``GET /wsct/CTService?wsdl`` una copia del WSDL real (por ejemplo la que
+guarda l10n_ar_afipws_wsct en ``<data_dir>/l10n_ar_afipws_wsct/wsdl/``) con la dirección del
+servicio reescrita a este servidor, para usarlo con pyafipws o con Odoo (parámetro del sistema
+``l10n_ar_afipws_wsct.wsct_url_override``, que solo se usa con la compañía en homologación). El servidor
+no valida token ni firma.
+
+Uso:
+    python benchmarks/ctservice_stub.py --port 8089 --latency-ms 150 --error-rate 0.01 --wsdl CTService.wsdl
+"""
+
+import argparse
+import itertools
+import random
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import _addon
+
+afip_utils = _addon.load("afip_utils")
+
+SERVICE_PATH = "/wsct/CTService"
+CT_NS = "http://ar.gob.afip.wsct/CTService/"
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+    '<{operation}Response xmlns="' + CT_NS + '"><{operation}Return>{body}</{operation}Return></{operation}Response>'
+    '</soap:Body></soap:Envelope>'
+)
+
+FAULT = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+    '<soap:Fault><faultcode>soap:Server</faultcode><faultstring>{message}</faultstring></soap:Fault>'
+    '</soap:Body></soap:Envelope>'
+)
+
+ERRORS = '<arrayErrores xmlns="">{}</arrayErrores>'
+ERROR = '<codigoDescripcion><codigo>{code}</codigo><descripcion>{description}</descripcion></codigoDescripcion>'
+
+# Error de AFIP cuando el número no es el siguiente al último autorizado
+NUMBERING_ERROR = (1103, "El numero de comprobante informado debe ser el siguiente al ultimo autorizado")
+INJECTED_ERROR = (1600, "Error simulado por el servidor de pruebas")
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def find_text(root, name):
+    """ Texto del primer elemento ``name`` (sin importar el namespace). """
+    for element in root.iter():
+        if local_name(element.tag) == name:
+            return (element.text or "").strip()
+    return ""
+
+
+class CTServiceState:
+    """ Últimos números autorizados y contador de CAE, compartidos entre los hilos del servidor. """
+
+    def __init__(self, initial_number=0):
+        self.lock = threading.Lock()
+        self.initial_number = initial_number
+        self.last_numbers = {}
+        self.cae_counter = itertools.count(70000000000001)
+        self.stats = {"autorizados": 0, "rechazados": 0, "faults": 0, "consultas": 0}
+
+    def last_number(self, cuit, doc_type, pos):
+        with self.lock:
+            return self.last_numbers.get((cuit, doc_type, pos), self.initial_number)
+
+    def authorize(self, cuit, doc_type, pos, number):
+        """ Devuelve el CAE si ``number`` es el siguiente al último autorizado, si no ``None``. """
+        key = (cuit, doc_type, pos)
+        with self.lock:
+            if number != self.last_numbers.get(key, self.initial_number) + 1:
+                self.stats["rechazados"] += 1
+                return None
+            self.last_numbers[key] = number
+            self.stats["autorizados"] += 1
+            return "%014d" % next(self.cae_counter)
+
+
+class CTServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, como el cliente de pyafipws
+    disable_nagle_algorithm = True # cabecera y cuerpo van en escrituras separadas
+
+    server_version = "CTServiceStub/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="text/xml; charset=utf-8"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _delay(self):
+        options = self.server.options
+        delay = options.latency_ms + random.uniform(-options.jitter_ms, options.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def do_GET(self):
+        if not self.path.lower().startswith(SERVICE_PATH.lower() + "?wsdl"):
+            return self._send(404, "No encontrado", "text/plain; charset=utf-8")
+        if self.server.wsdl is None:
+            return self._send(404, "El servidor se inició sin --wsdl", "text/plain; charset=utf-8")
+        return self._send(200, self.server.wsdl)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._delay()
+        options = self.server.options
+        state = self.server.state
+        if options.fault_rate and random.random() < options.fault_rate:
+            with state.lock:
+                state.stats["faults"] += 1
+            return self._send(500, FAULT.format(message="Falla simulada por el servidor de pruebas"))
+        try:
+            root = ET.fromstring(body)
+            soap_body = next(element for element in root if local_name(element.tag) == "Body")
+            request = next(iter(soap_body))
+        except (ET.ParseError, StopIteration):
+            return self._send(500, FAULT.format(message="Pedido SOAP inválido"))
+
+        operation = local_name(request.tag)
+        if operation.endswith("Request"):
+            operation = operation[:-len("Request")]
+        handler = getattr(self, "_op_" + operation, None)
+        if handler is None:
+            return self._send(500, FAULT.format(message="Operación no soportada: %s" % operation))
+        return self._send(200, ENVELOPE.format(operation=operation, body=handler(body, request)))
+
+    def _op_dummy(self, body, request):
+        return "<appserver>OK</appserver><authserver>OK</authserver><dbserver>OK</dbserver>"
+
+    def _op_consultarUltimoComprobanteAutorizado(self, body, request):
+        state = self.server.state
+        with state.lock:
+            state.stats["consultas"] += 1
+        number = state.last_number(
+            find_text(request, "cuitRepresentada"),
+            find_text(request, "codigoTipoComprobante"),
+            int(find_text(request, "numeroPuntoVenta") or 0),
+        )
+        return '<numeroComprobante xmlns="">%s</numeroComprobante>' % number
+
+    def _op_consultarPuntosVenta(self, body, request):
+        points = "".join(
+            "<puntoVenta><numeroPuntoVenta>%s</numeroPuntoVenta><bloqueado>N</bloqueado></puntoVenta>" % pos
+            for pos in range(1, self.server.options.points_of_sale + 1)
+        )
+        return '<arrayPuntosVenta xmlns="">%s</arrayPuntosVenta>' % points
+
+    def _op_consultarTiposComprobante(self, body, request):
+        types = "".join(
+            "<codigoDescripcion><codigo>%s</codigo><descripcion>%s</descripcion></codigoDescripcion>" % code
+            for code in (("195", "Factura T"), ("196", "Nota de Débito T"), ("197", "Nota de Crédito T"))
+        )
+        return '<arrayTiposComprobante xmlns="">%s</arrayTiposComprobante>' % types
+
+    def _op_autorizarComprobante(self, body, request):
+        parsed = afip_utils.parse_autorizar_comprobante(body.decode("utf-8"))
+        comprobante = parsed.comprobante
+        cuit = parsed.auth.cuitRepresentada
+        pos = int(comprobante.numeroPuntoVenta or 0)
+        number = int(comprobante.numeroComprobante or 0)
+        options = self.server.options
+        state = self.server.state
+
+        if options.error_rate and random.random() < options.error_rate:
+            cae, error = None, INJECTED_ERROR
+            with state.lock:
+                state.stats["rechazados"] += 1
+        else:
+            cae = state.authorize(cuit, comprobante.codigoTipoComprobante, pos, number)
+            error = None if cae else NUMBERING_ERROR
+
+        header = (
+            '<comprobanteResponse xmlns=""><cuit>{cuit}</cuit><codigoTipoComprobante>{doc_type}</codigoTipoComprobante>'
+            '<numeroPuntoVenta>{pos}</numeroPuntoVenta><numeroComprobante>{number}</numeroComprobante>'
+            '<fechaEmision>{date}</fechaEmision>'
+        ).format(cuit=cuit, doc_type=comprobante.codigoTipoComprobante, pos=pos, number=number, date=comprobante.fechaEmision)
+        if cae:
+            due = time.strftime("%Y-%m-%d", time.localtime(time.time() + 10 * 86400))
+            return header + '<CAE>%s</CAE><fechaVencimientoCAE>%s</fechaVencimientoCAE></comprobanteResponse><resultado xmlns="">A</resultado>' % (cae, due)
+        return header + '</comprobanteResponse><resultado xmlns="">R</resultado>' + ERRORS.format(
+            ERROR.format(code=error[0], description=error[1]))
+
+
+def load_wsdl(path, address):
+    """ Lee el WSDL y reemplaza la dirección del servicio (``soap:address location``) por ``address``. """
+    with open(path, encoding="utf-8") as wsdl_file:
+        wsdl = wsdl_file.read()
+    return re.sub(r'(<(?:\w+:)?address\s+location=")[^"]*(")', r"\g<1>%s\g<2>" % address, wsdl)
+
+
+def make_server(options):
+    server = ThreadingHTTPServer((options.host, options.port), CTServiceHandler)
+    server.daemon_threads = True
+    server.options = options
+    server.state = CTServiceState(options.initial_number)
+    address = "http://%s:%s%s" % (options.host, server.server_address[1], SERVICE_PATH)
+    server.wsdl = load_wsdl(options.wsdl, address) if options.wsdl else None
+    server.url = address
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 elige un puerto libre")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--initial-number", type=int, default=0, help="último número autorizado al iniciar")
+    parser.add_argument("--points-of-sale", type=int, default=4, help="puntos de venta que informa consultarPuntosVenta")
+    parser.add_argument("--wsdl", help="WSDL de CTService a servir con la dirección reescrita")
+    parser.add_argument("--verbose", action="store_true", help="loguear cada pedido")
+    return parser
+
+
+def main():
+    options = build_parser().parse_args()
+    server = make_server(options)
+    print("CTService de prueba en %s" % server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Estadísticas: %s" % server.state.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Generador de sobres SOAP sintéticos de CTService (autorizarComprobante) para los benchmarks.
+"""
+
+import random
+
+REQUEST_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:ser="http://ar.gob.afip.wsct/CTService/">'
+    '<soap:Header/><soap:Body><ser:autorizarComprobanteRequest>'
+    '<authRequest><token>{token}</token><sign>{sign}</sign><cuitRepresentada>{cuit}</cuitRepresentada></authRequest>'
+    '<comprobanteRequest>'
+    '<codigoTipoComprobante>195</codigoTipoComprobante>'
+    '<numeroPuntoVenta>{pos}</numeroPuntoVenta>'
+    '<numeroComprobante>{number}</numeroComprobante>'
+    '<fechaEmision>2025-06-{day:02d}</fechaEmision>'
+    '<codigoTipoAutorizacion>E</codigoTipoAutorizacion>'
+    '<codigoTipoDocumento>91</codigoTipoDocumento>'
+    '<numeroDocumento>{document}</numeroDocumento>'
+    '<idImpositivo>9</idImpositivo>'
+    '<codigoPais>{country}</codigoPais>'
+    '<domicilioReceptor>Calle Falsa {number}</domicilioReceptor>'
+    '<codigoRelacionEmisorReceptor>1</codigoRelacionEmisorReceptor>'
+    '<importeGravado>{gravado}</importeGravado>'
+    '<importeNoGravado>0.00</importeNoGravado>'
+    '<importeExento>0.00</importeExento>'
+    '<importeReintegro>-{iva}</importeReintegro>'
+    '<importeTotal>{total}</importeTotal>'
+    '<codigoMoneda>PES</codigoMoneda>'
+    '<cotizacionMoneda>1.000000</cotizacionMoneda>'
+    '<observaciones></observaciones>'
+    '<arrayItems>{items}</arrayItems>'
+    '<arraySubtotalesIVA>{subtotales}</arraySubtotalesIVA>'
+    '{asociados}'
+    '</comprobanteRequest>'
+    '</ser:autorizarComprobanteRequest></soap:Body></soap:Envelope>'
+)
+
+ITEM_TEMPLATE = (
+    '<item><tipo>0</tipo><codigoTurismo>{cod_tur}</codigoTurismo><codigo>HAB-{index}</codigo>'
+    '<descripcion>Noche de alojamiento {index}</descripcion><codigoAlicuotaIVA>5</codigoAlicuotaIVA>'
+    '<importeIVA>{iva}</importeIVA><importeItem>{importe}</importeItem></item>'
+)
+
+SUBTOTAL_TEMPLATE = '<subtotalIVA><codigo>{codigo}</codigo><importe>{importe}</importe></subtotalIVA>'
+
+ASOCIADO_TEMPLATE = (
+    '<comprobanteAsociado><codigoTipoComprobante>195</codigoTipoComprobante>'
+    '<numeroPuntoVenta>{pos}</numeroPuntoVenta><numeroComprobante>{number}</numeroComprobante></comprobanteAsociado>'
+)
+
+RESPONSE_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+    '<autorizarComprobanteResponse xmlns="http://ar.gob.afip.wsct/CTService/"><autorizarComprobanteReturn>'
+    '<comprobanteResponse xmlns=""><cuit>{cuit}</cuit><codigoTipoComprobante>195</codigoTipoComprobante>'
+    '<numeroPuntoVenta>{pos}</numeroPuntoVenta><numeroComprobante>{number}</numeroComprobante>'
+    '<fechaEmision>2025-06-{day:02d}</fechaEmision><CAE>{cae}</CAE>'
+    '<fechaVencimientoCAE>2025-06-{due:02d}</fechaVencimientoCAE></comprobanteResponse>'
+    '<resultado xmlns="">A</resultado>'
+    '</autorizarComprobanteReturn></autorizarComprobanteResponse></soap:Body></soap:Envelope>'
+)
+
+
+def cents(value):
+    """ Formatea un importe en centavos como lo envía pyafipws (dos decimales). """
+    return "%d.%02d" % divmod(value, 100)
+
+
+def make_envelopes(number, items=3, subtotals=1, asociados=0, pos=1, cuit="20111111112", seed=None):
+    """ Devuelve (xml_request, xml_response) del comprobante ``number`` con la cantidad de items,
+    subtotales de IVA y comprobantes asociados indicada. """
+    rnd = random.Random(number if seed is None else seed)
+    item_amounts = [rnd.randint(10000, 500000) for _i in range(items)]
+    item_ivas = [amount * 21 // 121 for amount in item_amounts]
+    total = sum(item_amounts)
+    iva = sum(item_ivas)
+    day = number % 28 + 1
+
+    items_xml = "".join(
+        ITEM_TEMPLATE.format(index=index, cod_tur=rnd.choice("125"), iva=cents(item_iva), importe=cents(amount))
+        for index, (amount, item_iva) in enumerate(zip(item_amounts, item_ivas))
+    )
+    subtotal_amounts = [iva // subtotals] * subtotals if subtotals else []
+    if subtotal_amounts:
+        subtotal_amounts[0] += iva - sum(subtotal_amounts)
+    subtotales_xml = "".join(
+        SUBTOTAL_TEMPLATE.format(codigo=("5", "4")[index % 2], importe=cents(amount))
+        for index, amount in enumerate(subtotal_amounts)
+    )
+    asociados_xml = ""
+    if asociados:
+        asociados_xml = "<arrayComprobantesAsociados>%s</arrayComprobantesAsociados>" % "".join(
+            ASOCIADO_TEMPLATE.format(pos=pos, number=max(number - index - 1, 1)) for index in range(asociados)
+        )
+
+    request = REQUEST_TEMPLATE.format(
+        token="T" * 64, sign="S" * 64, cuit=cuit, pos=pos, number=number, day=day,
+        document="AB%08d" % number, country=rnd.choice(("203", "212", "221")),
+        gravado=cents(total - iva), iva=cents(iva), total=cents(total),
+        items=items_xml, subtotales=subtotales_xml, asociados=asociados_xml,
+    )
+    response = RESPONSE_TEMPLATE.format(
+        cuit=cuit, pos=pos, number=number, day=day, due=min(day + 10, 28), cae="7%013d" % number,
+    )
+    return request, response
+
+
+def make_batch(count, items=3, subtotals=1, asociados=0):
+    """ Devuelve una lista de ``count`` pares (xml_request, xml_response). """
+    return [make_envelopes(number, items, subtotals, asociados) for number in range(1, count + 1)]
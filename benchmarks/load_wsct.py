@@ -0,0 +1,242 @@
+"""
+Prueba de carga de la autorización WSCT contra el CTService de prueba (``ctservice_stub.py``).
+
+Autoriza ``--invoices`` comprobantes T repartidos en ``--points-of-sale`` puntos de venta, un hilo
+por punto de venta (los números de un punto de venta son correlativos, igual que en Odoo). Cada hilo
+consulta primero el último número autorizado (``consultarUltimoComprobanteAutorizado``) y ante un
+rechazo por numeración vuelve a consultarlo. Informa autorizaciones por segundo y percentiles de
+latencia de la autorización y de la consulta.
+
+Clientes:
+
+* ``raw``: envía los sobres de ``envelopes.py`` por HTTP con keep-alive (solo mide el servidor y la red)
+* ``pyafipws``: usa ``pyafipws.wsct.WSCT`` como ``wsct_pyafipws_create_invoice`` y
+  ``wsct_request_autorization`` (``CrearFactura``, ``AgregarItem``, ``AgregarIva``, ``CAESolicitar``);
+  necesita pyafipws y que el servidor sirva el WSDL (``--wsdl``)
+
+Sin ``--url`` levanta el servidor de prueba en este mismo proceso con las opciones de latencia y errores.
+
+Uso:
+    python benchmarks/load_wsct.py --invoices 2000 --points-of-sale 4 --latency-ms 100 --error-rate 0.01
+    python benchmarks/load_wsct.py --url http://127.0.0.1:8089/wsct/CTService --client pyafipws
+"""
+
+import argparse
+import http.client
+import re
+import threading
+import time
+import urllib.parse
+
+import _addon
+import ctservice_stub
+import envelopes
+
+afip_utils = _addon.load("afip_utils")
+
+CUIT = "20111111112"
+DOC_TYPE = "195"
+
+LAST_NUMBER_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:ser="http://ar.gob.afip.wsct/CTService/">'
+    '<soap:Header/><soap:Body><ser:consultarUltimoComprobanteAutorizadoRequest>'
+    '<authRequest><token>T</token><sign>S</sign><cuitRepresentada>{cuit}</cuitRepresentada></authRequest>'
+    '<consultaUltimoComprobanteAutorizadoRequest><codigoTipoComprobante>{doc_type}</codigoTipoComprobante>'
+    '<numeroPuntoVenta>{pos}</numeroPuntoVenta></consultaUltimoComprobanteAutorizadoRequest>'
+    '</ser:consultarUltimoComprobanteAutorizadoRequest></soap:Body></soap:Envelope>'
+)
+
+NUMBER_RE = re.compile(r"<numeroComprobante[^>]*>(\d+)</numeroComprobante>")
+ERROR_CODE_RE = re.compile(r"<codigo>(\d+)</codigo>")
+
+
+class PosResult:
+    """ Latencias y contadores de un punto de venta. """
+
+    def __init__(self):
+        self.authorize = []
+        self.last_number = []
+        self.authorized = 0
+        self.rejected = 0
+        self.numbering_errors = 0
+        self.faults = 0
+
+
+class RawClient:
+    """ Envía los sobres SOAP directamente, con una conexión HTTP persistente. """
+
+    def __init__(self, url, options):
+        parsed = urllib.parse.urlsplit(url)
+        self.path = parsed.path
+        self.connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+        self.options = options
+
+    def _post(self, body, operation):
+        self.connection.request("POST", self.path, body.encode("utf-8"), {
+            "Content-Type": "text/xml; charset=utf-8",
+            "SOAPAction": '"%s"' % operation,
+        })
+        response = self.connection.getresponse()
+        return response.status, response.read().decode("utf-8")
+
+    def last_number(self, pos):
+        status, body = self._post(LAST_NUMBER_TEMPLATE.format(cuit=CUIT, doc_type=DOC_TYPE, pos=pos), "consultarUltimoComprobanteAutorizado")
+        if status != 200:
+            raise RuntimeError("SOAP Fault consultando el último número")
+        return int(NUMBER_RE.search(body).group(1))
+
+    def authorize(self, pos, number):
+        """ Devuelve ``(cae, código de error)``; ``(None, None)`` para un SOAP Fault. """
+        options = self.options
+        xml_request, _xml_response = envelopes.make_envelopes(
+            number, options.items, options.subtotals, 0, pos=pos, cuit=CUIT)
+        status, body = self._post(xml_request, "autorizarComprobante")
+        if status != 200:
+            return None, None
+        response = afip_utils.parse_afip_response(body)
+        if response.codigo_autorizacion:
+            return response.codigo_autorizacion, None
+        match = ERROR_CODE_RE.search(body)
+        return None, int(match.group(1)) if match else 0
+
+
+class PyafipwsClient:
+    """ Autoriza con ``pyafipws.wsct.WSCT``, como el flujo de l10n_ar_afipws_wsct. """
+
+    def __init__(self, url, options):
+        from pyafipws.wsct import WSCT
+
+        self.ws = WSCT()
+        self.ws.LanzarExcepciones = False
+        self.ws.Conectar(wsdl=url + "?wsdl")
+        self.ws.Cuit = CUIT
+        self.ws.Token = "T"
+        self.ws.Sign = "S"
+        self.options = options
+
+    def last_number(self, pos):
+        return int(self.ws.ConsultarUltimoComprobanteAutorizado(DOC_TYPE, pos) or 0)
+
+    def authorize(self, pos, number):
+        options = self.options
+        ws = self.ws
+        amounts = [envelopes.cents(10000 + 137 * index) for index in range(options.items)]
+        total = sum(10000 + 137 * index for index in range(options.items))
+        iva = total * 21 // 121
+        ws.CrearFactura(
+            91, "AB%08d" % number, DOC_TYPE, pos, number, envelopes.cents(total), "0.00", envelopes.cents(total - iva),
+            envelopes.cents(total), "0.00", "0.00", "-" + envelopes.cents(iva), "2025-06-01", 9, 203,
+            "Calle Falsa %s" % number, 1, "PES", "1.000000", None,
+        )
+        for index, amount in enumerate(amounts):
+            ws.AgregarItem(0, 1, "HAB-%s" % index, "Noche de alojamiento %s" % index, 5, "0.00", amount)
+        ws.AgregarIva(5, envelopes.cents(total - iva), envelopes.cents(iva))
+        ws.CAESolicitar()
+        if ws.CAE:
+            return ws.CAE, None
+        if ws.Excepcion:
+            return None, None
+        match = ERROR_CODE_RE.search(ws.XmlResponse or "")
+        return None, int(match.group(1)) if match else 0
+
+
+def run_pos(client_class, url, options, pos, count, result):
+    client = client_class(url, options)
+    start = time.perf_counter()
+    next_number = client.last_number(pos) + 1
+    result.last_number.append(time.perf_counter() - start)
+    authorized = 0
+    while authorized < count:
+        start = time.perf_counter()
+        cae, error = client.authorize(pos, next_number)
+        result.authorize.append(time.perf_counter() - start)
+        if cae:
+            authorized += 1
+            result.authorized += 1
+            next_number += 1
+        elif error is None:
+            result.faults += 1
+        elif error == ctservice_stub.NUMBERING_ERROR[0]:
+            result.numbering_errors += 1
+            start = time.perf_counter()
+            next_number = client.last_number(pos) + 1
+            result.last_number.append(time.perf_counter() - start)
+        else:
+            # Rechazo de AFIP: en Odoo el comprobante queda sin CAE y no se reintenta
+            result.rejected += 1
+            authorized += 1
+
+
+def percentiles(values, points=(50, 90, 99)):
+    values = sorted(values)
+    if not values:
+        return {}
+    res = {"p%s" % point: values[min(len(values) - 1, int(len(values) * point / 100.0))] for point in points}
+    res["max"] = values[-1]
+    return res
+
+
+def format_latencies(values):
+    return "  ".join("%s %.1f ms" % (name, seconds * 1000) for name, seconds in percentiles(values).items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL del servicio (por ejemplo http://127.0.0.1:8089/wsct/CTService)")
+    parser.add_argument("--client", choices=["raw", "pyafipws"], default="raw")
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--points-of-sale", type=int, default=4)
+    parser.add_argument("--items", type=int, default=3)
+    parser.add_argument("--subtotals", type=int, default=1)
+    # Opciones del servidor embebido (sin --url)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--wsdl", help="WSDL de CTService para el servidor embebido (necesario con --client pyafipws)")
+    options = parser.parse_args()
+
+    server = None
+    url = options.url
+    if not url:
+        server = ctservice_stub.make_server(ctservice_stub.build_parser().parse_args([
+            "--port", "0",
+            "--latency-ms", str(options.latency_ms), "--jitter-ms", str(options.jitter_ms),
+            "--error-rate", str(options.error_rate), "--fault-rate", str(options.fault_rate),
+            "--points-of-sale", str(options.points_of_sale),
+        ] + (["--wsdl", options.wsdl] if options.wsdl else [])))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = server.url
+
+    client_class = PyafipwsClient if options.client == "pyafipws" else RawClient
+    counts = [options.invoices // options.points_of_sale] * options.points_of_sale
+    counts[0] += options.invoices - sum(counts)
+    results = [PosResult() for _pos in counts]
+    threads = [
+        threading.Thread(target=run_pos, args=(client_class, url, options, pos, count, result))
+        for pos, (count, result) in enumerate(zip(counts, results), start=1)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    authorized = sum(result.authorized for result in results)
+    print("%s comprobantes en %s puntos de venta contra %s (cliente %s)" % (
+        options.invoices, options.points_of_sale, url, options.client))
+    print("Tiempo total: %.2f s  autorizaciones/s: %.1f" % (elapsed, authorized / elapsed if elapsed else 0.0))
+    print("Autorizados: %s  rechazados: %s  errores de numeración: %s  SOAP faults: %s" % (
+        authorized, sum(r.rejected for r in results), sum(r.numbering_errors for r in results), sum(r.faults for r in results)))
+    print("autorizarComprobante:                 %s" % format_latencies([v for r in results for v in r.authorize]))
+    print("consultarUltimoComprobanteAutorizado: %s" % format_latencies([v for r in results for v in r.last_number]))
+    if server:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Suite de benchmarks del exportable de IVA Turismo (no necesita Odoo).
+
+Genera sobres CTService sintéticos y mide, por tamaño de reporte y forma de comprobante:
+
+* parse:  ``parse_autorizar_comprobante`` + ``parse_afip_response``
+* format: armado de los registros 02 a 08 (``f8089.render_invoice_block``)
+* encode: codificación UTF-8 y escritura en bloques a un archivo temporal, como el reporte
+
+Informa comprobantes por segundo de cada etapa y el pico de memoria (tracemalloc) del
+circuito completo, y guarda los resultados en JSON para comparar entre versiones.
+
+Uso:
+    python benchmarks/run_suite.py --output results.json
+    python benchmarks/run_suite.py --sizes 1000 --shapes typical --compare results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import _addon
+import envelopes
+
+afip_utils = _addon.load("afip_utils")
+f8089 = _addon.load("f8089")
+
+CUIT = "20111111112"
+CHUNK = 1000
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# Forma de cada comprobante: items, subtotales de IVA y comprobantes asociados
+SHAPES = {
+    "small": {"items": 1, "subtotals": 1, "asociados": 0},
+    "typical": {"items": 3, "subtotals": 1, "asociados": 0},
+    "large": {"items": 20, "subtotals": 2, "asociados": 2},
+}
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def iter_chunks(size, shape):
+    """ Genera los sobres de a ``CHUNK`` comprobantes para no tenerlos todos en memoria. """
+    for start in range(1, size + 1, CHUNK):
+        stop = min(start + CHUNK, size + 1)
+        yield [
+            envelopes.make_envelopes(number, shape["items"], shape["subtotals"], shape["asociados"])
+            for number in range(start, stop)
+        ]
+
+
+def run_pipeline(size, shape):
+    """ Corre parse -> format -> encode sobre ``size`` comprobantes. Devuelve segundos por etapa y bytes escritos. """
+    timings = {"parse": 0.0, "format": 0.0, "encode": 0.0}
+    invoice_date = datetime.date(2025, 6, 1)
+    written = 0
+    with tempfile.TemporaryFile() as stream:
+        pending = []
+        pending_size = 0
+        for chunk in iter_chunks(size, shape):
+            start = time.perf_counter()
+            parsed = [
+                (afip_utils.parse_autorizar_comprobante(xml_request).comprobante, afip_utils.parse_afip_response(xml_response))
+                for xml_request, xml_response in chunk
+            ]
+            timings["parse"] += time.perf_counter() - start
+
+            datas = [
+                f8089.InvoiceExportData(
+                    move_id=index, name="T %05d" % index, invoice_date=invoice_date, partner_name="Turista %s" % index,
+                    amount_total=comprobante.importeTotal, payment_type="1", comprobante=comprobante, response=response,
+                )
+                for index, (comprobante, response) in enumerate(parsed)
+            ]
+            start = time.perf_counter()
+            blocks = [f8089.render_invoice_block(data, CUIT) for data in datas]
+            timings["format"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for block in blocks:
+                pending.append(block)
+                pending_size += len(block)
+                if pending_size >= WRITE_CHUNK_SIZE:
+                    written += stream.write("".join(pending).encode("utf-8"))
+                    pending = []
+                    pending_size = 0
+            timings["encode"] += time.perf_counter() - start
+        if pending:
+            written += stream.write("".join(pending).encode("utf-8"))
+    return timings, written
+
+
+def measure_peak_memory(size, shape):
+    tracemalloc.start()
+    try:
+        run_pipeline(size, shape)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, shape_names, memory=True):
+    results = []
+    for shape_name in shape_names:
+        shape = SHAPES[shape_name]
+        for size in sizes:
+            timings, written = run_pipeline(size, shape)
+            result = {
+                "shape": shape_name,
+                "invoices": size,
+                "bytes": written,
+                "seconds": {stage: round(seconds, 4) for stage, seconds in timings.items()},
+                "invoices_per_second": {
+                    stage: round(size / seconds) if seconds else None for stage, seconds in timings.items()
+                },
+                "peak_memory_bytes": measure_peak_memory(size, shape) if memory else None,
+            }
+            results.append(result)
+            print_result(result)
+    return {
+        "revision": git_revision(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "xml_backend": "lxml" if afip_utils.lxml_etree is not None else "etree",
+        "results": results,
+    }
+
+
+def print_result(result):
+    per_second = result["invoices_per_second"]
+    peak = result["peak_memory_bytes"]
+    print("%-8s %8d  parse %8s/s  format %8s/s  encode %9s/s  pico %s" % (
+        result["shape"], result["invoices"], per_second["parse"], per_second["format"], per_second["encode"],
+        "%.1f MiB" % (peak / 1048576.0) if peak is not None else "-",
+    ))
+
+
+def compare(current, previous):
+    """ Imprime la variación de throughput y memoria respecto de una corrida anterior. """
+    previous_results = {(res["shape"], res["invoices"]): res for res in previous["results"]}
+    print("\nComparación con %s (%s)" % (previous.get("revision"), previous.get("date")))
+    for res in current["results"]:
+        old = previous_results.get((res["shape"], res["invoices"]))
+        if not old:
+            continue
+        changes = []
+        for stage, value in res["invoices_per_second"].items():
+            old_value = old["invoices_per_second"].get(stage)
+            if value and old_value:
+                changes.append("%s %+.1f%%" % (stage, 100.0 * (value - old_value) / old_value))
+        if res["peak_memory_bytes"] and old.get("peak_memory_bytes"):
+            changes.append("memoria %+.1f%%" % (
+                100.0 * (res["peak_memory_bytes"] - old["peak_memory_bytes"]) / old["peak_memory_bytes"]))
+        print("%-8s %8d  %s" % (res["shape"], res["invoices"], "  ".join(changes)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=["typical"])
+    parser.add_argument("--no-memory", action="store_true", help="no medir el pico de memoria (evita la corrida extra)")
+    parser.add_argument("--output", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="archivo JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    current = run_suite(args.sizes, args.shapes, memory=not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(current, output, indent=2)
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(current, json.load(previous))
+
+
+if __name__ == "__main__":
+    main()
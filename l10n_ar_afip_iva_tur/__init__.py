@@ -1,3 +1,4 @@
 # l10n_ar_afip_iva_tur/__init__.py
 from . import models
-from . import wizard
\ No newline at end of file
+from . import wizard
+from . import cli
@@ -1,7 +1,7 @@
 # l10n_ar_afip_iva_tur/__manifest__.py
 {
     'name': 'Argentina - AFIP IVA Turismo Exportable',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.5.0',
     'category': 'Localization/Accounting',
     'summary': 'Generación del exportable para el Régimen de Alojamiento de Turistas Extranjeros (IVA Turismo) de AFIP.',
     'author': 'aceleradora.la',
@@ -10,6 +10,7 @@
         'account',
         'l10n_ar',
         'l10n_ar_afipws_fe',
+        'l10n_ar_afipws_wsct',
         'l10n_latam_base',
         'l10n_latam_invoice_document',
         'base',
@@ -17,6 +18,7 @@
     ],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/res_company_views.xml',
         'views/afip_iva_tur_report_views.xml',
         'views/account_journal_view.xml',
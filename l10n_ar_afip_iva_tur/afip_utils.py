@@ -1,27 +1,79 @@
 import xml.etree.ElementTree as ET
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - lxml es dependencia de Odoo, pero afip_utils también se usa suelto
+    lxml_etree = None
+
+WSCT_NS = "http://ar.gob.afip.wsct/CTService/"
+
+# Los importes se manejan como enteros en centavos y la cotización como entero con 6 decimales implícitos
+AMOUNT_SCALE = 2
+RATE_SCALE = 6
+
+
+def parse_scaled(text: str, scale: int = AMOUNT_SCALE) -> int:
+    """ Convierte un decimal en texto (``"1234.56"``) en entero escalado (``123456`` con ``scale=2``)
+    sin pasar por float. Si trae más decimales que ``scale`` se redondea hacia arriba desde la mitad. """
+    text = text.strip()
+    int_part, _sep, dec_part = text.partition(".")
+    if len(dec_part) <= scale and dec_part.isdigit() or not dec_part:
+        try:
+            return int(int_part + dec_part.ljust(scale, "0"))
+        except ValueError:
+            pass
+    try:
+        return to_scaled(Decimal(text), scale)
+    except InvalidOperation:
+        raise ValueError("Importe inválido: %r" % text)
+
+
+def to_scaled(value, scale: int = AMOUNT_SCALE) -> int:
+    """ Convierte un ``Decimal`` (por ejemplo una columna numeric leída por SQL) en entero escalado. """
+    return int((Decimal(value) * (10 ** scale)).to_integral_value(ROUND_HALF_UP))
+
+# Los objetos de comprobantes se guardan de a miles (exportable, snapshots): con __slots__
+# no llevan un __dict__ por instancia.
 
 class Item:
+    __slots__ = ("tipo", "codigoTurismo", "codigo", "descripcion", "codigoAlicuotaIVA", "importeIVA", "importeItem")
+
     def __init__(self, tipo, codigoTurismo, codigo, descripcion, codigoAlicuotaIVA, importeIVA, importeItem):
         self.tipo = tipo
         self.codigoTurismo = codigoTurismo
         self.codigo = codigo
         self.descripcion = descripcion
         self.codigoAlicuotaIVA = codigoAlicuotaIVA
-        self.importeIVA = float(importeIVA)
-        self.importeItem = float(importeItem)
+        # En centavos
+        self.importeIVA = importeIVA
+        self.importeItem = importeItem
 
 class SubtotalIVA:
+    __slots__ = ("codigo", "importe")
+
     def __init__(self, codigo, importe):
         self.codigo = codigo
-        self.importe = float(importe)
+        # En centavos
+        self.importe = importe
         
 class ComprobanteAsociado:
+    __slots__ = ("codigoTipoComprobante", "numeroPuntoVenta", "numeroComprobante")
+
     def __init__(self, codigoTipoComprobante, numeroPuntoVenta, numeroComprobante):
         self.codigoTipoComprobante = codigoTipoComprobante
         self.numeroPuntoVenta = numeroPuntoVenta
         self.numeroComprobante = numeroComprobante
 
 class ComprobanteRequest:
+    __slots__ = (
+        "codigoTipoComprobante", "numeroPuntoVenta", "numeroComprobante", "fechaEmision", "codigoTipoAutorizacion",
+        "codigoTipoDocumento", "numeroDocumento", "idImpositivo", "codigoPais", "domicilioReceptor",
+        "codigoRelacionEmisorReceptor", "importeGravado", "importeNoGravado", "importeExento", "importeReintegro",
+        "importeTotal", "codigoMoneda", "cotizacionMoneda", "observaciones", "items", "subtotales_iva",
+        "comprobantes_asociados",
+    )
+
     def __init__(self):
         self.codigoTipoComprobante = ""
         self.numeroPuntoVenta = ""
@@ -34,31 +86,37 @@ class ComprobanteRequest:
         self.codigoPais = ""
         self.domicilioReceptor = ""
         self.codigoRelacionEmisorReceptor = ""
-        self.importeGravado = 0.0
-        self.importeNoGravado = 0.0
-        self.importeExento = 0.0
-        self.importeReintegro = 0.0
-        self.importeTotal = 0.0
+        # Importes en centavos
+        self.importeGravado = 0
+        self.importeNoGravado = 0
+        self.importeExento = 0
+        self.importeReintegro = 0
+        self.importeTotal = 0
         self.codigoMoneda = ""
-        self.cotizacionMoneda = 0.0
+        # Cotización con 6 decimales implícitos (1.000000 -> 1000000)
+        self.cotizacionMoneda = 0
         self.observaciones = ""
         self.items = []
         self.subtotales_iva = []
         self.comprobantes_asociados = []
 
 class AuthRequest:
+    __slots__ = ("token", "sign", "cuitRepresentada")
+
     def __init__(self, token, sign, cuitRepresentada):
         self.token = token
         self.sign = sign
         self.cuitRepresentada = cuitRepresentada
 
 class AutorizarComprobanteRequest:
+    __slots__ = ("auth", "comprobante")
+
     def __init__(self, auth: AuthRequest, comprobante: ComprobanteRequest):
         self.auth = auth
         self.comprobante = comprobante
 
 
-def parse_autorizar_comprobante(xml_string: str) -> AutorizarComprobanteRequest:
+def _parse_autorizar_comprobante_etree(xml_string: str) -> AutorizarComprobanteRequest:
     ns = {
         "soap": "http://schemas.xmlsoap.org/soap/envelope/",
         "ser": "http://ar.gob.afip.wsct/CTService/",
@@ -97,13 +155,13 @@ def parse_autorizar_comprobante(xml_string: str) -> AutorizarComprobanteRequest:
     comp.codigoPais = comp_node.findtext("codigoPais", "")
     comp.domicilioReceptor = comp_node.findtext("domicilioReceptor", "")
     comp.codigoRelacionEmisorReceptor = comp_node.findtext("codigoRelacionEmisorReceptor", "")
-    comp.importeGravado = float(comp_node.findtext("importeGravado", "0"))
-    comp.importeNoGravado = float(comp_node.findtext("importeNoGravado", "0"))
-    comp.importeExento = float(comp_node.findtext("importeExento", "0"))
-    comp.importeReintegro = float(comp_node.findtext("importeReintegro", "0"))
-    comp.importeTotal = float(comp_node.findtext("importeTotal", "0"))
+    comp.importeGravado = parse_scaled(comp_node.findtext("importeGravado", "0"))
+    comp.importeNoGravado = parse_scaled(comp_node.findtext("importeNoGravado", "0"))
+    comp.importeExento = parse_scaled(comp_node.findtext("importeExento", "0"))
+    comp.importeReintegro = parse_scaled(comp_node.findtext("importeReintegro", "0"))
+    comp.importeTotal = parse_scaled(comp_node.findtext("importeTotal", "0"))
     comp.codigoMoneda = comp_node.findtext("codigoMoneda", "")
-    comp.cotizacionMoneda = float(comp_node.findtext("cotizacionMoneda", "0"))
+    comp.cotizacionMoneda = parse_scaled(comp_node.findtext("cotizacionMoneda", "0"), RATE_SCALE)
     comp.observaciones = comp_node.findtext("observaciones", "")
 
     # --- Items ---
@@ -114,8 +172,8 @@ def parse_autorizar_comprobante(xml_string: str) -> AutorizarComprobanteRequest:
             codigo=item_node.findtext("codigo", ""),
             descripcion=item_node.findtext("descripcion", ""),
             codigoAlicuotaIVA=item_node.findtext("codigoAlicuotaIVA", ""),
-            importeIVA=float(item_node.findtext("importeIVA", "0")),
-            importeItem=float(item_node.findtext("importeItem", "0")),
+            importeIVA=parse_scaled(item_node.findtext("importeIVA", "0")),
+            importeItem=parse_scaled(item_node.findtext("importeItem", "0")),
         )
         comp.items.append(item)
 
@@ -123,7 +181,7 @@ def parse_autorizar_comprobante(xml_string: str) -> AutorizarComprobanteRequest:
     for iva_node in comp_node.findall(".//subtotalIVA"):
         sub = SubtotalIVA(
             codigo=iva_node.findtext("codigo", ""),
-            importe=float(iva_node.findtext("importe", "0")),
+            importe=parse_scaled(iva_node.findtext("importe", "0")),
         )
         comp.subtotales_iva.append(sub)
 
@@ -139,6 +197,11 @@ def parse_autorizar_comprobante(xml_string: str) -> AutorizarComprobanteRequest:
     return AutorizarComprobanteRequest(auth=auth, comprobante=comp)
 
 class ComprobanteResponse:
+    __slots__ = (
+        "cuit", "codigoTipoComprobante", "numeroPuntoVenta", "numeroComprobante", "fechaEmision",
+        "tipo_autorizacion", "codigo_autorizacion", "fechaVencimiento", "resultado",
+    )
+
     def __init__(self):
         self.cuit: str = ""
         self.codigoTipoComprobante: str = ""
@@ -151,7 +214,7 @@ class ComprobanteResponse:
         self.resultado: str = ""
 
 
-def parse_afip_response(xml_string: str) -> ComprobanteResponse:
+def _parse_afip_response_etree(xml_string: str) -> ComprobanteResponse:
     ns = {
         "soap": "http://schemas.xmlsoap.org/soap/envelope/",
         "wsct": "http://ar.gob.afip.wsct/CTService/"
@@ -194,12 +257,175 @@ def parse_afip_response(xml_string: str) -> ComprobanteResponse:
 
     return comp
 
-def format_fixed_decimal(value: float, int_digits: int = 12, dec_digits: int = 6) -> str:
-    # separo parte entera y decimal
-    entero, decimal = f"{value:.{dec_digits}f}".split(".")
-    
-    # relleno la parte entera con ceros a la izquierda
-    entero = entero.zfill(int_digits)
-    
-    # concateno entero + decimal
-    return entero + decimal
+# --- Backend lxml ---
+# Se compilan las expresiones una sola vez y se leen los hijos de cada nodo en una única pasada,
+# en lugar de un findtext por campo. Devuelve exactamente los mismos objetos que el backend de la stdlib.
+
+if lxml_etree is not None:
+    _XP_AUTORIZAR_REQUEST = lxml_etree.XPath("//ser:autorizarComprobanteRequest", namespaces={"ser": WSCT_NS})
+    _XP_ITEMS = lxml_etree.XPath(".//item")
+    _XP_SUBTOTALES_IVA = lxml_etree.XPath(".//subtotalIVA")
+    _XP_COMPROBANTES_ASOCIADOS = lxml_etree.XPath(".//comprobanteAsociado")
+    _XP_AUTORIZAR_RESPONSE = lxml_etree.XPath(
+        "//wsct:autorizarComprobanteResponse/wsct:autorizarComprobanteReturn", namespaces={"wsct": WSCT_NS}
+    )
+
+
+def _lxml_fromstring(xml_string):
+    """ ``lxml.etree.fromstring`` con los mismos errores que el backend stdlib: un XML vacío o mal formado
+    lanza ``ET.ParseError`` (no ``lxml.etree.XMLSyntaxError``), así quien llama captura una sola excepción. """
+    # lxml no acepta str con declaración de encoding
+    if isinstance(xml_string, str):
+        xml_string = xml_string.encode("utf-8")
+    try:
+        return lxml_etree.fromstring(xml_string)
+    except lxml_etree.XMLSyntaxError as error:
+        parse_error = ET.ParseError(str(error))
+        parse_error.code = error.code
+        parse_error.position = error.position
+        raise parse_error from error
+
+
+def _lxml_children_text(node):
+    """ Devuelve {tag: texto} de los hijos directos de ``node`` (gana el primero, como findtext). """
+    values = {}
+    for child in node:
+        tag = child.tag
+        if tag not in values:
+            values[tag] = child.text or ""
+    return values
+
+
+def _lxml_child(node, tag):
+    for child in node:
+        if child.tag == tag:
+            return child
+    return None
+
+
+def _parse_autorizar_comprobante_lxml(xml_string: str) -> AutorizarComprobanteRequest:
+    root = _lxml_fromstring(xml_string)
+    found = _XP_AUTORIZAR_REQUEST(root)
+    if not found:
+        raise ValueError("No se encontró el nodo autorizarComprobanteRequest en el XML")
+    req = found[0]
+
+    # --- authRequest ---
+    auth_node = _lxml_child(req, "authRequest")
+    if auth_node is None:
+        raise ValueError("No se encontró el nodo authRequest en el XML")
+    values = _lxml_children_text(auth_node)
+    auth = AuthRequest(
+        token=values.get("token", ""),
+        sign=values.get("sign", ""),
+        cuitRepresentada=values.get("cuitRepresentada", ""),
+    )
+
+    # --- comprobanteRequest ---
+    comp_node = _lxml_child(req, "comprobanteRequest")
+    if comp_node is None:
+        raise ValueError("No se encontró el nodo comprobanteRequest en el XML")
+    values = _lxml_children_text(comp_node)
+
+    comp = ComprobanteRequest()
+    comp.codigoTipoComprobante = values.get("codigoTipoComprobante", "")
+    comp.numeroPuntoVenta = values.get("numeroPuntoVenta", "")
+    comp.numeroComprobante = values.get("numeroComprobante", "")
+    comp.fechaEmision = values.get("fechaEmision", "")
+    comp.codigoTipoAutorizacion = values.get("codigoTipoAutorizacion", "")
+    comp.codigoTipoDocumento = values.get("codigoTipoDocumento", "")
+    comp.numeroDocumento = values.get("numeroDocumento", "")
+    comp.idImpositivo = values.get("idImpositivo", "")
+    comp.codigoPais = values.get("codigoPais", "")
+    comp.domicilioReceptor = values.get("domicilioReceptor", "")
+    comp.codigoRelacionEmisorReceptor = values.get("codigoRelacionEmisorReceptor", "")
+    comp.importeGravado = parse_scaled(values.get("importeGravado", "0"))
+    comp.importeNoGravado = parse_scaled(values.get("importeNoGravado", "0"))
+    comp.importeExento = parse_scaled(values.get("importeExento", "0"))
+    comp.importeReintegro = parse_scaled(values.get("importeReintegro", "0"))
+    comp.importeTotal = parse_scaled(values.get("importeTotal", "0"))
+    comp.codigoMoneda = values.get("codigoMoneda", "")
+    comp.cotizacionMoneda = parse_scaled(values.get("cotizacionMoneda", "0"), RATE_SCALE)
+    comp.observaciones = values.get("observaciones", "")
+
+    # --- Items ---
+    for item_node in _XP_ITEMS(comp_node):
+        values = _lxml_children_text(item_node)
+        comp.items.append(Item(
+            tipo=values.get("tipo", ""),
+            codigoTurismo=values.get("codigoTurismo", ""),
+            codigo=values.get("codigo", ""),
+            descripcion=values.get("descripcion", ""),
+            codigoAlicuotaIVA=values.get("codigoAlicuotaIVA", ""),
+            importeIVA=parse_scaled(values.get("importeIVA", "0")),
+            importeItem=parse_scaled(values.get("importeItem", "0")),
+        ))
+
+    # --- Subtotales IVA ---
+    for iva_node in _XP_SUBTOTALES_IVA(comp_node):
+        values = _lxml_children_text(iva_node)
+        comp.subtotales_iva.append(SubtotalIVA(
+            codigo=values.get("codigo", ""),
+            importe=parse_scaled(values.get("importe", "0")),
+        ))
+
+    # --- Comprobantes Asociados (si existen) ---
+    for ca_node in _XP_COMPROBANTES_ASOCIADOS(comp_node):
+        values = _lxml_children_text(ca_node)
+        comp.comprobantes_asociados.append(ComprobanteAsociado(
+            codigoTipoComprobante=values.get("codigoTipoComprobante", ""),
+            numeroPuntoVenta=values.get("numeroPuntoVenta", ""),
+            numeroComprobante=values.get("numeroComprobante", ""),
+        ))
+
+    return AutorizarComprobanteRequest(auth=auth, comprobante=comp)
+
+
+def _parse_afip_response_lxml(xml_string: str) -> ComprobanteResponse:
+    root = _lxml_fromstring(xml_string)
+    found = _XP_AUTORIZAR_RESPONSE(root)
+    comp_resp_node = resultado_node = None
+    # Igual que el backend stdlib: primer comprobanteResponse y primer resultado
+    for return_node in found:
+        for child in return_node:
+            if comp_resp_node is None and child.tag == "comprobanteResponse":
+                comp_resp_node = child
+            elif resultado_node is None and child.tag == "resultado":
+                resultado_node = child
+
+    comp = ComprobanteResponse()
+    if comp_resp_node is not None:
+        values = _lxml_children_text(comp_resp_node)
+        comp.cuit = values.get("cuit", "")
+        comp.codigoTipoComprobante = values.get("codigoTipoComprobante", "")
+        comp.numeroPuntoVenta = values.get("numeroPuntoVenta", "")
+        comp.numeroComprobante = values.get("numeroComprobante", "")
+        comp.fechaEmision = values.get("fechaEmision", "")
+
+        # Detectar si viene CAE o CAI
+        if "CAE" in values:
+            comp.tipo_autorizacion = "CAE"
+            comp.codigo_autorizacion = values["CAE"]
+            comp.fechaVencimiento = values.get("fechaVencimientoCAE", "")
+        elif "CAI" in values:
+            comp.tipo_autorizacion = "CAI"
+            comp.codigo_autorizacion = values["CAI"]
+            comp.fechaVencimiento = values.get("fechaVencimientoCAI", "")
+
+    if resultado_node is not None:
+        comp.resultado = resultado_node.text or ""
+
+    return comp
+
+
+if lxml_etree is not None:
+    parse_autorizar_comprobante = _parse_autorizar_comprobante_lxml
+    parse_afip_response = _parse_afip_response_lxml
+else:
+    parse_autorizar_comprobante = _parse_autorizar_comprobante_etree
+    parse_afip_response = _parse_afip_response_etree
+
+def format_fixed_decimal(value: int, int_digits: int = 12, dec_digits: int = 6) -> str:
+    """ Formatea un entero escalado con ``dec_digits`` decimales implícitos (ver ``parse_scaled``)
+    como ``int_digits + dec_digits`` dígitos rellenos con ceros a la izquierda. """
+    return str(value).zfill(int_digits + dec_digits)
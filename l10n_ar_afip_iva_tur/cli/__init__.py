@@ -0,0 +1,2 @@
+# l10n_ar_afip_iva_tur/cli/__init__.py
+from . import iva_tur_export
@@ -0,0 +1,158 @@
+# l10n_ar_afip_iva_tur/cli/iva_tur_export.py
+"""
+Subcomando ``odoo-bin iva_tur_export``: genera el exportable de IVA Turismo de una compañía y un período
+sin pasar por el asistente ni por el formulario del reporte, para correrlo desde tareas programadas.
+
+Usa (o crea) el reporte no presentado del período, actualiza sus comprobantes, genera el archivo con la
+misma lógica de ``afip.iva.tur.report`` y lo copia a ``--output`` (o a la salida estándar con ``-``).
+
+Uso:
+    odoo-bin --addons-path=... iva_tur_export -c odoo.conf -d base --company 30712345678 --period 2025-06 --output F8089.TXT
+
+``--addons-path=`` tiene que ir antes del subcomando: odoo-bin solo busca los comandos de los módulos
+cuando el primer argumento es la ruta de módulos.
+
+Códigos de salida: 0 si se generó el archivo, 2 si hay conflictos o errores de validación de los
+comprobantes (el detalle sale por la salida de error), 3 si el período no tiene comprobantes para exportar
+y 1 ante errores de uso.
+"""
+
+import argparse
+import calendar
+import datetime
+import logging
+import sys
+
+import odoo
+from odoo import SUPERUSER_ID, api
+from odoo.cli import Command
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+EXIT_USAGE = 1
+EXIT_CONFLICT = 2
+EXIT_EMPTY = 3
+# Tamaño de los bloques que se copian del adjunto a la salida
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _parse_period(value):
+    """ Convierte ``AAAA-MM`` (o ``AAAAMM``) en (primer día, último día) del mes. """
+    try:
+        month_start = datetime.datetime.strptime(value.replace('-', ''), '%Y%m').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("período inválido %r, se espera AAAA-MM" % value)
+    last_day = calendar.monthrange(month_start.year, month_start.month)[1]
+    return month_start, month_start.replace(day=last_day)
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """ ``ArgumentParser`` que sale con ``EXIT_USAGE`` ante errores de uso (argparse usa 2, que este comando
+    reserva para los conflictos de los comprobantes). """
+
+    def error(self, message):
+        self.print_usage(sys.stderr)
+        self.exit(EXIT_USAGE, "%s: error: %s\n" % (self.prog, message))
+
+
+class IvaTurExport(Command):
+    """ Genera el exportable F8089 (IVA Turismo) de una compañía y un período """
+    name = 'iva_tur_export'
+
+    def run(self, cmdargs):
+        parser = _ArgumentParser(
+            prog='%s %s' % (sys.argv[0].split('/')[-1], self.name),
+            description=__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+        )
+        parser.add_argument('--company', required=True,
+                            help="Compañía: ID, CUIT (con o sin guiones) o nombre exacto.")
+        parser.add_argument('--period', required=True, type=_parse_period,
+                            help="Período a exportar (AAAA-MM).")
+        parser.add_argument('--output', default='-',
+                            help="Ruta del archivo TXT a escribir, o '-' para la salida estándar (por defecto).")
+        parser.add_argument('--rebuild', action='store_true',
+                            help="Vuelve a buscar todos los comprobantes del período en lugar de la actualización incremental.")
+        args, odoo_args = parser.parse_known_args(cmdargs)
+
+        config.parse_config(odoo_args)
+        dbname = config['db_name'] and config['db_name'].split(',')[0]
+        if not dbname:
+            parser.error("falta la base de datos (-d)")
+        sys.exit(self.export(dbname, args))
+
+    def export(self, dbname, args):
+        """ Genera el archivo y devuelve el código de salida. """
+        date_from, date_to = args.period
+        registry = odoo.registry(dbname)
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            company = self._get_company(env, args.company)
+            if not company:
+                _logger.error("No se encontró la compañía %r", args.company)
+                return EXIT_USAGE
+            env = env(context=dict(env.context, allowed_company_ids=company.ids))
+            report = self._get_report(env, company, date_from, date_to)
+            try:
+                if args.rebuild:
+                    report.action_rebuild_invoices()
+                else:
+                    report.action_update_invoices()
+                if not report.invoice_count:
+                    _logger.warning("%s: no hay comprobantes de IVA Turismo para exportar en el período", report.name)
+                    cr.commit()
+                    return EXIT_EMPTY
+                report.action_generate_file()
+            except (UserError, ValidationError) as error:
+                cr.rollback()
+                sys.stderr.write("%s\n" % error.args[0])
+                return EXIT_CONFLICT
+            cr.commit()
+            _logger.info("%s: generado %s con %s comprobantes", report.name, report.exported_filename, report.invoice_count)
+            self._copy_export_file(report, args.output)
+        return 0
+
+    def _get_company(self, env, value):
+        Company = env['res.company']
+        if value.isdigit():
+            company = Company.browse(int(value)).exists()
+            if company:
+                return company
+        cuit = value.replace('-', '').strip()
+        for company in Company.search([]):
+            if (company.vat or '').replace('-', '').strip() == cuit:
+                return company
+        return Company.search([('name', '=', value)], limit=1)
+
+    def _get_report(self, env, company, date_from, date_to):
+        """ Reporte no presentado del período (el más reciente) o uno nuevo. """
+        Report = env['afip.iva.tur.report']
+        report = Report.search([
+            ('company_id', '=', company.id),
+            ('date_from', '=', date_from),
+            ('date_to', '=', date_to),
+            ('state', '!=', 'presented'),
+        ], order='id desc', limit=1)
+        if not report:
+            report = Report.create({
+                'company_id': company.id,
+                'date_from': date_from,
+                'date_to': date_to,
+                'state': 'draft',
+            })
+        return report
+
+    def _copy_export_file(self, report, output):
+        """ Copia el adjunto generado a ``output`` por bloques, sin cargarlo entero en memoria. """
+        stream = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        try:
+            with report._open_export_file() as buffer:
+                for start in range(0, len(buffer), _COPY_CHUNK_SIZE):
+                    stream.write(buffer[start:start + _COPY_CHUNK_SIZE])
+        finally:
+            if output == '-':
+                stream.flush()
+            else:
+                stream.close()
@@ -0,0 +1,335 @@
+# l10n_ar_afip_iva_tur/f8089.py
+"""
+Armado de los registros del exportable F8089 (IVA Turismo) a partir de datos planos,
+sin acceso al ORM. Los datos de cada comprobante se obtienen previamente en
+``afip.iva.tur.report._iter_export_data``.
+"""
+
+import collections
+import concurrent.futures
+import multiprocessing
+
+from .afip_utils import parse_autorizar_comprobante, parse_afip_response
+from .fixed_width import Field, FieldOverflowError, RecordLayout
+
+
+class InvoiceExportData:
+    """ Datos de un comprobante necesarios para armar sus registros 02 a 08 (``amount_total`` en centavos).
+
+    ``payments`` es la lista de ``(forma de pago, importe en centavos)`` de los pagos conciliados: se arma
+    un registro 08 por pago. Sin pagos se arma uno solo con ``payment_type`` y ``amount_total``. """
+
+    def __init__(self, move_id, name, invoice_date, partner_name, amount_total, payment_type,
+                 xml_request=None, xml_response=None, comprobante=None, response=None, payments=None):
+        self.move_id = move_id
+        self.name = name
+        self.invoice_date = invoice_date
+        self.partner_name = partner_name
+        self.amount_total = amount_total
+        self.payment_type = payment_type
+        self.payments = payments
+        self.xml_request = xml_request
+        self.xml_response = xml_response
+        # Si vienen ya parseados no se vuelve a leer el XML
+        self.comprobante = comprobante
+        self.response = response
+
+
+# --- Diseño de registros ---
+# Cada registro se declara una vez; ``RecordLayout`` lo compila en su función de formato.
+
+RECORD_01 = RecordLayout("01", [
+    Field.number("cuit_informante", 11),
+    Field.number("periodo", 6),
+    Field.number("remesa", 4),
+    Field.const("0103"),
+    Field.const("858"),
+    Field.const("8089"),
+    Field.const("00100"),
+    Field.number("sin_movimiento", 1),
+])
+
+# --- REGISTRO TIPO 2: COMPROBANTE DE VENTA ---
+RECORD_02 = RecordLayout("02", [
+    Field.number("tipo_comprobante", 3),
+    Field.number("punto_venta", 5),
+    Field.number("numero_comprobante", 8),
+    Field.number("fecha_emision", 8),
+    Field.number("tipo_doc_turista", 2),
+    Field.text("nro_doc_turista", 20),
+    Field.number("codigo_pais", 4),
+    Field.number("id_impositivo", 2),
+    Field.number("codigo_relacion", 2),
+    Field.amount("importe_gravado", 15),
+    Field.amount("importe_no_gravado", 15),
+    Field.amount("importe_exento", 15),
+    Field.amount("importe_reintegro", 15),
+    Field.text("codigo_moneda", 3),
+    # 12 enteros y 6 decimales
+    Field.amount("cotizacion_moneda", 18, scale=6),
+    Field.text("tipo_autorizacion", 3),
+    Field.text("codigo_autorizacion", 14),
+    Field.text("codigo_control_fiscal", 6),
+    Field.number("serie_control_fiscal", 10),
+    Field.amount("importe_total", 15),
+])
+
+# --- REGISTRO TIPO 3: TOTALES DEL COMPROBANTE DE VENTA (Base IVA) ---
+RECORD_03 = RecordLayout("03", [
+    Field.number("codigo_iva", 2),
+    Field.number("base_imponible", 15),
+    Field.amount("importe_iva", 15),
+])
+
+# --- REGISTRO TIPO 4: DATOS DEL TURISTA EXTRANJERO ---
+RECORD_04 = RecordLayout("04", [
+    Field.number("tipo_doc_turista", 2),
+    Field.text("nro_doc_turista", 20),
+    Field.number("codigo_pais", 4),
+    Field.text("nombre_turista", 50),
+    Field.number("codigo_pais_residencia", 4),
+    Field.number("codigo_pais_nacionalidad", 4),
+])
+
+# --- REGISTRO TIPO 5: IMPUESTOS Y PERCEPCIONES DEL COMPROBANTE ---
+RECORD_05 = RecordLayout("05", [
+    Field.number("cuit_informante", 11),
+    Field.number("tipo_comprobante", 3),
+    Field.number("punto_venta", 5),
+    Field.number("numero_comprobante", 8),
+    Field.text("tipo_autorizacion", 3),
+    Field.text("codigo_autorizacion", 14),
+    Field.number("fecha_emision", 8),
+    Field.text("codigo_control_fiscal", 6),
+    Field.number("serie_control_fiscal", 10),
+    Field.amount("importe_reintegro", 15),
+])
+
+# --- REGISTRO TIPO 6: COMPROBANTES ASOCIADOS ---
+RECORD_06 = RecordLayout("06", [
+    Field.number("tipo_comprobante", 3),
+    Field.number("punto_venta", 5),
+    Field.number("numero_comprobante", 8),
+])
+
+# --- REGISTRO TIPO 7: CONCEPTOS DE DETALLE DEL COMPROBANTE ---
+RECORD_07 = RecordLayout("07", [
+    Field.number("tipo_item", 2),
+    Field.number("cod_tur", 4),
+    Field.text("codigo", 50),
+    Field.text("cuit_hotel", 11),
+    Field.text("fecha_ingreso", 8),
+    Field.text("unidad", 4),
+    Field.text("tipo_unidad", 4),
+    Field.text("cantidad_personas", 2),
+    Field.text("descripcion", 200),
+    Field.text("cantidad_noches", 5),
+    Field.text("precio_unitario", 18),
+    Field.number("codigo_iva", 2),
+    Field.amount("importe_iva", 15),
+    Field.amount("importe_total", 15),
+])
+
+# --- REGISTRO TIPO 8: MEDIOS DE PAGO ---
+RECORD_08 = RecordLayout("08", [
+    Field.text("tipo_forma_pago", 1),
+    Field.text("codigo_swift", 11),
+    Field.text("tipo_cuenta", 2),
+    Field.text("numero_tarjeta", 6),
+    Field.text("numero_cuenta", 20),
+    Field.amount("importe", 15),
+])
+
+RECORD_LAYOUTS = {
+    layout.code: layout
+    for layout in (RECORD_01, RECORD_02, RECORD_03, RECORD_04, RECORD_05, RECORD_06, RECORD_07, RECORD_08)
+}
+
+
+def _codigo_iva(codigo_alicuota):
+    return "11" if codigo_alicuota == "5" else "10"
+
+
+def render_header(cuit_informante, fecha_generacion, remesa, sin_movimiento):
+    """ Devuelve el registro 01 (cabecera del archivo). """
+    return RECORD_01.format({
+        "cuit_informante": cuit_informante,
+        "periodo": fecha_generacion,
+        "remesa": remesa,
+        "sin_movimiento": sin_movimiento,
+    })
+
+
+def invoice_records(data, cuit_informante):
+    """ Generador de ``(RecordLayout, valores)`` de los registros 02 a 08 de un comprobante (``InvoiceExportData``). """
+    comprobante = data.comprobante
+    if comprobante is None:
+        comprobante = parse_autorizar_comprobante(data.xml_request).comprobante
+    response = data.response
+    if response is None:
+        response = parse_afip_response(data.xml_response)
+
+    # Valores compartidos por los registros 02, 04 y 05
+    values = {
+        "cuit_informante": cuit_informante,
+        "tipo_comprobante": comprobante.codigoTipoDocumento,
+        "punto_venta": comprobante.numeroPuntoVenta,
+        "numero_comprobante": comprobante.numeroComprobante,
+        "fecha_emision": data.invoice_date.strftime('%Y%m%d') if data.invoice_date else '',
+        "tipo_doc_turista": comprobante.codigoTipoDocumento,
+        "nro_doc_turista": comprobante.numeroDocumento,
+        "codigo_pais": comprobante.codigoPais,
+        "codigo_pais_residencia": comprobante.codigoPais,
+        "codigo_pais_nacionalidad": comprobante.codigoPais,
+        "id_impositivo": comprobante.idImpositivo,
+        "codigo_relacion": comprobante.codigoRelacionEmisorReceptor,
+        "importe_gravado": comprobante.importeGravado,
+        "importe_no_gravado": comprobante.importeNoGravado,
+        "importe_exento": comprobante.importeExento,
+        "importe_reintegro": comprobante.importeReintegro,
+        "importe_total": comprobante.importeTotal,
+        "codigo_moneda": comprobante.codigoMoneda,
+        "cotizacion_moneda": comprobante.cotizacionMoneda,
+        "tipo_autorizacion": response.tipo_autorizacion,
+        "codigo_autorizacion": response.codigo_autorizacion,
+        "nombre_turista": str(data.partner_name or '').strip(),
+    }
+
+    yield RECORD_02, values
+
+    for iva in comprobante.subtotales_iva:
+        yield RECORD_03, {
+            "codigo_iva": _codigo_iva(iva.codigo),
+            "importe_iva": iva.importe,
+        }
+
+    yield RECORD_04, values
+
+    yield RECORD_05, values
+
+    for comp_asociado in comprobante.comprobantes_asociados:
+        yield RECORD_06, {
+            "tipo_comprobante": comp_asociado.codigoTipoComprobante,
+            "punto_venta": comp_asociado.numeroPuntoVenta,
+            "numero_comprobante": comp_asociado.numeroComprobante,
+        }
+
+    for item in comprobante.items:
+        yield RECORD_07, {
+            "tipo_item": item.tipo,
+            "cod_tur": item.codigoTurismo,
+            "codigo": item.codigo,
+            "descripcion": item.descripcion,
+            "codigo_iva": _codigo_iva(item.codigoAlicuotaIVA),
+            "importe_iva": item.importeIVA,
+            "importe_total": item.importeItem,
+        }
+
+    for payment_type, amount in data.payments or [(data.payment_type, data.amount_total)]:
+        yield RECORD_08, {
+            "tipo_forma_pago": payment_type,
+            "importe": amount,
+        }
+
+
+def render_invoice(data, cuit_informante):
+    """ Generador de los registros 02 a 08 de un comprobante (``InvoiceExportData``). """
+    for layout, values in invoice_records(data, cuit_informante):
+        yield layout.format(values)
+
+
+def render_invoice_block(data, cuit_informante):
+    """ Devuelve los registros 02 a 08 de un comprobante ya unidos, cada uno terminado en CRLF. """
+    try:
+        return "".join(line + "\r\n" for line in render_invoice(data, cuit_informante))
+    except FieldOverflowError as error:
+        error.invoice_name = data.name
+        raise
+
+
+class ExportIssue:
+    """ Dato de un comprobante que impide armar el exportable. """
+
+    def __init__(self, invoice_name, record_code, field_name, message):
+        self.invoice_name = invoice_name
+        self.record_code = record_code
+        self.field_name = field_name
+        self.message = message
+
+    def __str__(self):
+        if self.record_code:
+            return "%s: registro %s, campo %s: %s" % (self.invoice_name, self.record_code, self.field_name, self.message)
+        return "%s: %s" % (self.invoice_name, self.message)
+
+
+# Campos que deben venir informados (registro -> {campo: de dónde sale el dato})
+REQUIRED_FIELDS = {
+    "07": {
+        "tipo_item": "Tipo de Item de la categoría del producto",
+        "cod_tur": "Código de Turismo de la categoría del producto",
+    },
+    "08": {
+        "tipo_forma_pago": "Forma de pago WSCT del diario del pago conciliado",
+    },
+}
+
+
+def validate_invoice(data, cuit_informante):
+    """ Devuelve la lista de ``ExportIssue`` del comprobante sin armar sus registros: anchos, campos
+    numéricos, rangos de importes y códigos obligatorios, según los mismos diseños de registro. """
+    if (data.comprobante is None and not data.xml_request) or (data.response is None and not data.xml_response):
+        # Comprobante sin snapshot ni XML guardado (por ejemplo, publicado sin autorizar por WSCT)
+        return [ExportIssue(data.name, None, None, "no tiene los datos de la autorización de AFIP (XML de WSCT)")]
+    issues = []
+    seen = set() # los registros 02, 04 y 05 comparten valores: cada problema se informa una vez
+    try:
+        for layout, values in invoice_records(data, cuit_informante):
+            for field_name, message in layout.validate(values):
+                if (field_name, message) not in seen:
+                    seen.add((field_name, message))
+                    issues.append(ExportIssue(data.name, layout.code, field_name, message))
+            for field_name, source in REQUIRED_FIELDS.get(layout.code, {}).items():
+                if values.get(field_name) in (None, False, ""):
+                    issues.append(ExportIssue(data.name, layout.code, field_name, "falta informar: %s" % source))
+    except (ValueError, SyntaxError) as error:
+        # XML de AFIP que no se puede leer (comprobantes sin snapshot)
+        issues.append(ExportIssue(data.name, None, None, "no se pudo leer el XML de AFIP: %s" % error))
+    return issues
+
+
+def validate_invoices(datas, cuit_informante):
+    """ Valida todos los comprobantes de ``datas`` en una pasada y devuelve todos los problemas encontrados. """
+    issues = []
+    for data in datas:
+        issues.extend(validate_invoice(data, cuit_informante))
+    return issues
+
+
+def _render_invoice_blocks(args):
+    """ Tarea de los procesos del pool: arma los bloques de una tanda de comprobantes. """
+    datas, cuit_informante = args
+    return [render_invoice_block(data, cuit_informante) for data in datas]
+
+
+def iter_invoice_blocks_parallel(datas, cuit_informante, workers, chunk_size=200):
+    """ Arma los bloques de ``datas`` (iterable de ``InvoiceExportData``) en un pool de ``workers`` procesos,
+    en tandas de ``chunk_size`` comprobantes, y los devuelve en el mismo orden de entrada.
+    Se mantienen a lo sumo ``2 * workers`` tandas en curso, para no leer todos los datos por adelantado. """
+    # fork: los procesos hijos heredan los módulos ya importados y no necesitan inicializar Odoo (con spawn o
+    # forkserver no podrían importar el módulo sin la ruta de módulos de Odoo). Solo es seguro en procesos sin
+    # otros hilos activos: el llamador decide (ver ``afip.iva.tur.report._get_export_workers``).
+    context = multiprocessing.get_context("fork")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = collections.deque()
+        chunk = []
+        for data in datas:
+            chunk.append(data)
+            if len(chunk) >= chunk_size:
+                pending.append(executor.submit(_render_invoice_blocks, (chunk, cuit_informante)))
+                chunk = []
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(executor.submit(_render_invoice_blocks, (chunk, cuit_informante)))
+        while pending:
+            yield from pending.popleft().result()
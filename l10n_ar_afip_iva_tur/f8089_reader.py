@@ -0,0 +1,323 @@
+# l10n_ar_afip_iva_tur/f8089_reader.py
+"""
+Lectura y verificación de archivos F8089 ya generados, sin acceso al ORM.
+
+El archivo se recorre línea por línea sobre un buffer (normalmente un ``mmap`` del adjunto), sin
+cargarlo entero en memoria: ``scan`` valida cada registro contra los diseños de ``f8089`` y arma un
+resumen por comprobante (ubicación del bloque en el archivo, huella e importes), y ``diff`` compara
+dos archivos (por ejemplo dos remesas del mismo período) usando esos resúmenes.
+"""
+
+import collections
+import contextlib
+import hashlib
+import mmap
+
+from .f8089 import RECORD_02, RECORD_LAYOUTS, invoice_records
+from .fixed_width import FieldOverflowError
+
+LINE_END = b"\r\n"
+# Registros que forman el bloque de cada comprobante, en el orden en que se generan
+INVOICE_RECORDS = ("02", "03", "04", "05", "06", "07", "08")
+# Registros que pueden repetirse (uno por alícuota, comprobante asociado, servicio y pago)
+REPEATED_RECORDS = ("03", "06", "07", "08")
+# Registros que deben aparecer exactamente una vez en cada bloque
+SINGLE_RECORDS = ("04", "05")
+
+
+@contextlib.contextmanager
+def map_file(file):
+    """ Devuelve ``file`` (archivo abierto en modo binario) como ``mmap`` de solo lectura, o ``b""`` si está vacío. """
+    try:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError: # archivo vacío
+        yield b""
+        return
+    try:
+        yield buffer
+    finally:
+        buffer.close()
+
+
+@contextlib.contextmanager
+def open_buffer(path):
+    """ Abre ``path`` como ``mmap`` de solo lectura (ver ``map_file``). """
+    with open(path, "rb") as file, map_file(file) as buffer:
+        yield buffer
+
+
+def iter_lines(buffer):
+    """ Generador de ``(número de línea, desde, hasta)`` de cada línea de ``buffer`` (sin el CRLF). """
+    start = 0
+    size = len(buffer)
+    number = 0
+    while start < size:
+        number += 1
+        end = buffer.find(LINE_END, start)
+        if end == -1:
+            yield number, start, size
+            return
+        yield number, start, end
+        start = end + len(LINE_END)
+
+
+class InvoiceSummary:
+    """ Resumen de un comprobante del archivo: clave, ubicación del bloque, totales (en centavos) y cantidad de
+    registros por tipo. """
+
+    __slots__ = ("key", "start", "end", "digest", "importe_total", "payments_total", "record_counts")
+
+    def __init__(self, key, start):
+        self.key = key
+        self.start = start
+        self.end = start
+        self.digest = None
+        self.importe_total = 0
+        self.payments_total = 0
+        self.record_counts = collections.Counter()
+
+
+class FileScan:
+    """ Resultado de ``scan``: cabecera, cantidad de registros por tipo, comprobantes y problemas encontrados. """
+
+    def __init__(self):
+        self.header = None
+        self.record_counts = collections.Counter()
+        self.invoices = collections.OrderedDict()
+        self.errors = []
+        self.line_count = 0
+        self.missing_final_crlf = False
+
+    @property
+    def importe_total(self):
+        return sum(invoice.importe_total for invoice in self.invoices.values())
+
+    @property
+    def payments_total(self):
+        return sum(invoice.payments_total for invoice in self.invoices.values())
+
+
+def invoice_key(values):
+    """ Clave de un comprobante a partir de su registro 02: punto de venta, número y código de autorización. """
+    return "%s-%s-%s" % (values["punto_venta"], values["numero_comprobante"], values["codigo_autorizacion"].strip())
+
+
+def scan(buffer, max_errors=200):
+    """ Recorre el archivo validando anchos, tipos y orden de los registros, y resume cada comprobante. Dentro
+    de cada bloque los registros van en el orden 02, 03*, 04, 05, 06*, 07*, 08+. """
+    result = FileScan()
+    current = None
+    digest = None
+    previous_code = None
+
+    def error(line_number, message):
+        if len(result.errors) < max_errors:
+            result.errors.append("Línea %s: %s" % (line_number, message))
+
+    def close_invoice(end, last_line):
+        """ Cierra el bloque de ``current``; los registros que le faltan se informan en su última línea. """
+        if current is not None:
+            current.end = end
+            current.digest = digest.hexdigest()
+            for code in SINGLE_RECORDS + ("08",):
+                if not current.record_counts[code]:
+                    error(last_line, "el comprobante %s no tiene registro %s" % (current.key, code))
+
+    line_number = 0
+    for line_number, start, end in iter_lines(buffer):
+        raw = bytes(buffer[start:end])
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            error(line_number, "no es texto UTF-8")
+            continue
+        code = line[:2]
+        layout = RECORD_LAYOUTS.get(code)
+        if layout is None:
+            error(line_number, "tipo de registro desconocido %r" % code)
+            continue
+        result.record_counts[code] += 1
+        if len(line) != layout.width:
+            error(line_number, "el registro %s tiene %s caracteres y debe tener %s" % (code, len(line), layout.width))
+            continue
+        try:
+            values = layout.parse(line)
+        except ValueError:
+            error(line_number, "el registro %s tiene un importe que no es numérico" % code)
+            continue
+
+        if code == "01":
+            if line_number != 1:
+                error(line_number, "el registro 01 debe ser la primera línea")
+            result.header = values
+            continue
+        if line_number == 1:
+            error(line_number, "el archivo no empieza con el registro 01")
+        if code == "02":
+            close_invoice(start, line_number - 1)
+            key = invoice_key(values)
+            if key in result.invoices:
+                error(line_number, "el comprobante %s está repetido" % key)
+            current = InvoiceSummary(key, start)
+            current.importe_total = values["importe_total"]
+            result.invoices[key] = current
+            digest = hashlib.blake2b(digest_size=16)
+        elif current is None:
+            error(line_number, "el registro %s no pertenece a ningún comprobante (falta el 02)" % code)
+            continue
+        else:
+            order, previous_order = INVOICE_RECORDS.index(code), INVOICE_RECORDS.index(previous_code)
+            if order < previous_order or (order == previous_order and code not in REPEATED_RECORDS):
+                error(line_number, "el registro %s no puede ir después del registro %s" % (code, previous_code))
+            if code == "08":
+                current.payments_total += values["importe"]
+        current.record_counts[code] += 1
+        previous_code = code
+        digest.update(raw)
+        digest.update(LINE_END)
+
+    close_invoice(len(buffer), line_number)
+    result.line_count = line_number
+    result.missing_final_crlf = bool(len(buffer)) and buffer[len(buffer) - len(LINE_END):] != LINE_END
+    if result.missing_final_crlf:
+        error(line_number, "la última línea no termina en CRLF")
+    if not result.record_counts["01"] and line_number:
+        error(1, "falta el registro 01")
+    return result
+
+
+def iter_block_records(buffer, invoice):
+    """ Generador de ``(código, valores)`` de los registros del bloque de ``invoice`` (``InvoiceSummary``).
+    Las líneas inválidas (ya informadas por ``scan``) se omiten. """
+    block = bytes(buffer[invoice.start:invoice.end]).decode("utf-8", "replace")
+    for line in block.split("\r\n"):
+        layout = RECORD_LAYOUTS.get(line[:2])
+        if layout is None or len(line) != layout.width:
+            continue
+        try:
+            yield line[:2], layout.parse(line)
+        except ValueError:
+            continue
+
+
+def _value_text(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def diff_invoice(old_buffer, old_invoice, new_buffer, new_invoice):
+    """ Diferencias campo a campo entre dos versiones del bloque de un comprobante. """
+    old_records = collections.defaultdict(list)
+    new_records = collections.defaultdict(list)
+    for code, values in iter_block_records(old_buffer, old_invoice):
+        old_records[code].append(values)
+    for code, values in iter_block_records(new_buffer, new_invoice):
+        new_records[code].append(values)
+
+    changes = []
+    for code in INVOICE_RECORDS:
+        old_list, new_list = old_records.get(code, []), new_records.get(code, [])
+        for index in range(max(len(old_list), len(new_list))):
+            old_values = old_list[index] if index < len(old_list) else None
+            new_values = new_list[index] if index < len(new_list) else None
+            if old_values is None or new_values is None:
+                changes.append({
+                    "record": code, "index": index, "field": None,
+                    "old": "presente" if old_values else "ausente", "new": "presente" if new_values else "ausente",
+                })
+                continue
+            for field_name, old_value in old_values.items():
+                if old_value != new_values[field_name]:
+                    changes.append({
+                        "record": code, "index": index, "field": field_name,
+                        "old": _value_text(old_value), "new": _value_text(new_values[field_name]),
+                    })
+    return changes
+
+
+def diff(old_buffer, old_scan, new_buffer, new_scan, max_changed=500):
+    """ Diferencias entre dos archivos ya recorridos con ``scan``: comprobantes agregados, quitados y
+    modificados (con el detalle por campo de los primeros ``max_changed``), y los cambios de totales. """
+    added = [key for key in new_scan.invoices if key not in old_scan.invoices]
+    removed = [key for key in old_scan.invoices if key not in new_scan.invoices]
+    changed_keys = [
+        key for key, invoice in new_scan.invoices.items()
+        if key in old_scan.invoices and old_scan.invoices[key].digest != invoice.digest
+    ]
+    changed = [
+        {"invoice": key, "changes": diff_invoice(old_buffer, old_scan.invoices[key], new_buffer, new_scan.invoices[key])}
+        for key in changed_keys[:max_changed]
+    ]
+    return {
+        "added": added,
+        "removed": removed,
+        "changed_count": len(changed_keys),
+        "changed": changed,
+        "record_counts": {
+            code: [old_scan.record_counts.get(code, 0), new_scan.record_counts.get(code, 0)]
+            for code in sorted(set(old_scan.record_counts) | set(new_scan.record_counts))
+        },
+        "importe_total": [old_scan.importe_total, new_scan.importe_total],
+        "payments_total": [old_scan.payments_total, new_scan.payments_total],
+    }
+
+
+def expected_invoices(datas, cuit_informante):
+    """ Generador de ``(nombre, clave, importe total, total de pagos, cantidad de registros)`` que debería tener el
+    archivo para cada ``InvoiceExportData``, armando sus registros y volviendo a leer solo el 02. La cantidad de
+    registros es un dict con los repetibles (03, 06, 07 y 08). """
+    for data in datas:
+        try:
+            records = invoice_records(data, cuit_informante)
+            _layout, values = next(records)
+            record = RECORD_02.parse(RECORD_02.format(values))
+            record_counts = collections.Counter(layout.code for layout, _values in records)
+        except (FieldOverflowError, ValueError, SyntaxError, TypeError): # TypeError: sin XML ni snapshot
+            yield data.name, None, None, None, None
+            continue
+        payments = data.payments or [(data.payment_type, data.amount_total)]
+        yield (data.name, invoice_key(record), record["importe_total"], sum(amount for _type, amount in payments),
+               {code: record_counts[code] for code in REPEATED_RECORDS})
+
+
+def verify(result, expected, cuit_informante, max_issues=200):
+    """ Compara el resultado de ``scan`` con lo esperado (``expected_invoices``) y devuelve la lista de problemas:
+    errores de formato, CUIT de la cabecera, comprobantes faltantes o de más y diferencias de importes y de
+    cantidad de registros. """
+    issues = list(result.errors)
+    if result.header is not None:
+        if result.header["cuit_informante"].strip() != cuit_informante:
+            issues.append("La cabecera informa el CUIT %s y el de la compañía es %s" % (
+                result.header["cuit_informante"].strip(), cuit_informante))
+        sin_movimiento = "0" if result.invoices else "1"
+        if result.header["sin_movimiento"] != sin_movimiento:
+            issues.append("La cabecera indica sin movimiento = %s y el archivo tiene %s comprobantes" % (
+                result.header["sin_movimiento"], len(result.invoices)))
+
+    found = set()
+    for name, key, importe_total, payments_total, record_counts in expected:
+        if key is None:
+            issues.append("%s: no se pudieron armar sus datos para compararlos" % name)
+            continue
+        invoice = result.invoices.get(key)
+        if invoice is None:
+            issues.append("%s: no está en el archivo (%s)" % (name, key))
+            continue
+        found.add(key)
+        if invoice.importe_total != importe_total:
+            issues.append("%s: el importe total del archivo es %s y debería ser %s" % (
+                name, _cents(invoice.importe_total), _cents(importe_total)))
+        if invoice.payments_total != payments_total:
+            issues.append("%s: los pagos del archivo suman %s y deberían sumar %s" % (
+                name, _cents(invoice.payments_total), _cents(payments_total)))
+        for code, count in (record_counts or {}).items():
+            if invoice.record_counts[code] != count:
+                issues.append("%s: el archivo tiene %s registros %s y debería tener %s" % (
+                    name, invoice.record_counts[code], code, count))
+    extra = [key for key in result.invoices if key not in found]
+    if extra:
+        issues.append("El archivo tiene %s comprobantes que no están en el reporte: %s" % (len(extra), ", ".join(extra[:20])))
+    return issues[:max_issues]
+
+
+def _cents(value):
+    return "%s%d.%02d" % ("-" if value < 0 else "", abs(value) // 100, abs(value) % 100)
@@ -0,0 +1,175 @@
+# l10n_ar_afip_iva_tur/fixed_width.py
+"""
+Motor de registros de ancho fijo.
+
+Cada tipo de registro se declara una sola vez como una lista de ``Field`` (ancho, relleno,
+alineación y escala numérica) y se compila en una función que arma la línea validando que
+ningún campo exceda su ancho, y en validaciones por campo que permiten revisar los valores
+sin formatearlos.
+"""
+
+from decimal import Decimal
+
+
+class FieldOverflowError(ValueError):
+    """ Un valor no entra en el ancho declarado para su campo. """
+
+    def __init__(self, record_code, field_name, width, value, text, invoice_name=None):
+        self.record_code = record_code
+        self.field_name = field_name
+        self.width = width
+        self.value = value
+        self.text = text
+        # Lo completa quien arma los registros, para ubicar el comprobante
+        self.invoice_name = invoice_name
+        super().__init__(
+            "Registro %s, campo %s: el valor %r ocupa %s caracteres y el campo admite %s"
+            % (record_code, field_name, text, len(text), width)
+        )
+
+    def __reduce__(self):
+        # Para poder devolverla desde los procesos del pool
+        return self.__class__, (self.record_code, self.field_name, self.width, self.value, self.text, self.invoice_name)
+
+
+class Field:
+    """ Campo de un registro de ancho fijo.
+
+    :param name: nombre del valor a tomar del diccionario que recibe el formateador.
+    :param width: ancho del campo.
+    :param pad: carácter de relleno. Con ``'0'`` y alineación a derecha se usa ``zfill``
+        (el signo queda adelante de los ceros).
+    :param align: ``'left'`` o ``'right'``.
+    :param scale: cantidad de decimales implícitos. El valor es un entero ya escalado
+        (por ejemplo centavos con ``scale=2``) y solo se rellena con ceros.
+    :param value: valor fijo del campo; si se indica no se lee del diccionario.
+    """
+
+    def __init__(self, name, width, pad=" ", align="left", scale=None, value=None):
+        self.name = name
+        self.width = width
+        self.pad = pad
+        self.align = align
+        self.scale = scale
+        self.value = value
+
+    @classmethod
+    def text(cls, name, width, **kwargs):
+        return cls(name, width, **kwargs)
+
+    @classmethod
+    def number(cls, name, width, **kwargs):
+        return cls(name, width, pad="0", align="right", **kwargs)
+
+    @classmethod
+    def amount(cls, name, width, scale=2, **kwargs):
+        return cls(name, width, pad="0", align="right", scale=scale, **kwargs)
+
+    @classmethod
+    def const(cls, value):
+        return cls(None, len(value), value=value)
+
+    def _compile(self, record_code):
+        """ Devuelve la función ``valor -> texto`` del campo. """
+        width = self.width
+        name = self.name
+
+        def check(value, text):
+            if len(text) > width:
+                raise FieldOverflowError(record_code, name, width, value, text)
+            return text
+
+        if self.value is not None:
+            constant = check(self.value, self.value)
+            return lambda _value: constant
+
+        if self.scale is not None:
+            def convert(value):
+                return check(value, str(value or 0).zfill(width))
+        elif self.pad == "0" and self.align == "right":
+            def convert(value):
+                return check(value, ("" if value is None or value is False else str(value)).zfill(width))
+        elif self.align == "right":
+            pad = self.pad
+
+            def convert(value):
+                return check(value, ("" if value is None or value is False else str(value)).rjust(width, pad))
+        else:
+            pad = self.pad
+
+            def convert(value):
+                return check(value, ("" if value is None or value is False else str(value)).ljust(width, pad))
+        return convert
+
+    def _compile_check(self):
+        """ Devuelve la función ``valor -> mensaje de error o None`` que valida el valor sin armar el texto
+        (ancho y, en los campos numéricos, que sea un número), o None si el campo es fijo. """
+        if self.value is not None:
+            return None
+        width = self.width
+
+        if self.scale is not None:
+            scale = self.scale
+            low, high = -(10 ** (width - 1) - 1), 10 ** width - 1
+
+            def check(value):
+                value = value or 0
+                if not isinstance(value, int):
+                    return "el importe %r no es un entero escalado" % (value,)
+                if not low <= value <= high:
+                    return "el importe %s excede los %s dígitos del campo" % (Decimal(value).scaleb(-scale), width)
+                return None
+            return check
+
+        numeric = self.pad == "0" and self.align == "right"
+
+        def check(value):
+            text = "" if value is None or value is False else str(value)
+            if len(text) > width:
+                return "el valor %r ocupa %s caracteres y el campo admite %s" % (text, len(text), width)
+            if numeric and text and not text.isdigit():
+                return "el valor %r no es numérico" % text
+            return None
+        return check
+
+
+class RecordLayout:
+    """ Tipo de registro: código (primeros caracteres de la línea) y campos en orden. """
+
+    def __init__(self, code, fields):
+        self.code = code
+        self.fields = fields
+        self.width = len(code) + sum(field.width for field in fields)
+        self.format = self.compile()
+        self.checks = [(field.name, check) for field, check in ((f, f._compile_check()) for f in fields) if check]
+        # (campo, desde, hasta, es importe) de cada campo con nombre, para leer líneas ya armadas
+        self.slices = []
+        start = len(code)
+        for field in fields:
+            if field.name:
+                self.slices.append((field.name, start, start + field.width, field.scale is not None))
+            start += field.width
+
+    def compile(self):
+        """ Devuelve la función ``dict -> línea`` del registro. """
+        code = self.code
+        converters = [(field.name, field._compile(code)) for field in self.fields]
+
+        def format_record(values):
+            get = values.get
+            return code + "".join([convert(get(name)) for name, convert in converters])
+
+        return format_record
+
+    def parse(self, line):
+        """ Devuelve {campo: valor} de una línea de este registro: el texto tal cual está en la línea
+        (con relleno) y los importes como enteros escalados. """
+        return {
+            name: int(line[start:end]) if amount else line[start:end]
+            for name, start, end, amount in self.slices
+        }
+
+    def validate(self, values):
+        """ Devuelve la lista de ``(campo, mensaje)`` de los valores de ``values`` que no entran en el registro. """
+        get = values.get
+        return [(name, message) for name, check in self.checks for message in (check(get(name)),) if message]
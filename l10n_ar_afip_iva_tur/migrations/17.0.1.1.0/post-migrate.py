@@ -0,0 +1,27 @@
+# l10n_ar_afip_iva_tur/migrations/17.0.1.1.0/post-migrate.py
+
+import logging
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """ Genera el snapshot WSCT de los comprobantes T ya autorizados. """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("""
+        SELECT move.id
+          FROM account_move move
+          JOIN l10n_latam_document_type doc_type ON doc_type.id = move.l10n_latam_document_type_id
+     LEFT JOIN afip_wsct_comprobante snapshot ON snapshot.move_id = move.id
+         WHERE move.state = 'posted'
+           AND doc_type.l10n_ar_letter = 'T'
+           AND move.afip_auth_code IS NOT NULL
+           AND move.afip_xml_request IS NOT NULL
+           AND move.afip_xml_response IS NOT NULL
+           AND snapshot.id IS NULL
+    """)
+    move_ids = [row[0] for row in cr.fetchall()]
+    _logger.info("Generando snapshot WSCT de %s comprobantes T", len(move_ids))
+    for move in env['account.move'].browse(move_ids):
+        move._create_wsct_comprobante_snapshot(move.afip_xml_request, move.afip_xml_response)
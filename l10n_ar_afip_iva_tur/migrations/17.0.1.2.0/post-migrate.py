@@ -0,0 +1,19 @@
+# l10n_ar_afip_iva_tur/migrations/17.0.1.2.0/post-migrate.py
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """ Carga la pertenencia de comprobantes a reportes a partir del many2many ``invoice_ids``.
+    Si un comprobante quedó en más de un reporte se conserva el reporte más antiguo. """
+    cr.execute("""
+        INSERT INTO afip_iva_tur_report_line (report_id, move_id, create_uid, write_uid, create_date, write_date)
+        SELECT DISTINCT ON (rel.account_move_id)
+               rel.afip_iva_tur_report_id, rel.account_move_id, 1, 1, now() at time zone 'UTC', now() at time zone 'UTC'
+          FROM account_move_afip_iva_tur_report_rel rel
+      ORDER BY rel.account_move_id, rel.afip_iva_tur_report_id
+            ON CONFLICT (move_id) DO NOTHING
+    """)
+    _logger.info("Se cargaron %s comprobantes en afip_iva_tur_report_line", cr.rowcount)
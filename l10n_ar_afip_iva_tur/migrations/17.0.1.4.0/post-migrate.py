@@ -0,0 +1,52 @@
+# l10n_ar_afip_iva_tur/migrations/17.0.1.4.0/post-migrate.py
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """ Pasa los comprobantes de los reportes del many2many ``invoice_ids`` a ``afip.iva.tur.report.line``
+    (que ya los replicaba) y mueve los pagos guardados en ``export_payments`` a las líneas. Los demás datos de
+    exportación de las líneas se calculan en la próxima actualización o generación del archivo. """
+    cr.execute("SELECT to_regclass('account_move_afip_iva_tur_report_rel')")
+    if cr.fetchone()[0]:
+        cr.execute("""
+            INSERT INTO afip_iva_tur_report_line (report_id, move_id, create_uid, write_uid, create_date, write_date)
+            SELECT DISTINCT ON (rel.account_move_id)
+                   rel.afip_iva_tur_report_id, rel.account_move_id, 1, 1, now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM account_move_afip_iva_tur_report_rel rel
+          ORDER BY rel.account_move_id, rel.afip_iva_tur_report_id
+                ON CONFLICT (move_id) DO NOTHING
+        """)
+        _logger.info("Se agregaron %s comprobantes faltantes en afip_iva_tur_report_line", cr.rowcount)
+        cr.execute("DROP TABLE account_move_afip_iva_tur_report_rel")
+
+    # Las líneas agregadas por SQL no tienen calculados los campos relacionados guardados
+    cr.execute("""
+        UPDATE afip_iva_tur_report_line line
+           SET name = move.name,
+               invoice_date = move.invoice_date,
+               partner_id = move.partner_id,
+               company_id = report.company_id
+          FROM account_move move, afip_iva_tur_report report
+         WHERE move.id = line.move_id
+           AND report.id = line.report_id
+           AND line.name IS NULL
+    """)
+
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'afip_iva_tur_report' AND column_name = 'export_payments'
+    """)
+    if cr.fetchone():
+        cr.execute("""
+            UPDATE afip_iva_tur_report_line line
+               SET payments = report.export_payments::jsonb -> line.move_id::text
+              FROM afip_iva_tur_report report
+             WHERE report.id = line.report_id
+               AND report.export_payments IS NOT NULL
+        """)
+
+    # Reemplazado por el índice (report_id, move_id) de la línea
+    cr.execute("DROP INDEX IF EXISTS afip_iva_tur_report_line__report_id_index")
@@ -0,0 +1,7 @@
+# l10n_ar_afip_iva_tur/migrations/17.0.1.5.0/post-migrate.py
+
+
+def migrate(cr, version):
+    """ Borra el índice de ``move_id`` de las líneas, que duplicaba el índice de la restricción
+    ``unique(move_id)``. """
+    cr.execute("DROP INDEX IF EXISTS afip_iva_tur_report_line__move_id_index")
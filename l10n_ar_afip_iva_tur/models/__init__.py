@@ -1,4 +1,8 @@
 # l10n_ar_afip_iva_tur/models/__init__.py
 from . import afip_iva_tur_report
+from . import afip_iva_tur_report_line
+from . import afip_iva_tur_report_job
+from . import afip_wsct_comprobante
+from . import account_move
 from . import res_company
 from . import account_journal
\ No newline at end of file
@@ -0,0 +1,26 @@
+# l10n_ar_afip_iva_tur/models/account_move.py
+
+from odoo import models
+import logging
+
+_logger = logging.getLogger(__name__)
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def wsct_request_autorization(self, ws):
+        res = super().wsct_request_autorization(ws)
+        if ws.CAE:
+            self._create_wsct_comprobante_snapshot(ws.XmlRequest, ws.XmlResponse)
+        return res
+
+    def _create_wsct_comprobante_snapshot(self, xml_request, xml_response):
+        """ Guarda el comprobante autorizado ya parseado para que el exportable de IVA Turismo no tenga que
+        volver a leer el XML. Si el XML no se puede leer solo se registra el error: el CAE ya fue otorgado
+        y el exportable vuelve a leer el XML del comprobante. """
+        self.ensure_one()
+        try:
+            return self.env['afip.wsct.comprobante'].sudo()._create_from_xml(self, xml_request, xml_response)
+        except (ValueError, TypeError, SyntaxError): # ET.ParseError y los errores de lxml son SyntaxError
+            _logger.exception("No se pudo guardar el snapshot WSCT del comprobante %s", self.display_name)
+            return self.env['afip.wsct.comprobante']
@@ -2,14 +2,58 @@
 
 from odoo import fields, models, api, _
 from odoo.exceptions import ValidationError, UserError
+import collections
+import contextlib
 import datetime
-import io
-import base64
+import hashlib
 import logging
-from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import parse_autorizar_comprobante, format_fixed_decimal, parse_afip_response
+import os
+import shutil
+import tempfile
+import threading
+from markupsafe import Markup
+from odoo.tools import config
+from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import to_scaled
+from odoo.addons.l10n_ar_afip_iva_tur.fixed_width import FieldOverflowError
+from odoo.addons.l10n_ar_afip_iva_tur.f8089 import (
+    RECORD_02, InvoiceExportData, render_header, render_invoice_block, iter_invoice_blocks_parallel, validate_invoice,
+    validate_invoices,
+)
+from odoo.addons.l10n_ar_afip_iva_tur.f8089_reader import diff, map_file, open_buffer, scan, verify
+from odoo.addons.l10n_ar_afip_iva_tur.profiling import profiled, stage
 
 _logger = logging.getLogger(__name__)
 
+# Tamaño (en caracteres) de cada bloque que se vuelca al archivo temporal del exportable
+_EXPORT_CHUNK_SIZE = 64 * 1024
+# Tamaño (en bytes) de los bloques con que se copia el archivo temporal al filestore
+_EXPORT_COPY_SIZE = 1024 * 1024
+# Cantidad de comprobantes que se leen por consulta al armar el exportable
+_EXPORT_BATCH_SIZE = 1000
+# Códigos de documento AFIP de IVA Turismo
+_AFIP_IVA_TUR_DOC_CODES = ['195', '196', '197', '362']
+# Cantidad máxima de problemas que se listan en el error de validación del exportable
+_EXPORT_MAX_ISSUES = 100
+# Cantidad máxima de diferencias que se listan en el chatter al regenerar el exportable
+_EXPORT_MAX_DIFF_LINES = 20
+# Campos que definen qué comprobantes corresponden al reporte
+_REFRESH_SCOPE_FIELDS = {'date_from', 'date_to', 'company_id'}
+# Margen que se vuelve a revisar antes de la última actualización incremental (y antes de la fecha en que
+# se armó el bloque de registros de cada línea, ver ``afip.iva.tur.report.line._get_stale_move_ids``)
+_REFRESH_WATERMARK_MARGIN = datetime.timedelta(minutes=5)
+
+
+def _line_export_values(data, block):
+    """ Datos de exportación de una línea (ver ``afip.iva.tur.report.line._store_export_values``), leídos del
+    registro 02 del bloque ya armado. ``block`` es False si el comprobante no se pudo armar. """
+    if not block:
+        return (data.move_id, None, None, None, None, None)
+    record = RECORD_02.parse(block[:block.index('\r\n')])
+    return (
+        data.move_id, int(record['punto_venta']), int(record['numero_comprobante']),
+        record['codigo_autorizacion'].strip(), record['importe_total'], block,
+    )
+
 class AfipIvaTurReport(models.Model):
     _name = 'afip.iva.tur.report'
     _description = 'AFIP IVA Turismo Report'
@@ -57,12 +101,18 @@ class AfipIvaTurReport(models.Model):
         help="Estado del reporte: Borrador (se pueden editar los datos), Generado (listo para presentar), Presentado (reporte enviado a AFIP)."
     )
     
-    invoice_ids = fields.Many2many(
-        'account.move',
+    line_ids = fields.One2many(
+        'afip.iva.tur.report.line',
+        'report_id',
         string='Comprobantes Incluidos',
-        domain=[('move_type', '=', 'out_invoice'), ('state', '=', 'posted')],
+        copy=False,
         help="Listado de comprobantes Tipo T incluidos en este reporte. Se completará automáticamente al generar el borrador."
     )
+
+    invoice_count = fields.Integer(
+        string='Cantidad de Comprobantes',
+        compute='_compute_invoice_count',
+    )
     
     exported_file = fields.Binary(
         string='Archivo TXT Exportado',
@@ -82,6 +132,22 @@ class AfipIvaTurReport(models.Model):
         help="Fecha en que el reporte fue marcado como presentado."
     )
     
+    last_refresh_date = fields.Datetime(
+        string='Última Actualización',
+        readonly=True,
+        copy=False,
+        help="Momento de la última actualización de comprobantes. Las actualizaciones siguientes solo revisan "
+             "los comprobantes modificados desde entonces; use 'Reconstruir Comprobantes' para una búsqueda completa."
+    )
+
+    export_diff = fields.Json(
+        string='Diferencias con la Remesa Anterior',
+        readonly=True,
+        copy=False,
+        help="Comprobantes agregados, quitados y modificados (campo por campo) respecto del archivo que reemplazó "
+             "la última generación."
+    )
+
     sequence = fields.Integer(
         string='Número de Remesa',
         readonly=True,
@@ -89,6 +155,35 @@ class AfipIvaTurReport(models.Model):
         help='Número de intentos para presentar el reporte.'        
     )
 
+    job_ids = fields.One2many(
+        'afip.iva.tur.report.job',
+        'report_id',
+        string='Procesos en Segundo Plano',
+        readonly=True,
+    )
+
+    job_state = fields.Selection(
+        [
+            ('queued', 'En cola'),
+            ('running', 'En ejecución'),
+            ('done', 'Terminado'),
+            ('failed', 'Error'),
+        ],
+        string='Estado del Proceso',
+        compute='_compute_job_status',
+        help="Estado del último proceso en segundo plano del reporte."
+    )
+
+    job_progress = fields.Float(
+        string='Progreso del Proceso (%)',
+        compute='_compute_job_status',
+    )
+
+    job_message = fields.Char(
+        string='Detalle del Proceso',
+        compute='_compute_job_status',
+    )
+
     @api.depends('date_from', 'date_to')
     def _compute_name(self):
         for rec in self:
@@ -97,19 +192,135 @@ class AfipIvaTurReport(models.Model):
             else:
                 rec.name = False
 
+    @api.depends('line_ids')
+    def _compute_invoice_count(self):
+        counts = dict(self.env['afip.iva.tur.report.line']._read_group(
+            [('report_id', 'in', self.ids)], ['report_id'], ['__count'],
+        ))
+        for rec in self:
+            rec.invoice_count = counts.get(rec, 0)
+
+    @api.depends('job_ids.state', 'job_ids.progress', 'job_ids.message')
+    def _compute_job_status(self):
+        for rec in self:
+            last_job = rec.job_ids[:1] # job_ids se ordena del más nuevo al más viejo
+            rec.job_state = last_job.state
+            rec.job_progress = last_job.progress
+            rec.job_message = last_job.message
+
     @api.constrains('date_from', 'date_to')
     def _check_dates(self):
         for rec in self:
             if rec.date_from and rec.date_to and rec.date_from > rec.date_to:
                 raise ValidationError(_("La 'Fecha Desde' no puede ser posterior a la 'Fecha Hasta'."))
 
+    def write(self, vals):
+        # La actualización incremental solo mira los comprobantes modificados: si cambia el período o la
+        # compañía, la próxima actualización tiene que volver a buscar todos los comprobantes
+        if _REFRESH_SCOPE_FIELDS & set(vals) and 'last_refresh_date' not in vals:
+            vals = dict(vals, last_refresh_date=False)
+        return super().write(vals)
+
+    def _check_invoice_conflicts(self, invoices):
+        """ Lanza un error si alguno de ``invoices`` ya está incluido en otro reporte. """
+        self.ensure_one()
+        conflicts = self.env['afip.iva.tur.report.line']._get_conflicts(invoices.ids, self)
+        if conflicts:
+            duplicate_messages = [
+                _("La factura %s ya está incluida en el reporte(s): %s") % (move_name, f"{report_name} (ID: {report_id})")
+                for _move_id, move_name, report_id, report_name in conflicts
+            ]
+            raise UserError(_(
+                "No se pueden agregar los siguientes comprobantes por estar ya incluidos en otros reportes de IVA Turismo:\n\n%s"
+            ) % "\n".join(duplicate_messages))
+
+    def _update_invoice_lines(self, add_ids=(), remove_ids=()):
+        """ Agrega y quita comprobantes del reporte (los conflictos se revisan antes) y precalcula los datos
+        de exportación de los agregados. """
+        self.ensure_one()
+        Line = self.env['afip.iva.tur.report.line'].sudo()
+        if remove_ids:
+            Line.search([('report_id', '=', self.id), ('move_id', 'in', list(remove_ids))]).unlink()
+        if add_ids:
+            Line.create([{'report_id': self.id, 'move_id': move_id} for move_id in add_ids])
+            with stage('precompute'):
+                self._precompute_lines(list(add_ids))
+
+    def action_open_lines(self):
+        """ Abre los comprobantes del reporte en una lista paginada. """
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Comprobantes de %s') % self.name,
+            'res_model': 'afip.iva.tur.report.line',
+            'view_mode': 'tree',
+            'domain': [('report_id', '=', self.id)],
+            'context': {'default_report_id': self.id},
+        }
+
+    def _check_no_active_job(self):
+        """ Impide correr una acción mientras el reporte tiene un proceso en cola o en ejecución
+        (salvo desde ese mismo proceso). """
+        self.ensure_one()
+        active_job = self.env['afip.iva.tur.report.job'].search([
+            ('report_id', '=', self.id),
+            ('state', 'in', ['queued', 'running']),
+            ('id', '!=', self.env.context.get('afip_iva_tur_job_id') or 0),
+        ], limit=1)
+        if active_job:
+            raise UserError(_("El reporte ya tiene un proceso en segundo plano (%s) %s. Espere a que termine.") % (
+                dict(active_job._fields['job_action'].selection)[active_job.job_action],
+                dict(active_job._fields['state'].selection)[active_job.state].lower(),
+            ))
+
+    def _report_job_progress(self, progress, message):
+        """ Informa el avance si la acción corre como proceso en segundo plano. """
+        job_id = self.env.context.get('afip_iva_tur_job_id')
+        if job_id:
+            self.env['afip.iva.tur.report.job']._report_progress(job_id, progress, message)
+
+    def _enqueue_job(self, job_action):
+        self.ensure_one()
+        self.env['afip.iva.tur.report.job']._enqueue(self, job_action)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Proceso en Segundo Plano'),
+                'message': _('El proceso quedó en cola. El avance se muestra en el reporte y el resultado en el chatter.'),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def action_enqueue_update_invoices(self):
+        """ Acción para actualizar los comprobantes en segundo plano. """
+        self.ensure_one()
+        return self._enqueue_job('update')
+
+    def action_enqueue_rebuild_invoices(self):
+        """ Acción para reconstruir los comprobantes en segundo plano. """
+        self.ensure_one()
+        return self._enqueue_job('rebuild')
+
+    def action_enqueue_generate_file(self):
+        """ Acción para generar el archivo TXT en segundo plano. """
+        self.ensure_one()
+        if not self.invoice_count:
+            raise UserError(_("No hay comprobantes asociados a este reporte para generar el archivo."))
+        return self._enqueue_job('generate')
+
     def action_clear_invoices(self):
         """ Acción para eliminar todos los comprobantes de la lista si el reporte está en borrador. """
         self.ensure_one()
         if self.state == 'presented':
             raise UserError(_("No puede limpiar los comprobantes de un reporte ya presentado. Cree uno nuevo si necesita corregir."))
+        self._check_no_active_job()
         if self.state == 'draft':
-            self.invoice_ids = [(5, 0, 0)] # Comando (5, 0, 0) vacía completamente el many2many
+            self.write({
+                'line_ids': [(5, 0, 0)], # Comando (5, 0, 0) elimina todas las líneas
+                'last_refresh_date': False,
+            })
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
@@ -123,28 +334,17 @@ class AfipIvaTurReport(models.Model):
         else:
             pass
     
-    # --- CAMBIO CLAVE AQUÍ: Renombramos action_generate_draft a action_update_invoices ---
-    def action_update_invoices(self):
-        """ Acción para actualizar la lista de comprobantes del reporte, añadiendo los no duplicados. """
-        self.ensure_one()
-        afip_iva_tur_doc_codes = ['195', '196', '197', '362']
-
-        doc_type_ids = self.env['l10n_latam.document.type'].search([
-            ('code', 'in', afip_iva_tur_doc_codes),
+    def _get_iva_tur_document_type_ids(self):
+        """ Tipos de documento AFIP de IVA Turismo (letra 'T'). """
+        return self.env['l10n_latam.document.type'].search([
+            ('code', 'in', _AFIP_IVA_TUR_DOC_CODES),
             ('l10n_ar_letter', '=', 'T'),
         ]).ids
 
-        if not doc_type_ids:
-            self.invoice_ids = [(5, 0, 0)]
-            self.state = 'draft'
-            return {
-                'warning': {
-                    'title': _("Advertencia"),
-                    'message': _("No se encontraron tipos de documento AFIP configurados para 'IVA Turismo' (códigos: %s, letra 'T')." % afip_iva_tur_doc_codes),
-                }
-            }
-
-        domain = [
+    def _get_invoice_domain(self, doc_type_ids):
+        """ Dominio de los comprobantes que corresponden al período del reporte. """
+        self.ensure_one()
+        return [
             ('company_id', '=', self.company_id.id),
             ('move_type', '=', 'out_invoice'),
             ('state', '=', 'posted'),
@@ -153,44 +353,18 @@ class AfipIvaTurReport(models.Model):
             ('l10n_latam_document_type_id', 'in', doc_type_ids),
         ]
 
-        # Facturas candidatas que Odoo encuentra para este período y criterios (invoices que *podrían* ir en este reporte)
-        invoices_found_in_period = self.env['account.move'].search(domain)
-        
-        # --- Lógica MEJORADA para identificar y reportar *solo* las duplicadas conflictivas ---
-        # 1. Obtener todas las facturas que *ya están* en *otros* reportes (excluyendo el reporte actual)
-        all_invoices_in_other_reports_excluding_self = self.env['afip.iva.tur.report'].search([
-            ('id', '!=', self.id), # Excluir el reporte que estamos generando/editando
-        ]).mapped('invoice_ids') # Esto da un recordset de todas las facturas ya usadas en otros reportes
-
-        # 2. Encontrar la intersección: cuáles de las 'invoices_found_in_period' (candidatas para ESTE reporte)
-        #    ya se encuentran en 'all_invoices_in_other_reports_excluding_self'.
-        #    Esto nos da las facturas que *realmente causan el conflicto*.
-        
-        conflicting_invoices = invoices_found_in_period & all_invoices_in_other_reports_excluding_self
-
-        if conflicting_invoices:
-            duplicate_messages = []
-            for inv_conflict in conflicting_invoices:
-                # Para cada factura en conflicto, encontrar los reportes específicos donde ya está
-                reports_containing_this_invoice = self.env['afip.iva.tur.report'].search([
-                    ('id', '!=', self.id), # Excluir el reporte actual
-                    ('invoice_ids', 'in', inv_conflict.id) # Buscar reportes que contengan esta factura
-                ])
-                report_info = ", ".join([f"{r.name} (ID: {r.id})" for r in reports_containing_this_invoice])
-                duplicate_messages.append(
-                    _("La factura %s ya está incluida en el reporte(s): %s") % (inv_conflict.name, report_info)
-                )
-            
-            raise UserError(_(
-                "No se pueden agregar los siguientes comprobantes por estar ya incluidos en otros reportes de IVA Turismo:\n\n%s"
-            ) % "\n".join(duplicate_messages))
-        # --- FIN Lógica MEJORADA ---
+    def _get_no_document_types_warning(self):
+        return {
+            'warning': {
+                'title': _("Advertencia"),
+                'message': _("No se encontraron tipos de documento AFIP configurados para 'IVA Turismo' (códigos: %s, letra 'T')." % _AFIP_IVA_TUR_DOC_CODES),
+            }
+        }
 
-        # Si no hay conflictos, asignamos todas las facturas encontradas en el período a este reporte
-        self.invoice_ids = [(6, 0, invoices_found_in_period.ids)]
+    def _get_update_invoices_result(self):
+        """ Estado y acción de retorno luego de actualizar los comprobantes. """
         self.state = 'generated' # Si se actualizaron los comprobantes, el reporte pasa a generado
-        
-        if not invoices_found_in_period:
+        if not self.invoice_count:
             self.state = 'draft' # Si no se encontraron facturas, queda en borrador
             return {
                 'warning': {
@@ -198,7 +372,6 @@ class AfipIvaTurReport(models.Model):
                     'message': _("No se encontraron comprobantes Tipo T para el período seleccionado."),
                 }
             }
-        
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'afip.iva.tur.report',
@@ -208,206 +381,475 @@ class AfipIvaTurReport(models.Model):
             'context': self.env.context,
             'flags': {'action_buttons': True, 'reload': True},
         }
-    # --- FIN CAMBIO CLAVE: Renombramos action_generate_draft a action_update_invoices ---
 
-    def action_generate_file(self):
-        """ Acción para generar el archivo TXT a partir de los comprobantes ya cargados. """
+    @profiled
+    def action_update_invoices(self):
+        """ Acción para actualizar la lista de comprobantes del reporte, añadiendo los no duplicados.
+        Si el reporte ya fue actualizado antes, solo se procesan los comprobantes modificados desde entonces. """
+        self.ensure_one()
+        self._check_no_active_job()
+        if self.last_refresh_date and self.invoice_count:
+            return self._update_invoices_incremental()
+        return self.action_rebuild_invoices()
+
+    @profiled
+    def action_rebuild_invoices(self):
+        """ Acción para volver a buscar todos los comprobantes del período y reemplazar la lista del reporte. """
+        self.ensure_one()
+        self._check_no_active_job()
+        refresh_date = self.env.cr.now()
+        doc_type_ids = self._get_iva_tur_document_type_ids()
+
+        if not doc_type_ids:
+            self.line_ids = [(5, 0, 0)]
+            self.state = 'draft'
+            return self._get_no_document_types_warning()
+
+        # Facturas candidatas que Odoo encuentra para este período y criterios (invoices que *podrían* ir en este reporte)
+        with stage('search_invoices'):
+            invoices_found_in_period = self.env['account.move'].search(self._get_invoice_domain(doc_type_ids))
+        self._report_job_progress(50.0, _("%s comprobantes encontrados en el período") % len(invoices_found_in_period))
+
+        # Comprobantes candidatos que ya pertenecen a otro reporte (una sola consulta sobre el índice único)
+        with stage('conflict_check'):
+            self._check_invoice_conflicts(invoices_found_in_period)
+
+        # Si no hay conflictos, el reporte queda con todas las facturas encontradas en el período
+        current_ids = set(self.env['afip.iva.tur.report.line']._get_move_ids(self))
+        found_ids = set(invoices_found_in_period.ids)
+        with stage('write_invoices'):
+            self._update_invoice_lines(
+                add_ids=[move_id for move_id in invoices_found_in_period.ids if move_id not in current_ids],
+                remove_ids=sorted(current_ids - found_ids),
+            )
+            self.last_refresh_date = refresh_date
+        return self._get_update_invoices_result()
+
+    def _update_invoices_incremental(self):
+        """ Agrega o quita solo los comprobantes T modificados (publicados, cancelados, vueltos a borrador,
+        cambiados de fecha) desde la última actualización, según su ``write_date``. """
+        self.ensure_one()
+        refresh_date = self.env.cr.now()
+        doc_type_ids = self._get_iva_tur_document_type_ids()
+        if not doc_type_ids:
+            return self._get_no_document_types_warning()
+
+        # Se vuelve a mirar un margen antes de la marca: agregar o quitar es idempotente y así no se pierden
+        # comprobantes de transacciones que terminaron después de la actualización anterior.
+        watermark = self.last_refresh_date - _REFRESH_WATERMARK_MARGIN
+        Move = self.env['account.move']
+        with stage('search_invoices'):
+            changed = Move.search([
+                ('company_id', '=', self.company_id.id),
+                ('move_type', '=', 'out_invoice'),
+                ('l10n_latam_document_type_id', 'in', doc_type_ids),
+                ('write_date', '>', watermark),
+            ])
+            belonging = changed.filtered_domain(self._get_invoice_domain(doc_type_ids))
+            current_ids = set(self.env['afip.iva.tur.report.line'].search([
+                ('report_id', '=', self.id),
+                ('move_id', 'in', changed.ids),
+            ]).move_id.ids)
+        to_add = belonging.filtered(lambda move: move.id not in current_ids)
+        to_remove_ids = current_ids - set(belonging.ids)
+        self._report_job_progress(50.0, _("%s comprobantes modificados: %s a agregar, %s a quitar") % (
+            len(changed), len(to_add), len(to_remove_ids)))
+
+        with stage('conflict_check'):
+            self._check_invoice_conflicts(to_add)
+        with stage('write_invoices'):
+            self._update_invoice_lines(add_ids=to_add.ids, remove_ids=sorted(to_remove_ids))
+            self.last_refresh_date = refresh_date
+        _logger.info(
+            "Actualización incremental de %s: %s comprobantes modificados, %s agregados, %s quitados",
+            self.name, len(changed), len(to_add), len(to_remove_ids),
+        )
+        return self._get_update_invoices_result()
+
+
+    def _iter_export_data(self, move_ids=None):
+        """ Generador de ``InvoiceExportData`` para los comprobantes del reporte (o solo ``move_ids``), con los
+        pagos guardados en sus líneas (ver ``_refresh_line_payments``).
+        Los datos se leen por lotes de ``_EXPORT_BATCH_SIZE`` comprobantes con unas pocas consultas por lote,
+        para que el armado de los registros no haga accesos al ORM por comprobante. """
+        self.ensure_one()
+        self.env.flush_all()
+        if move_ids is None:
+            move_ids = self.env['afip.iva.tur.report.line']._get_move_ids(self)
+        for start in range(0, len(move_ids), _EXPORT_BATCH_SIZE):
+            batch_ids = move_ids[start:start + _EXPORT_BATCH_SIZE]
+            self._report_job_progress(100.0 * start / len(move_ids), _("%s de %s comprobantes procesados") % (start, len(move_ids)))
+            with stage('read_snapshots'):
+                snapshots = self.env['afip.wsct.comprobante']._read_snapshots(batch_ids)
+            with stage('read_invoices'):
+                self.env.cr.execute("""
+                    SELECT move.id, move.name, move.invoice_date, move.amount_total, partner.name, line.payments
+                      FROM afip_iva_tur_report_line line
+                      JOIN account_move move ON move.id = line.move_id
+                 LEFT JOIN res_partner partner ON partner.id = move.partner_id
+                     WHERE line.report_id = %s
+                       AND line.move_id IN %s
+                """, [self.id, tuple(batch_ids)])
+                rows = {row[0]: row for row in self.env.cr.fetchall()}
+                # El XML solo se lee para los comprobantes sin snapshot (autorizados antes de guardarlos)
+                xml_data = {}
+                missing_ids = [move_id for move_id in batch_ids if move_id not in snapshots]
+                if missing_ids:
+                    self.env.cr.execute("""
+                        SELECT id, afip_xml_request, afip_xml_response
+                          FROM account_move
+                         WHERE id IN %s
+                    """, [tuple(missing_ids)])
+                    xml_data = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+            for move_id in batch_ids:
+                move_id, name, invoice_date, amount_total, partner_name, payments = rows[move_id]
+                comprobante, response = snapshots.get(move_id, (None, None))
+                xml_request, xml_response = xml_data.get(move_id, (None, None))
+                yield InvoiceExportData(
+                    move_id=move_id,
+                    name=name,
+                    invoice_date=invoice_date,
+                    partner_name=partner_name,
+                    amount_total=to_scaled(amount_total or 0),
+                    payment_type=False,
+                    payments=[tuple(payment) for payment in payments] if payments else None,
+                    xml_request=xml_request,
+                    xml_response=xml_response,
+                    comprobante=comprobante,
+                    response=response,
+                )
+
+    def _refresh_line_payments(self, move_ids=None):
+        """ Recalcula los pagos conciliados de los comprobantes del reporte (o solo ``move_ids``) y los guarda
+        en sus líneas, con una consulta para leerlos y otra para guardarlos. """
+        self.ensure_one()
+        Line = self.env['afip.iva.tur.report.line']
+        if move_ids is None:
+            move_ids = Line._get_move_ids(self)
+        with stage('payments'):
+            Line._store_payments(self, self._query_export_payments(move_ids), move_ids)
+
+    def _precompute_lines(self, move_ids):
+        """ Calcula y guarda los datos de exportación (pagos, números, importes y bloque de registros) de las
+        líneas de ``move_ids``, que se reutilizan al generar el archivo. Los comprobantes cuyos datos no cumplen
+        el formato quedan sin bloque; el detalle se informa al generar el archivo. """
+        self.ensure_one()
+        self._refresh_line_payments(move_ids)
+        self._render_lines(move_ids, validate=True)
+
+    def _render_lines(self, move_ids, workers=0, validate=False):
+        """ Arma los bloques de registros de los comprobantes ``move_ids`` (en ``workers`` procesos si se
+        indica) y los guarda en sus líneas con sus números e importes, por lotes de ``_EXPORT_BATCH_SIZE``.
+        Con ``validate`` los comprobantes que no cumplen el formato quedan sin bloque; si no, se tienen que
+        haber revisado antes (ver ``_check_export_data``). """
+        self.ensure_one()
+        cuit_informante = (self.company_id.vat or '').replace('-', '').strip()
+
+        # Datos de los comprobantes cuyos bloques todavía no se recibieron, en el mismo orden
+        pending = collections.deque()
+
+        def tracked_data():
+            for data in self._iter_export_data(move_ids):
+                pending.append(data)
+                yield data
+
+        if workers:
+            _logger.info("Armando los registros de %s comprobantes de %s con %s procesos", len(move_ids), self.name, workers)
+            # En paralelo el armado queda dentro del tiempo total de la acción (corre en otros procesos)
+            blocks = iter_invoice_blocks_parallel(tracked_data(), cuit_informante, workers)
+        else:
+            blocks = self._render_blocks(tracked_data(), cuit_informante, validate)
+
+        Line = self.env['afip.iva.tur.report.line']
+        values = []
+        for block in blocks:
+            values.append(_line_export_values(pending.popleft(), block))
+            if len(values) >= _EXPORT_BATCH_SIZE:
+                with stage('store_lines'):
+                    Line._store_export_values(self, values)
+                values = []
+        with stage('store_lines'):
+            Line._store_export_values(self, values)
+
+    def _query_export_payments(self, move_ids):
+        """ Pagos de ``move_ids`` en una sola consulta sobre las conciliaciones parciales: un elemento por
+        asiento de pago, con la forma de pago de su diario y el importe conciliado con el comprobante.
+        Reemplaza recorrer ``_get_reconciled_payments()`` por comprobante.
+        El importe es el del lado del comprobante en su moneda (como el importe total del registro 02),
+        no ``part.amount``, que está en la moneda de la compañía. """
+        if not move_ids:
+            return {}
+        self.env.cr.execute("""
+            SELECT inv_line.move_id, pay_move.id, journal.l10n_ar_afip_wsct_payment_type,
+                   SUM(CASE
+                       WHEN part.debit_move_id = inv_line.id THEN part.debit_amount_currency
+                       ELSE part.credit_amount_currency
+                   END)
+              FROM account_move_line inv_line
+              JOIN account_account account ON account.id = inv_line.account_id
+              JOIN account_partial_reconcile part ON inv_line.id IN (part.debit_move_id, part.credit_move_id)
+              JOIN account_move_line pay_line ON pay_line.id = CASE
+                       WHEN part.debit_move_id = inv_line.id THEN part.credit_move_id
+                       ELSE part.debit_move_id
+                   END
+              JOIN account_move pay_move ON pay_move.id = pay_line.move_id
+              JOIN account_journal journal ON journal.id = pay_move.journal_id
+             WHERE inv_line.move_id = ANY(%s)
+               AND account.account_type IN ('asset_receivable', 'liability_payable')
+               AND pay_move.payment_id IS NOT NULL
+          GROUP BY inv_line.move_id, pay_move.id, journal.l10n_ar_afip_wsct_payment_type
+          ORDER BY inv_line.move_id, MIN(part.id)
+        """, [list(move_ids)])
+        payments = {}
+        for move_id, _payment_move_id, payment_type, amount in self.env.cr.fetchall():
+            payments.setdefault(move_id, []).append((payment_type or False, to_scaled(amount or 0)))
+        return payments
+
+    def _get_export_workers(self, invoice_count):
+        """ Cantidad de procesos para armar los registros de ``invoice_count`` comprobantes en paralelo (0 = modo serie).
+        Se configura con los parámetros del sistema ``l10n_ar_afip_iva_tur.export_workers`` y
+        ``l10n_ar_afip_iva_tur.export_parallel_threshold`` (cantidad mínima de comprobantes para usar el pool).
+
+        El pool crea los procesos con ``fork``: un hijo de un proceso con varios hilos hereda los locks que
+        tuvieran tomados los demás hilos (logging, pool de conexiones, imports) y puede quedar bloqueado.
+        Por eso solo se usa en modo ``--workers`` (cada worker atiende un pedido a la vez) o en procesos
+        de un solo hilo como el comando ``iva_tur_export``; en el servidor con hilos se arma en serie. """
+        self.ensure_one()
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        workers = int(get_param('l10n_ar_afip_iva_tur.export_workers', 0))
+        threshold = int(get_param('l10n_ar_afip_iva_tur.export_parallel_threshold', 5000))
+        if workers < 2 or invoice_count < threshold:
+            return 0
+        if not config['workers'] and threading.active_count() > 1:
+            _logger.warning("%s: l10n_ar_afip_iva_tur.export_workers se ignora en el servidor con hilos, "
+                            "el exportable se arma en serie", self.name)
+            return 0
+        return workers
+
+    def _iter_export_blocks(self):
+        """ Generador de los bloques de texto del exportable: la cabecera (registro 01) y luego los registros
+        02 a 08 de cada comprobante guardados en las líneas (ver ``_render_lines``), en el orden de las líneas. """
         self.ensure_one()
-        if not self.invoice_ids:
-            raise UserError(_("No hay comprobantes asociados a este reporte para generar el archivo."))
-        
-        output = io.StringIO()
-        
-        # --- REGISTRO TIPO 1: CABECERA DEL ARCHIVO ---
         cuit_informante = self.company_id.vat.replace('-', '').strip()
         fecha_generacion = datetime.date.today().strftime('%Y%m')
-        sin_movimiento = "0" if len(self.invoice_ids) > 0 else "1"
+        sin_movimiento = "0" if self.invoice_count > 0 else "1"
         remesa = str(self.sequence).zfill(4)
-        
-        line1 = (
-            "01" +
-            cuit_informante +
-            fecha_generacion +
-            remesa +
-            "0103" +
-            "858" +
-            "8089" +
-            "00100" +
-            sin_movimiento
-        )
-        output.write(line1 + '\r\n')
-
-        for inv in self.invoice_ids:  
-            
-            comprobante = parse_autorizar_comprobante(inv.afip_xml_request).comprobante
-            response = parse_afip_response(inv.afip_xml_response)
-                      
-            # --- REGISTRO TIPO 2: COMPROBANTE DE VENTA ---
-            tipo_comprobante_afip = comprobante.codigoTipoDocumento.zfill(3)
-            punto_venta = comprobante.numeroPuntoVenta.zfill(5)
-            numero_comprobante = comprobante.numeroComprobante.zfill(8)
-            fecha_emision = inv.invoice_date.strftime('%Y%m%d') if inv.invoice_date else '00000000'
-            tipo_doc_turista = comprobante.codigoTipoDocumento.zfill(2)
-            nro_doc_turista = comprobante.numeroDocumento.ljust(20)
-            codigo_pais = comprobante.codigoPais.zfill(4)
-            id_impositivo = comprobante.idImpositivo.zfill(2)
-            codigo_relacion = comprobante.codigoRelacionEmisorReceptor.zfill(2)
-            importe_gravado = str(int(round(comprobante.importeGravado * 100))).zfill(15)
-            importe_no_gravado = str(int(round(comprobante.importeNoGravado * 100))).zfill(15)
-            importe_exento = str(int(round(comprobante.importeExento * 100))).zfill(15)
-            importe_reintegro = str(int(round(comprobante.importeReintegro * 100))).zfill(15)
-            importe_total = str(int(round(comprobante.importeTotal * 100))).zfill(15)
-
-            codigo_moneda = comprobante.codigoMoneda.ljust(3)
-            # Despues del PES revisar que la cotizacion sean 18 caracteres, 6 decimales
-            cotizacion_moneda = format_fixed_decimal(comprobante.cotizacionMoneda)
-            
-            tipo_auth = response.tipo_autorizacion
-            codigo_auth = response.codigo_autorizacion     
-            
-            codigo_control_fiscal = "".ljust(6)
-            serie_control_fiscal = "".zfill(10)
-
-            line2 = (
-                "02" +
-                tipo_comprobante_afip +
-                punto_venta +
-                numero_comprobante +
-                fecha_emision +
-                tipo_doc_turista +
-                nro_doc_turista +
-                codigo_pais +
-                id_impositivo +
-                codigo_relacion +
-                importe_gravado +
-                importe_no_gravado +
-                importe_exento +
-                importe_reintegro +
-                codigo_moneda +
-                cotizacion_moneda +
-                tipo_auth +
-                codigo_auth +
-                codigo_control_fiscal +
-                serie_control_fiscal +
-                importe_total
-            )
-            output.write(line2 + '\r\n')
-
-            # --- REGISTRO TIPO 3: TOTALES DEL COMPROBANTE DE VENTA (Base IVA) ---
-            for iva in comprobante.subtotales_iva:
-                codigo_iva = "11" if iva.codigo == "5" else "10"
-                base_imponible = "".zfill(15)                
-                importe_iva = str(int(round(iva.importe * 100))).zfill(15)
-                
-                line3 = (
-                    "03" +
-                    codigo_iva +
-                    base_imponible +
-                    importe_iva
-                )
-                output.write(line3 + '\r\n')
-
-            # --- REGISTRO TIPO 4: DATOS DEL TURISTA EXTRANJERO ---
-            nombre_turista = str(inv.partner_id.name or '').strip().ljust(50)
-            
-            line4 = (
-                "04" +
-                tipo_doc_turista +
-                nro_doc_turista +
-                codigo_pais +
-                nombre_turista +
-                codigo_pais +
-                codigo_pais
-            )
-            output.write(line4 + '\r\n')
-
-            # --- REGISTRO TIPO 5: IMPUESTOS Y PERCEPCIONES DEL COMPROBANTE ---
-            line5 = (
-                "05" +
-                cuit_informante +
-                tipo_comprobante_afip +
-                punto_venta +
-                numero_comprobante +
-                tipo_auth +
-                codigo_auth +
-                fecha_emision +
-                codigo_control_fiscal +
-                serie_control_fiscal +
-                importe_reintegro
-            )
-            output.write(line5 + '\r\n')
-            
-            # --- REGISTRO TIPO 6: COMPROBANTES ASOCIADOS ---
-            for comp_asociado in comprobante.comprobantes_asociados:
-                codigo_comp_asociado = comp_asociado.codigoTipoComprobante.zfill(3)
-                punto_venta_comp_asociado = comp_asociado.numeroPuntoVenta.zfill(5)
-                numero_comp_asociado = comp_asociado.numeroComprobante.zfill(8)
-                
-                line6 = (
-                    "06" +
-                    codigo_comp_asociado +
-                    punto_venta_comp_asociado +
-                    numero_comp_asociado
-                )
-                output.write(line6 + '\r\n')
-
-            # --- REGISTRO TIPO 7: CONCEPTOS DE DETALLE DEL COMPROBANTE ---
-            for item in comprobante.items:
-                tipo_item = item.tipo.zfill(2)
-                cod_tur_item = item.codigoTurismo.zfill(4)
-                codigo_item = item.codigo.ljust(50)
-                cuit_hotel = "".ljust(11)
-                fecha_ingreso_item = "".ljust(8)
-                unidad_item = "".ljust(4)
-                tipo_unidad_item = "".ljust(4)
-                cantidad_personas = "".ljust(2)
-                descripcion_item = item.descripcion.ljust(200)
-                cantidad_noches = "".ljust(5)
-                precio_unitario = "".ljust(18)
-                codigo_iva_item = "11" if item.codigoAlicuotaIVA == "5" else "10"
-                importe_iva_item = str(int(round(item.importeIVA * 100))).zfill(15)
-                importe_total_item = str(int(round(item.importeItem * 100))).zfill(15)
-                
-                line7 = (
-                    "07" +
-                    tipo_item +
-                    cod_tur_item +
-                    codigo_item +
-                    cuit_hotel +
-                    fecha_ingreso_item +
-                    unidad_item +
-                    tipo_unidad_item +
-                    cantidad_personas +
-                    descripcion_item +
-                    cantidad_noches +
-                    precio_unitario +
-                    codigo_iva_item +
-                    importe_iva_item +
-                    importe_total_item
-                )
-                output.write(line7 + '\r\n')
-
-            # --- REGISTRO TIPO 8: MEDIOS DE PAGO ---
-            tipo_forma_pago = inv._get_reconciled_payments().journal_id.l10n_ar_afip_wsct_payment_type
-            codigo_swift = "".ljust(11)
-            tipo_cuenta = "".ljust(2)
-            numero_tarjeta = "".ljust(6)
-            numero_cuenta = "".ljust(20)
-            importe_medio_pago = str(int(round(inv.amount_total * 100))).zfill(15)
-
-            line8 = (
-                "08" +
-                tipo_forma_pago +
-                codigo_swift +
-                tipo_cuenta +
-                numero_tarjeta +
-                numero_cuenta +
-                importe_medio_pago
-            )
-            output.write(line8 + '\r\n')
-        
-        content = output.getvalue()
-        
+        yield render_header(cuit_informante, fecha_generacion, remesa, sin_movimiento) + '\r\n'
+
+        Line = self.env['afip.iva.tur.report.line']
+        for move_id, block in Line._iter_record_blocks(self, Line._get_move_ids(self), _EXPORT_BATCH_SIZE):
+            if not block:
+                raise UserError(_("No se puede generar el archivo: no se pudieron armar los registros del comprobante %s.")
+                                % self.env['account.move'].browse(move_id).display_name)
+            yield block
+
+    def _render_blocks(self, datas, cuit_informante, validate=False):
+        for data in datas:
+            if validate:
+                try:
+                    if validate_invoice(data, cuit_informante):
+                        yield False
+                        continue
+                    with stage('render'):
+                        block = render_invoice_block(data, cuit_informante)
+                except (FieldOverflowError, TypeError, ValueError, SyntaxError):
+                    block = False
+            else:
+                with stage('render'):
+                    block = render_invoice_block(data, cuit_informante)
+            yield block
+
+    def _check_export_data(self, move_ids=None):
+        """ Revisa los datos de los comprobantes del reporte (o solo ``move_ids``) contra el diseño de registros
+        antes de armar el archivo y lanza un único error con todos los problemas encontrados. """
+        self.ensure_one()
+        cuit_informante = self.company_id.vat.replace('-', '').strip()
+        issues = validate_invoices(self._iter_export_data(move_ids), cuit_informante)
+        if not issues:
+            return
+        invoice_count = len({issue.invoice_name for issue in issues})
+        lines = [str(issue) for issue in issues[:_EXPORT_MAX_ISSUES]]
+        if len(issues) > _EXPORT_MAX_ISSUES:
+            lines.append(_("... y %s problemas más.") % (len(issues) - _EXPORT_MAX_ISSUES))
+        raise UserError(_(
+            "No se puede generar el archivo: %s comprobantes tienen datos que no cumplen el formato de AFIP.\n\n%s"
+        ) % (invoice_count, "\n".join(lines)))
+
+    def _write_export_file(self, stream):
+        """ Escribe el exportable en ``stream`` (binario) en bloques de hasta ``_EXPORT_CHUNK_SIZE`` caracteres,
+        de modo que nunca se arme el archivo completo en memoria. """
+        chunk = []
+        chunk_size = 0
+        for block in self._iter_export_blocks():
+            chunk.append(block)
+            chunk_size += len(block)
+            if chunk_size >= _EXPORT_CHUNK_SIZE:
+                with stage('encode_write'):
+                    stream.write(''.join(chunk).encode('utf-8'))
+                chunk = []
+                chunk_size = 0
+        if chunk:
+            with stage('encode_write'):
+                stream.write(''.join(chunk).encode('utf-8'))
+
+    def _store_export_file(self, stream):
+        """ Guarda el contenido de ``stream`` (archivo binario) como adjunto del campo ``exported_file``.
+        Con el filestore el archivo se copia por bloques, sin cargarlo entero en memoria; si los adjuntos se
+        guardan en la base se escribe en crudo (``raw``) para evitar la copia codificada en base64. """
+        self.ensure_one()
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'exported_file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if Attachment._storage() == 'db':
+            if attachment:
+                attachment.write({'raw': stream.read()})
+            else:
+                Attachment.create(self._export_attachment_values(stream.read()))
+        else:
+            if not attachment:
+                attachment = Attachment.create(self._export_attachment_values(b''))
+            self._copy_to_filestore(attachment, stream)
+        self.invalidate_recordset(['exported_file'])
+
+    def _export_attachment_values(self, raw):
+        return {
+            'name': 'exported_file',
+            'res_model': self._name,
+            'res_field': 'exported_file',
+            'res_id': self.id,
+            'type': 'binary',
+            'mimetype': 'text/plain',
+            'raw': raw,
+        }
+
+    def _copy_to_filestore(self, attachment, stream):
+        """ Copia ``stream`` al filestore por bloques y apunta ``attachment`` al archivo copiado. Hace lo mismo que
+        ``ir.attachment._file_write`` pero sin recibir el contenido completo; el ORM no permite escribir
+        ``store_fname``, ``file_size`` ni ``checksum``, por eso se actualizan por SQL. """
+        start = stream.tell()
+        checksum = hashlib.sha1()
+        file_size = 0
+        for chunk in iter(lambda: stream.read(_EXPORT_COPY_SIZE), b''):
+            checksum.update(chunk)
+            file_size += len(chunk)
+        checksum = checksum.hexdigest()
+        fname = checksum[:2] + '/' + checksum
+        full_path = attachment._full_path(fname)
+        if not os.path.isfile(full_path):
+            dirname = os.path.dirname(full_path)
+            os.makedirs(dirname, exist_ok=True)
+            stream.seek(start)
+            # Se copia a un temporal y se renombra, para no dejar nunca un archivo a medias con ese nombre
+            with tempfile.NamedTemporaryFile(dir=dirname, delete=False) as copy:
+                try:
+                    shutil.copyfileobj(stream, copy, _EXPORT_COPY_SIZE)
+                except BaseException:
+                    os.unlink(copy.name)
+                    raise
+            os.replace(copy.name, full_path)
+        # Si la transacción se revierte el recolector del filestore borra el archivo nuevo
+        attachment._mark_for_gc(fname)
+
+        old_fname = attachment.store_fname
+        attachment.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+               SET store_fname = %s, file_size = %s, checksum = %s, db_datas = NULL, index_content = NULL
+             WHERE id = %s
+        """, [fname, file_size, checksum, attachment.id])
+        attachment.invalidate_recordset()
+        if old_fname and old_fname != fname:
+            attachment._file_delete(old_fname)
+
+    @contextlib.contextmanager
+    def _open_export_file(self):
+        """ Devuelve el contenido de ``exported_file`` como buffer de solo lectura (``mmap`` del archivo del
+        filestore si el adjunto está guardado ahí), o None si no hay archivo generado. """
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'exported_file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            yield None
+        elif attachment.store_fname:
+            with open_buffer(attachment._full_path(attachment.store_fname)) as buffer:
+                yield buffer
+        else:
+            yield attachment.raw or b''
+
+    def _diff_export_file(self, new_file):
+        """ Compara el archivo recién armado (``new_file``) con el exportable actual, guarda las diferencias
+        en ``export_diff`` y las resume en el chatter. """
+        self.ensure_one()
+        with self._open_export_file() as old_buffer:
+            if old_buffer is None:
+                self.export_diff = False
+                return
+            with map_file(new_file) as new_buffer:
+                changes = diff(old_buffer, scan(old_buffer), new_buffer, scan(new_buffer))
+        self.export_diff = changes
+        if not (changes['added'] or changes['removed'] or changes['changed_count']):
+            self.message_post(body=_("El archivo regenerado no tiene diferencias en los comprobantes respecto del anterior."))
+            return
+        lines = [
+            _("Diferencias con el archivo anterior: %s comprobantes agregados, %s quitados y %s modificados.") % (
+                len(changes['added']), len(changes['removed']), changes['changed_count']),
+        ]
+        lines += [_("Agregado: %s") % key for key in changes['added'][:_EXPORT_MAX_DIFF_LINES]]
+        lines += [_("Quitado: %s") % key for key in changes['removed'][:_EXPORT_MAX_DIFF_LINES]]
+        for invoice in changes['changed'][:_EXPORT_MAX_DIFF_LINES]:
+            lines.append(_("Modificado: %s (%s)") % (invoice['invoice'], ", ".join(
+                "%s.%s" % (change['record'], change['field'] or _('registro')) for change in invoice['changes']
+            )))
+        self.message_post(body=Markup("<br/>").join(lines))
+
+    def action_verify_export_file(self):
+        """ Vuelve a leer el exportable generado y lo compara con los comprobantes del reporte: formato y orden de
+        los registros, CUIT de la cabecera, comprobantes incluidos, importes totales y pagos. """
+        self.ensure_one()
+        if not self.exported_filename:
+            raise UserError(_("No hay un archivo generado para verificar."))
+        cuit_informante = self.company_id.vat.replace('-', '').strip()
+        with self._open_export_file() as buffer:
+            if buffer is None:
+                raise UserError(_("No hay un archivo generado para verificar."))
+            result = scan(buffer)
+        # Las líneas desactualizadas se vuelven a armar; las demás se comparan con los datos ya guardados
+        Line = self.env['afip.iva.tur.report.line']
+        self._render_lines(Line._get_stale_move_ids(self, _REFRESH_WATERMARK_MARGIN), validate=True)
+        issues = verify(result, Line._iter_expected_invoices(self), cuit_informante)
+        if issues:
+            body = Markup("<br/>").join([_("El archivo %s no coincide con el reporte:") % self.exported_filename] + issues)
+            message, notification_type = _("Se encontraron %s problemas en el archivo (ver el chatter).") % len(issues), 'danger'
+        else:
+            message = _("El archivo %s coincide con el reporte: %s registros, %s comprobantes.") % (
+                self.exported_filename, result.line_count, len(result.invoices))
+            body, notification_type = message, 'success'
+        self.message_post(body=body)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Verificación del Archivo"),
+                'message': message,
+                'type': notification_type,
+                'sticky': bool(issues),
+            },
+        }
+
+    @profiled
+    def action_generate_file(self):
+        """ Acción para generar el archivo TXT a partir de los comprobantes ya cargados. """
+        self.ensure_one()
+        self._check_no_active_job()
+        if not self.invoice_count:
+            raise UserError(_("No hay comprobantes asociados a este reporte para generar el archivo."))
+
         def _get_export_filename_report(record):
             cuit_informante_clean = record.company_id.vat.replace('-', '').strip() # CUIT sin guiones/puntos
             # Asegurar que el CUIT tiene 11 dígitos, rellenar si es necesario, o truncar
@@ -429,10 +871,29 @@ class AfipIvaTurReport(models.Model):
         # Revisar nombre del archivo
         filename = _get_export_filename_report(self)
 
-        encoded_content = base64.b64encode(content.encode('utf-8'))
+        # Los pagos pueden haber cambiado desde la última generación
+        self._refresh_line_payments()
+
+        # Solo se arman los bloques de los comprobantes nuevos o modificados desde que se armaron; se revisan
+        # todos antes de armarlos, para informar todos los problemas juntos
+        stale_ids = self.env['afip.iva.tur.report.line']._get_stale_move_ids(self, _REFRESH_WATERMARK_MARGIN)
+        with stage('validate'):
+            self._check_export_data(stale_ids)
+        try:
+            self._render_lines(stale_ids, workers=self._get_export_workers(len(stale_ids)))
+        except FieldOverflowError as error:
+            raise UserError(_("No se puede generar el archivo: el comprobante %s tiene un dato que no entra en el formato de AFIP.\n\n%s") % (error.invoice_name, error))
+
+        with tempfile.TemporaryFile() as tmp:
+            self._write_export_file(tmp)
+            tmp.flush()
+            with stage('diff'):
+                self._diff_export_file(tmp)
+            tmp.seek(0)
+            with stage('store_attachment'):
+                self._store_export_file(tmp)
 
         self.write({
-            'exported_file': encoded_content,
             'exported_filename': filename,
             'sequence': self.sequence + 1, # Incrementa la secuencia de remesa
         })
@@ -472,12 +933,15 @@ class AfipIvaTurReport(models.Model):
         self.ensure_one()
         if self.state == 'presented':
             raise UserError(_("No puede volver un reporte presentado a borrador. Cree uno nuevo si necesita corregir."))
+        self._check_no_active_job()
         self.write({
             'state': 'draft',
             'exported_file': False,
             'exported_filename': False,
+            'export_diff': False,
             'presentation_date': False,
-            'invoice_ids': [(5, 0, 0)],
+            'line_ids': [(5, 0, 0)],
+            'last_refresh_date': False,
         })
         # --- CAMBIO CLAVE: Refrescar la vista después de la acción ---
         return {
@@ -0,0 +1,170 @@
+# l10n_ar_afip_iva_tur/models/afip_iva_tur_report_job.py
+
+from odoo import fields, models, api, _
+from odoo.exceptions import AccessError, UserError
+import datetime
+import logging
+
+_logger = logging.getLogger(__name__)
+
+_ACTIVE_STATES = ('queued', 'running')
+# Minutos que puede estar un proceso en ejecución antes de darlo por interrumpido (si el parámetro
+# ``l10n_ar_afip_iva_tur.job_timeout_minutes`` no está definido)
+_DEFAULT_JOB_TIMEOUT_MINUTES = 120
+
+class AfipIvaTurReportJob(models.Model):
+    """ Ejecución en segundo plano (vía ``ir.cron``) de la actualización de comprobantes o de la
+    generación del archivo de un reporte de IVA Turismo. """
+    _name = 'afip.iva.tur.report.job'
+    _description = 'Proceso en segundo plano de reporte AFIP IVA Turismo'
+    _order = 'id desc'
+
+    report_id = fields.Many2one('afip.iva.tur.report', string='Reporte', required=True, ondelete='cascade', index=True)
+    job_action = fields.Selection([
+        ('update', 'Actualizar Comprobantes'),
+        ('rebuild', 'Reconstruir Comprobantes'),
+        ('generate', 'Generar Archivo TXT'),
+    ], string='Acción', required=True)
+    state = fields.Selection([
+        ('queued', 'En cola'),
+        ('running', 'En ejecución'),
+        ('done', 'Terminado'),
+        ('failed', 'Error'),
+        ('cancelled', 'Cancelado'),
+    ], string='Estado', default='queued', required=True, index=True)
+    progress = fields.Float(string='Progreso (%)', digits=(5, 2))
+    message = fields.Char(string='Detalle')
+    date_start = fields.Datetime(string='Inicio')
+    date_end = fields.Datetime(string='Fin')
+
+    def init(self):
+        # A lo sumo un proceso en cola o en ejecución por reporte
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS afip_iva_tur_report_job_active_uniq
+                ON afip_iva_tur_report_job (report_id)
+             WHERE state IN ('queued', 'running')
+        """)
+
+    @api.model
+    def _enqueue(self, report, job_action):
+        """ Encola ``job_action`` para ``report`` y dispara el cron. """
+        # Bloquea el reporte para que dos pedidos simultáneos no encolen dos procesos
+        self.env.cr.execute("SELECT id FROM afip_iva_tur_report WHERE id = %s FOR UPDATE", [report.id])
+        report._check_no_active_job()
+        job = self.create({'report_id': report.id, 'job_action': job_action})
+        self.env.ref('l10n_ar_afip_iva_tur.ir_cron_afip_iva_tur_report_jobs')._trigger()
+        return job
+
+    @api.model
+    def _cron_process_jobs(self):
+        """ Ejecuta los procesos en cola, de a uno por vez, después de liberar los interrumpidos. """
+        self._fail_stale_jobs()
+        while True:
+            self.env.cr.execute("""
+                SELECT id
+                  FROM afip_iva_tur_report_job
+                 WHERE state = 'queued'
+              ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+            """)
+            row = self.env.cr.fetchone()
+            if not row:
+                return
+            job = self.browse(row[0])
+            job.write({'state': 'running', 'date_start': fields.Datetime.now(), 'progress': 0.0})
+            self.env.cr.commit()
+            job._run()
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """ Marca como fallidos los procesos que siguen 'En ejecución' después del tiempo máximo
+        (``l10n_ar_afip_iva_tur.job_timeout_minutes``): el worker que los corría terminó sin actualizarlos
+        (limit_time_real, falta de memoria, reinicio) y bloquearían el reporte para siempre. No se vuelven a
+        encolar porque probablemente fallarían de la misma forma. """
+        timeout = int(self.env['ir.config_parameter'].sudo().get_param(
+            'l10n_ar_afip_iva_tur.job_timeout_minutes', _DEFAULT_JOB_TIMEOUT_MINUTES))
+        stale_jobs = self.search([
+            ('state', '=', 'running'),
+            ('date_start', '<', fields.Datetime.now() - datetime.timedelta(minutes=timeout)),
+        ])
+        for job in stale_jobs:
+            _logger.warning("Proceso %s del reporte %s interrumpido (en ejecución desde %s)",
+                            job.job_action, job.report_id.name, job.date_start)
+            job._finish_as('failed', _("Interrumpido: sigue en ejecución después de %s minutos.") % timeout)
+        if stale_jobs:
+            self.env.cr.commit()
+
+    def _finish_as(self, state, message):
+        """ Cierra el proceso con ``state`` y lo informa en el chatter del reporte. """
+        self.ensure_one()
+        self.write({'state': state, 'date_end': fields.Datetime.now(), 'message': message[:255]})
+        self.report_id.message_post(body=_("Proceso en segundo plano '%s': %s") % (
+            dict(self._fields['job_action'].selection)[self.job_action], message))
+
+    def action_cancel(self):
+        """ Cancela procesos en cola o en ejecución para desbloquear el reporte (solo administradores de
+        contabilidad). Un proceso que realmente siga corriendo no se detiene, pero deja de bloquear el reporte. """
+        if not self.env.user.has_group('account.group_account_manager'):
+            raise AccessError(_("Solo un administrador de contabilidad puede cancelar procesos en segundo plano."))
+        for job in self.filtered(lambda job: job.state in _ACTIVE_STATES):
+            job._finish_as('cancelled', _("Cancelado por %s.") % self.env.user.name)
+        return True
+
+    def _run(self):
+        """ Corre la acción del proceso y lo cierra. El avance se guarda en transacciones aparte (ver
+        ``_report_progress``) que actualizan la fila del proceso mientras la acción corre: la transacción de la
+        acción no puede volver a escribir esa fila (PostgreSQL lo rechaza como actualización concurrente en
+        REPEATABLE READ), así que primero se confirma el resultado y el cierre se escribe en una transacción
+        nueva. """
+        self.ensure_one()
+        report = self.report_id.with_context(afip_iva_tur_job_id=self.id)
+        try:
+            if self.job_action == 'update':
+                report.action_update_invoices()
+            elif self.job_action == 'rebuild':
+                report.action_rebuild_invoices()
+            else:
+                report.action_generate_file()
+            self.env.cr.commit()
+        except Exception as error:
+            self.env.cr.rollback()
+            _logger.exception("Falló el proceso %s del reporte %s", self.job_action, report.name)
+            message = error.args[0] if isinstance(error, UserError) and error.args else str(error)
+            if self._was_closed():
+                return
+            self.write({'state': 'failed', 'date_end': fields.Datetime.now(), 'message': message[:255]})
+            report.message_post(body=_("Falló el proceso en segundo plano '%s':\n%s") % (
+                dict(self._fields['job_action'].selection)[self.job_action], message))
+        else:
+            if self._was_closed():
+                return
+            message = _("%s comprobantes en el reporte.") % report.invoice_count
+            if self.job_action == 'generate':
+                message = _("Archivo %s generado con %s comprobantes.") % (report.exported_filename, report.invoice_count)
+            self.write({'state': 'done', 'date_end': fields.Datetime.now(), 'progress': 100.0, 'message': message})
+            report.message_post(body=_("Proceso en segundo plano '%s' terminado. %s") % (
+                dict(self._fields['job_action'].selection)[self.job_action], message))
+        self.env.cr.commit()
+
+    def _was_closed(self):
+        """ True si el proceso fue cancelado o dado por interrumpido mientras corría: su resultado se
+        guarda igual, pero no se pisa el estado con el que se cerró. Se lee en una transacción aparte: la
+        del proceso no ve la cancelación hecha después de que empezó. """
+        with self.env.registry.cursor() as cr:
+            cr.execute("SELECT state FROM afip_iva_tur_report_job WHERE id = %s", [self.id])
+            state = cr.fetchone()[0]
+        if state != 'running':
+            _logger.info("El proceso %s del reporte %s terminó después de quedar %s", self.job_action, self.report_id.name, state)
+            return True
+        return False
+
+    @api.model
+    def _report_progress(self, job_id, progress, message):
+        """ Guarda el avance de ``job_id`` en una transacción aparte, para que se vea mientras corre. La
+        transacción del proceso no escribe la fila hasta confirmar su resultado (ver ``_run``). """
+        with self.env.registry.cursor() as cr:
+            cr.execute(
+                "UPDATE afip_iva_tur_report_job SET progress = %s, message = %s WHERE id = %s",
+                [progress, message[:255], job_id],
+            )
@@ -0,0 +1,233 @@
+# l10n_ar_afip_iva_tur/models/afip_iva_tur_report_line.py
+
+import json
+
+from odoo import fields, models, api
+from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import to_scaled
+from odoo.addons.l10n_ar_afip_iva_tur.f8089_reader import REPEATED_RECORDS
+
+# Orden de los comprobantes en el reporte y en el exportable (el mismo que ``_order``)
+LINE_ORDER = 'invoice_date DESC, name DESC, id DESC'
+
+class AfipIvaTurReportLine(models.Model):
+    """ Comprobante incluido en un reporte de IVA Turismo, con los datos de sus registros del exportable.
+    El índice único sobre ``move_id`` permite detectar duplicados con una sola consulta. Los campos de
+    exportación (números, importes, pagos y bloque de registros) los calcula el reporte al actualizar los
+    comprobantes, por lotes y en SQL (ver ``_store_export_values``); al generar el archivo se reutilizan los
+    bloques y solo se vuelven a armar los desactualizados (ver ``_get_stale_move_ids``). """
+    _name = 'afip.iva.tur.report.line'
+    _description = 'Comprobante incluido en un reporte AFIP IVA Turismo'
+    _rec_name = 'move_id'
+    _order = LINE_ORDER
+
+    report_id = fields.Many2one('afip.iva.tur.report', string='Reporte', required=True, ondelete='cascade')
+    move_id = fields.Many2one(
+        'account.move',
+        string='Comprobante',
+        required=True,
+        ondelete='cascade',
+        domain=[('move_type', '=', 'out_invoice'), ('state', '=', 'posted'), ('l10n_latam_document_type_id.l10n_ar_letter', '=', 'T')],
+    )
+    name = fields.Char(related='move_id.name', string='Número', store=True)
+    invoice_date = fields.Date(related='move_id.invoice_date', store=True)
+    partner_id = fields.Many2one(related='move_id.partner_id', store=True)
+    company_id = fields.Many2one(related='report_id.company_id', store=True)
+    currency_id = fields.Many2one(related='move_id.currency_id')
+    amount_total = fields.Monetary(related='move_id.amount_total', currency_field='currency_id')
+
+    pos_number = fields.Integer(string='Punto de Venta', readonly=True)
+    document_number = fields.Integer(string='Número de Comprobante', readonly=True)
+    authorization_code = fields.Char(string='CAE', readonly=True)
+    # Importes del exportable en centavos; columna bigint porque los importes del exportable (15 dígitos) desbordan un int4
+    amount_total_cents = fields.Integer(string='Importe Total (centavos)', readonly=True, column_type=('int8', 'int8'))
+    payments_total_cents = fields.Integer(string='Pagos (centavos)', readonly=True, column_type=('int8', 'int8'))
+    payment_type = fields.Char(
+        string='Forma de Pago',
+        readonly=True,
+        help="Formas de pago AFIP de los pagos conciliados, separadas por coma.",
+    )
+    payments = fields.Json(
+        string='Pagos del Exportable',
+        readonly=True,
+        copy=False,
+        help="Pagos conciliados con el comprobante ([[forma de pago, importe en centavos], ...]), "
+             "calculados con una sola consulta para todo el reporte en cada actualización y generación."
+    )
+    record_block = fields.Text(
+        string='Registros',
+        readonly=True,
+        help="Registros 02 a 08 del comprobante tal como se escriben en el archivo "
+             "(vacío si sus datos no cumplen el formato de AFIP).",
+    )
+    block_date = fields.Datetime(
+        string='Fecha del Bloque',
+        readonly=True,
+        help="Momento en que se armó el bloque de registros. Se vuelve a armar si después cambian el comprobante, "
+             "su cliente, su snapshot WSCT, sus pagos o la compañía.",
+    )
+
+    _sql_constraints = [
+        ('move_uniq', 'unique(move_id)', 'El comprobante ya está incluido en otro reporte de IVA Turismo.'),
+    ]
+
+    def init(self):
+        # Búsquedas y orden de los comprobantes de un reporte
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS afip_iva_tur_report_line_report_move_idx
+                ON afip_iva_tur_report_line (report_id, move_id)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS afip_iva_tur_report_line_report_order_idx
+                ON afip_iva_tur_report_line (report_id, invoice_date DESC, name DESC, id DESC)
+        """)
+
+    @api.model
+    def _get_conflicts(self, move_ids, report):
+        """ Devuelve [(move_id, nombre del comprobante, report_id, nombre del reporte)] de los comprobantes
+        de ``move_ids`` que ya pertenecen a un reporte distinto de ``report``. """
+        if not move_ids:
+            return []
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT line.move_id, move.name, line.report_id, report.name
+              FROM afip_iva_tur_report_line line
+              JOIN account_move move ON move.id = line.move_id
+              JOIN afip_iva_tur_report report ON report.id = line.report_id
+             WHERE line.move_id IN %s
+               AND line.report_id != %s
+          ORDER BY move.name
+        """, [tuple(move_ids), report.id or 0])
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _get_move_ids(self, report):
+        """ IDs de los comprobantes de ``report`` en el orden del exportable, sin cargar las líneas. """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT move_id FROM afip_iva_tur_report_line WHERE report_id = %%s ORDER BY %s
+        """ % LINE_ORDER, [report.id])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _store_payments(self, report, payments, move_ids):
+        """ Guarda ``payments`` ({move_id: [(forma de pago, centavos), ...]}) en las líneas de ``move_ids``
+        de ``report`` con una sola consulta; las líneas sin pagos quedan vacías. """
+        if not move_ids:
+            return
+        self.flush_model()
+        move_ids = list(move_ids)
+        # El bloque de registros incluye los pagos (registros 08): si cambiaron queda desactualizado
+        self.env.cr.execute("""
+            UPDATE afip_iva_tur_report_line line
+               SET payments = data.payments::jsonb,
+                   payment_type = data.payment_type,
+                   payments_total_cents = data.payments_total,
+                   record_block = CASE WHEN line.payments IS DISTINCT FROM data.payments::jsonb
+                                       THEN NULL ELSE line.record_block END
+              FROM unnest(%s::int[], %s::text[], %s::varchar[], %s::bigint[])
+                   AS data(move_id, payments, payment_type, payments_total)
+             WHERE line.report_id = %s
+               AND line.move_id = data.move_id
+        """, [
+            move_ids,
+            [json.dumps([list(payment) for payment in payments[move_id]]) if move_id in payments else None for move_id in move_ids],
+            [_payment_types(payments.get(move_id)) for move_id in move_ids],
+            [sum(amount for _type, amount in payments[move_id]) if move_id in payments else None for move_id in move_ids],
+            report.id,
+        ])
+        self.invalidate_model(['payments', 'payment_type', 'payments_total_cents', 'record_block'])
+
+    @api.model
+    def _store_export_values(self, report, values):
+        """ Guarda los datos de exportación de las líneas de ``report`` con una sola consulta.
+        ``values`` es una lista de ``(move_id, punto de venta, número, CAE, importe en centavos, bloque)``. """
+        if not values:
+            return
+        self.flush_model()
+        columns = list(zip(*values))
+        self.env.cr.execute("""
+            UPDATE afip_iva_tur_report_line line
+               SET pos_number = data.pos_number,
+                   document_number = data.document_number,
+                   authorization_code = data.authorization_code,
+                   amount_total_cents = data.amount_total,
+                   record_block = data.record_block,
+                   block_date = now() at time zone 'UTC'
+              FROM unnest(%s::int[], %s::int[], %s::int[], %s::varchar[], %s::bigint[], %s::text[])
+                   AS data(move_id, pos_number, document_number, authorization_code, amount_total, record_block)
+             WHERE line.report_id = %s
+               AND line.move_id = data.move_id
+        """, [list(column) for column in columns] + [report.id])
+        self.invalidate_model(['pos_number', 'document_number', 'authorization_code', 'amount_total_cents', 'record_block', 'block_date'])
+
+    @api.model
+    def _get_stale_move_ids(self, report, margin):
+        """ IDs de los comprobantes de ``report`` sin bloque de registros o con datos modificados después de armarlo
+        (comprobante, cliente, snapshot WSCT o datos de la compañía). Se compara contra ``block_date - margin``: una
+        transacción que terminó después de armar el bloque pudo haber guardado una fecha de modificación anterior. """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT line.move_id
+              FROM afip_iva_tur_report_line line
+              JOIN account_move move ON move.id = line.move_id
+              JOIN afip_iva_tur_report report ON report.id = line.report_id
+              JOIN res_company company ON company.id = report.company_id
+              JOIN res_partner company_partner ON company_partner.id = company.partner_id
+         LEFT JOIN res_partner partner ON partner.id = move.partner_id
+         LEFT JOIN afip_wsct_comprobante snapshot ON snapshot.move_id = line.move_id
+             WHERE line.report_id = %s
+               AND (line.record_block IS NULL
+                    OR line.block_date IS NULL
+                    OR GREATEST(move.write_date, partner.write_date, snapshot.write_date, company_partner.write_date)
+                       > line.block_date - %s)
+          ORDER BY line.id
+        """, [report.id, margin])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _iter_record_blocks(self, report, move_ids, batch_size=1000):
+        """ Generador de ``(move_id, bloque de registros)`` de las líneas de ``report`` en el orden de ``move_ids``,
+        leídos por lotes de ``batch_size`` para no cargar todos los bloques en memoria. """
+        self.flush_model()
+        for start in range(0, len(move_ids), batch_size):
+            batch_ids = move_ids[start:start + batch_size]
+            self.env.cr.execute("""
+                SELECT move_id, record_block FROM afip_iva_tur_report_line WHERE report_id = %s AND move_id IN %s
+            """, [report.id, tuple(batch_ids)])
+            blocks = dict(self.env.cr.fetchall())
+            for move_id in batch_ids:
+                yield move_id, blocks.get(move_id)
+
+    @api.model
+    def _iter_expected_invoices(self, report):
+        """ Generador de ``(nombre, clave, importe total, total de pagos, cantidad de registros)`` de los comprobantes
+        de ``report``, como ``f8089_reader.expected_invoices`` pero con los datos ya guardados en las líneas, sin leer
+        el XML. La cantidad de registros 03, 06, 07 y 08 se cuenta en el bloque guardado: todos empiezan una línea y
+        el bloque siempre empieza con el 02, así que cada uno va precedido de un CRLF. """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT move.name, line.pos_number, line.document_number, line.authorization_code,
+                   line.amount_total_cents, line.payments_total_cents, move.amount_total, line.record_block IS NOT NULL,
+                   ARRAY(SELECT (length(line.record_block) - length(replace(line.record_block, E'\\r\\n' || code, ''))) / 4
+                           FROM unnest(%s::varchar[]) code)
+              FROM afip_iva_tur_report_line line
+              JOIN account_move move ON move.id = line.move_id
+             WHERE line.report_id = %s
+          ORDER BY line.id
+        """, [list(REPEATED_RECORDS), report.id])
+        for name, pos_number, document_number, authorization_code, amount_total, payments_total, move_total, has_block, \
+                counts in self.env.cr.fetchall():
+            if not has_block:
+                yield name, None, None, None, None
+                continue
+            if payments_total is None: # sin pagos se informa un registro 08 por el total del comprobante
+                payments_total = to_scaled(move_total or 0)
+            yield (name, "%05d-%08d-%s" % (pos_number, document_number, authorization_code), amount_total, payments_total,
+                   dict(zip(REPEATED_RECORDS, counts)))
+
+
+def _payment_types(payments):
+    """ Formas de pago distintas de ``payments``, en orden y separadas por coma. """
+    if not payments:
+        return None
+    return ", ".join(dict.fromkeys(payment_type for payment_type, _amount in payments if payment_type)) or None
@@ -0,0 +1,246 @@
+# l10n_ar_afip_iva_tur/models/afip_wsct_comprobante.py
+
+from odoo import fields, models, api
+from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import (
+    parse_autorizar_comprobante, parse_afip_response,
+    ComprobanteRequest, ComprobanteResponse, Item, SubtotalIVA, ComprobanteAsociado,
+    AMOUNT_SCALE, RATE_SCALE, to_scaled,
+)
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# (campo del snapshot, atributo de afip_utils.ComprobanteRequest)
+_REQUEST_FIELDS = [
+    ('codigo_tipo_comprobante', 'codigoTipoComprobante'),
+    ('numero_punto_venta', 'numeroPuntoVenta'),
+    ('numero_comprobante', 'numeroComprobante'),
+    ('fecha_emision', 'fechaEmision'),
+    ('codigo_tipo_autorizacion', 'codigoTipoAutorizacion'),
+    ('codigo_tipo_documento', 'codigoTipoDocumento'),
+    ('numero_documento', 'numeroDocumento'),
+    ('id_impositivo', 'idImpositivo'),
+    ('codigo_pais', 'codigoPais'),
+    ('domicilio_receptor', 'domicilioReceptor'),
+    ('codigo_relacion', 'codigoRelacionEmisorReceptor'),
+    ('importe_gravado', 'importeGravado'),
+    ('importe_no_gravado', 'importeNoGravado'),
+    ('importe_exento', 'importeExento'),
+    ('importe_reintegro', 'importeReintegro'),
+    ('importe_total', 'importeTotal'),
+    ('codigo_moneda', 'codigoMoneda'),
+    ('cotizacion_moneda', 'cotizacionMoneda'),
+    ('observaciones', 'observaciones'),
+]
+
+# (campo del snapshot, atributo de afip_utils.ComprobanteResponse)
+_RESPONSE_FIELDS = [
+    ('cuit', 'cuit'),
+    ('tipo_autorizacion', 'tipo_autorizacion'),
+    ('codigo_autorizacion', 'codigo_autorizacion'),
+    ('fecha_vencimiento', 'fechaVencimiento'),
+    ('resultado', 'resultado'),
+]
+
+_ITEM_FIELDS = [
+    ('tipo', 'tipo'),
+    ('codigo_turismo', 'codigoTurismo'),
+    ('codigo', 'codigo'),
+    ('descripcion', 'descripcion'),
+    ('codigo_alicuota_iva', 'codigoAlicuotaIVA'),
+    ('importe_iva', 'importeIVA'),
+    ('importe_item', 'importeItem'),
+]
+
+_IVA_FIELDS = [
+    ('codigo', 'codigo'),
+    ('importe', 'importe'),
+]
+
+_ASOCIADO_FIELDS = [
+    ('codigo_tipo_comprobante', 'codigoTipoComprobante'),
+    ('numero_punto_venta', 'numeroPuntoVenta'),
+    ('numero_comprobante', 'numeroComprobante'),
+]
+
+# Campos numéricos y sus decimales: afip_utils los maneja como enteros escalados
+_SCALED_FIELDS = {
+    'importe_gravado': AMOUNT_SCALE,
+    'importe_no_gravado': AMOUNT_SCALE,
+    'importe_exento': AMOUNT_SCALE,
+    'importe_reintegro': AMOUNT_SCALE,
+    'importe_total': AMOUNT_SCALE,
+    'cotizacion_moneda': RATE_SCALE,
+    'importe_iva': AMOUNT_SCALE,
+    'importe_item': AMOUNT_SCALE,
+    'importe': AMOUNT_SCALE,
+}
+
+
+def _value(field_name, value):
+    """ Normaliza un valor leído por SQL (las columnas numeric llegan como Decimal) al tipo que usa afip_utils. """
+    if field_name in _SCALED_FIELDS:
+        return to_scaled(value or 0, _SCALED_FIELDS[field_name])
+    return value or ""
+
+
+def _field_value(field_name, value):
+    """ Convierte un valor de afip_utils al valor a escribir en el campo del snapshot. """
+    if field_name in _SCALED_FIELDS:
+        return value / 10 ** _SCALED_FIELDS[field_name]
+    return value
+
+
+class AfipWsctComprobante(models.Model):
+    _name = 'afip.wsct.comprobante'
+    _description = 'Comprobante WSCT autorizado (snapshot)'
+    _rec_name = 'move_id'
+
+    move_id = fields.Many2one('account.move', string='Comprobante', required=True, ondelete='cascade', index=True)
+
+    # --- comprobanteRequest ---
+    codigo_tipo_comprobante = fields.Char(string='Tipo de Comprobante')
+    numero_punto_venta = fields.Char(string='Punto de Venta')
+    numero_comprobante = fields.Char(string='Número de Comprobante')
+    fecha_emision = fields.Char(string='Fecha de Emisión')
+    codigo_tipo_autorizacion = fields.Char(string='Tipo de Autorización (solicitud)')
+    codigo_tipo_documento = fields.Char(string='Tipo de Documento')
+    numero_documento = fields.Char(string='Número de Documento')
+    id_impositivo = fields.Char(string='ID Impositivo')
+    codigo_pais = fields.Char(string='Código de País')
+    domicilio_receptor = fields.Char(string='Domicilio del Receptor')
+    codigo_relacion = fields.Char(string='Código de Relación')
+    importe_gravado = fields.Float(string='Importe Gravado', digits=(16, 2))
+    importe_no_gravado = fields.Float(string='Importe No Gravado', digits=(16, 2))
+    importe_exento = fields.Float(string='Importe Exento', digits=(16, 2))
+    importe_reintegro = fields.Float(string='Importe Reintegro', digits=(16, 2))
+    importe_total = fields.Float(string='Importe Total', digits=(16, 2))
+    codigo_moneda = fields.Char(string='Moneda')
+    cotizacion_moneda = fields.Float(string='Cotización', digits=(18, 6))
+    observaciones = fields.Char(string='Observaciones')
+
+    # --- comprobanteResponse ---
+    cuit = fields.Char(string='CUIT')
+    tipo_autorizacion = fields.Char(string='Tipo de Autorización', help="CAE o CAI")
+    codigo_autorizacion = fields.Char(string='Código de Autorización', index=True)
+    fecha_vencimiento = fields.Char(string='Vencimiento de la Autorización')
+    resultado = fields.Char(string='Resultado')
+
+    item_ids = fields.One2many('afip.wsct.comprobante.item', 'comprobante_id', string='Items')
+    iva_ids = fields.One2many('afip.wsct.comprobante.iva', 'comprobante_id', string='Subtotales IVA')
+    asociado_ids = fields.One2many('afip.wsct.comprobante.asociado', 'comprobante_id', string='Comprobantes Asociados')
+
+    _sql_constraints = [
+        ('move_uniq', 'unique(move_id)', 'Ya existe un snapshot WSCT para este comprobante.'),
+    ]
+
+    @api.model
+    def _prepare_values_from_xml(self, xml_request, xml_response):
+        """ Arma los valores de creación del snapshot a partir del XML enviado y recibido de AFIP. """
+        comprobante = parse_autorizar_comprobante(xml_request).comprobante
+        response = parse_afip_response(xml_response)
+        vals = {field_name: _field_value(field_name, getattr(comprobante, attr)) for field_name, attr in _REQUEST_FIELDS}
+        vals.update({field_name: getattr(response, attr) for field_name, attr in _RESPONSE_FIELDS})
+        vals['item_ids'] = [
+            (0, 0, dict({field_name: _field_value(field_name, getattr(item, attr)) for field_name, attr in _ITEM_FIELDS}, sequence=sequence))
+            for sequence, item in enumerate(comprobante.items)
+        ]
+        vals['iva_ids'] = [
+            (0, 0, {field_name: _field_value(field_name, getattr(iva, attr)) for field_name, attr in _IVA_FIELDS})
+            for iva in comprobante.subtotales_iva
+        ]
+        vals['asociado_ids'] = [
+            (0, 0, {field_name: getattr(ca, attr) for field_name, attr in _ASOCIADO_FIELDS})
+            for ca in comprobante.comprobantes_asociados
+        ]
+        return vals
+
+    @api.model
+    def _create_from_xml(self, move, xml_request, xml_response):
+        """ Crea (o reemplaza) el snapshot del comprobante ``move``. """
+        vals = self._prepare_values_from_xml(xml_request, xml_response)
+        self.search([('move_id', '=', move.id)]).unlink()
+        return self.create(dict(vals, move_id=move.id))
+
+    @api.model
+    def _read_snapshots(self, move_ids):
+        """ Devuelve {move_id: (ComprobanteRequest, ComprobanteResponse)} para los comprobantes con snapshot,
+        leyendo las tablas con una consulta por tabla. """
+        if not move_ids:
+            return {}
+        self.env.flush_all()
+        cr = self.env.cr
+        header_columns = [field_name for field_name, _attr in _REQUEST_FIELDS + _RESPONSE_FIELDS]
+        cr.execute(
+            "SELECT id, move_id, %s FROM afip_wsct_comprobante WHERE move_id IN %%s" % ", ".join(header_columns),
+            [tuple(move_ids)],
+        )
+        by_comprobante = {}
+        res = {}
+        for row in cr.fetchall():
+            comprobante_id, move_id, values = row[0], row[1], dict(zip(header_columns, row[2:]))
+            comprobante = ComprobanteRequest()
+            for field_name, attr in _REQUEST_FIELDS:
+                setattr(comprobante, attr, _value(field_name, values[field_name]))
+            response = ComprobanteResponse()
+            for field_name, attr in _RESPONSE_FIELDS:
+                setattr(response, attr, _value(field_name, values[field_name]))
+            response.codigoTipoComprobante = comprobante.codigoTipoComprobante
+            response.numeroPuntoVenta = comprobante.numeroPuntoVenta
+            response.numeroComprobante = comprobante.numeroComprobante
+            response.fechaEmision = comprobante.fechaEmision
+            by_comprobante[comprobante_id] = comprobante
+            res[move_id] = (comprobante, response)
+        if not by_comprobante:
+            return res
+
+        children = [
+            ('afip_wsct_comprobante_item', _ITEM_FIELDS, Item, 'items', 'sequence, id'),
+            ('afip_wsct_comprobante_iva', _IVA_FIELDS, SubtotalIVA, 'subtotales_iva', 'id'),
+            ('afip_wsct_comprobante_asociado', _ASOCIADO_FIELDS, ComprobanteAsociado, 'comprobantes_asociados', 'id'),
+        ]
+        for table, field_map, klass, attr_list, order in children:
+            columns = [field_name for field_name, _attr in field_map]
+            cr.execute(
+                "SELECT comprobante_id, %s FROM %s WHERE comprobante_id IN %%s ORDER BY %s" % (", ".join(columns), table, order),
+                [tuple(by_comprobante)],
+            )
+            for row in cr.fetchall():
+                kwargs = {attr: _value(field_name, value) for (field_name, attr), value in zip(field_map, row[1:])}
+                getattr(by_comprobante[row[0]], attr_list).append(klass(**kwargs))
+        return res
+
+
+class AfipWsctComprobanteItem(models.Model):
+    _name = 'afip.wsct.comprobante.item'
+    _description = 'Item de comprobante WSCT autorizado'
+    _order = 'sequence, id'
+
+    comprobante_id = fields.Many2one('afip.wsct.comprobante', required=True, ondelete='cascade', index=True)
+    sequence = fields.Integer(default=0)
+    tipo = fields.Char(string='Tipo')
+    codigo_turismo = fields.Char(string='Código de Turismo')
+    codigo = fields.Char(string='Código')
+    descripcion = fields.Char(string='Descripción')
+    codigo_alicuota_iva = fields.Char(string='Alícuota IVA')
+    importe_iva = fields.Float(string='Importe IVA', digits=(16, 2))
+    importe_item = fields.Float(string='Importe Item', digits=(16, 2))
+
+
+class AfipWsctComprobanteIva(models.Model):
+    _name = 'afip.wsct.comprobante.iva'
+    _description = 'Subtotal IVA de comprobante WSCT autorizado'
+
+    comprobante_id = fields.Many2one('afip.wsct.comprobante', required=True, ondelete='cascade', index=True)
+    codigo = fields.Char(string='Código')
+    importe = fields.Float(string='Importe', digits=(16, 2))
+
+
+class AfipWsctComprobanteAsociado(models.Model):
+    _name = 'afip.wsct.comprobante.asociado'
+    _description = 'Comprobante asociado de comprobante WSCT autorizado'
+
+    comprobante_id = fields.Many2one('afip.wsct.comprobante', required=True, ondelete='cascade', index=True)
+    codigo_tipo_comprobante = fields.Char(string='Tipo de Comprobante')
+    numero_punto_venta = fields.Char(string='Punto de Venta')
+    numero_comprobante = fields.Char(string='Número de Comprobante')
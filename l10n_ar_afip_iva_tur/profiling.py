@@ -0,0 +1,117 @@
+# l10n_ar_afip_iva_tur/profiling.py
+"""
+Medición por etapas de las acciones del reporte de IVA Turismo.
+
+``profiled`` envuelve una acción: mide su duración total y la de cada etapa marcada con
+``stage(nombre)`` (tiempo, consultas SQL y cantidad de llamadas), deja el resumen en el log
+y en el chatter del reporte y, si el parámetro del sistema ``l10n_ar_afip_iva_tur.profile_actions``
+está activo, guarda además un volcado de cProfile como adjunto del reporte.
+"""
+
+import base64
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import marshal
+import threading
+import time
+
+from markupsafe import Markup
+
+_logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class StageProfiler:
+    """ Acumula tiempo, consultas SQL y llamadas por etapa de una acción. """
+
+    def __init__(self, cr, action_name):
+        self.cr = cr
+        self.action_name = action_name
+        self.stages = {}
+        self.start = time.perf_counter()
+        self.start_queries = cr.sql_log_count
+        self.total = None
+        self.total_queries = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        start_queries = self.cr.sql_log_count
+        try:
+            yield
+        finally:
+            values = self.stages.setdefault(name, [0.0, 0, 0])
+            values[0] += time.perf_counter() - start
+            values[1] += self.cr.sql_log_count - start_queries
+            values[2] += 1
+
+    def stop(self):
+        self.total = time.perf_counter() - self.start
+        self.total_queries = self.cr.sql_log_count - self.start_queries
+
+    def summary_lines(self):
+        lines = ["%s: %.3f s, %s consultas SQL" % (self.action_name, self.total, self.total_queries)]
+        for name, (seconds, queries, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            lines.append("  %s: %.3f s, %s consultas, %s llamadas" % (name, seconds, queries, calls))
+        return lines
+
+
+def stage(name):
+    """ Marca una etapa de la acción que se está midiendo; si no hay ninguna no hace nada. """
+    profiler = getattr(_local, "profiler", None)
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name)
+
+
+def profiled(method):
+    """ Decorador para las acciones de ``afip.iva.tur.report`` (``self`` de un solo registro).
+    Las acciones llamadas desde otra acción medida se suman a la medición de la externa. """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(_local, "profiler", None) is not None:
+            return method(self, *args, **kwargs)
+
+        profiler = StageProfiler(self.env.cr, method.__name__)
+        use_cprofile = bool(self.env['ir.config_parameter'].sudo().get_param('l10n_ar_afip_iva_tur.profile_actions'))
+        cprofile = cProfile.Profile() if use_cprofile else None
+        _local.profiler = profiler
+        try:
+            if cprofile:
+                cprofile.enable()
+            try:
+                res = method(self, *args, **kwargs)
+            finally:
+                if cprofile:
+                    cprofile.disable()
+                profiler.stop()
+                _logger.info("Tiempos de %s:\n%s", self.display_name, "\n".join(profiler.summary_lines()))
+        finally:
+            _local.profiler = None
+
+        self.message_post(body=Markup("<br/>").join(profiler.summary_lines()))
+        if cprofile:
+            _store_cprofile(self, method.__name__, cprofile)
+        return res
+
+    return wrapper
+
+
+def _store_cprofile(record, action_name, cprofile):
+    """ Guarda las estadísticas de cProfile (formato de ``pstats``) como adjunto de ``record``. """
+    cprofile.create_stats()
+    stream = io.BytesIO()
+    marshal.dump(cprofile.stats, stream)
+    record.env['ir.attachment'].sudo().create({
+        'name': "%s_%s.prof" % (action_name, time.strftime('%Y%m%d_%H%M%S')),
+        'res_model': record._name,
+        'res_id': record.id,
+        'type': 'binary',
+        'datas': base64.b64encode(stream.getvalue()),
+        'mimetype': 'application/octet-stream',
+    })
@@ -0,0 +1,13 @@
+# l10n_ar_afip_iva_tur/tests/__init__.py
+from . import test_afip_utils
+from . import test_export_payments
+from . import test_report_refresh
+from . import test_export_attachment
+from . import test_wsct_snapshot
+from . import test_fixed_width
+from . import test_f8089
+from . import test_f8089_reader
+from . import test_report_jobs
+from . import test_report_lines
+from . import test_cli
+from . import test_report_invoices
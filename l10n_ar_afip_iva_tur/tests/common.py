@@ -0,0 +1,97 @@
+# l10n_ar_afip_iva_tur/tests/common.py
+""" Datos compartidos por los tests: un comprobante T autorizado por WSCT (request y response). """
+
+import datetime
+
+from odoo.addons.l10n_ar_afip_iva_tur.f8089 import InvoiceExportData
+
+CUIT = "20111111112"
+
+XML_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ser="http://ar.gob.afip.wsct/CTService/">
+  <soap:Body>
+    <ser:autorizarComprobanteRequest>
+      <authRequest><token>t</token><sign>s</sign><cuitRepresentada>20111111112</cuitRepresentada></authRequest>
+      <comprobanteRequest>
+        <codigoTipoComprobante>195</codigoTipoComprobante>
+        <numeroPuntoVenta>3</numeroPuntoVenta>
+        <numeroComprobante>12</numeroComprobante>
+        <fechaEmision>2025-06-01</fechaEmision>
+        <codigoTipoAutorizacion>E</codigoTipoAutorizacion>
+        <codigoTipoDocumento>91</codigoTipoDocumento>
+        <numeroDocumento>AB123456</numeroDocumento>
+        <idImpositivo>9</idImpositivo>
+        <codigoPais>212</codigoPais>
+        <domicilioReceptor>Calle Falsa 123</domicilioReceptor>
+        <codigoRelacionEmisorReceptor>1</codigoRelacionEmisorReceptor>
+        <importeGravado>1000.10</importeGravado>
+        <importeNoGravado>0</importeNoGravado>
+        <importeExento>0</importeExento>
+        <importeReintegro>-210.02</importeReintegro>
+        <importeTotal>1000.10</importeTotal>
+        <codigoMoneda>{moneda}</codigoMoneda>
+        <cotizacionMoneda>{cotizacion}</cotizacionMoneda>
+        <observaciones></observaciones>
+        <arrayItems>
+          <item>
+            <tipo>0</tipo><codigoTurismo>1</codigoTurismo><codigo>HAB</codigo><descripcion>Habitacion</descripcion>
+            <codigoAlicuotaIVA>5</codigoAlicuotaIVA><importeIVA>210.02</importeIVA><importeItem>1000.10</importeItem>
+          </item>
+        </arrayItems>
+        <arraySubtotalesIVA><subtotalIVA><codigo>5</codigo><importe>210.02</importe></subtotalIVA></arraySubtotalesIVA>
+        <arrayComprobantesAsociados>
+          <comprobanteAsociado>
+            <codigoTipoComprobante>195</codigoTipoComprobante><numeroPuntoVenta>3</numeroPuntoVenta><numeroComprobante>11</numeroComprobante>
+          </comprobanteAsociado>
+        </arrayComprobantesAsociados>
+      </comprobanteRequest>
+    </ser:autorizarComprobanteRequest>
+  </soap:Body>
+</soap:Envelope>"""
+
+XML_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+  <soap:Body>
+    <autorizarComprobanteResponse xmlns="http://ar.gob.afip.wsct/CTService/">
+      <autorizarComprobanteReturn>
+        <comprobanteResponse xmlns="">
+          <cuit>20111111112</cuit><codigoTipoComprobante>195</codigoTipoComprobante>
+          <numeroPuntoVenta>3</numeroPuntoVenta><numeroComprobante>12</numeroComprobante>
+          <fechaEmision>2025-06-01</fechaEmision><CAE>75123456789012</CAE><fechaVencimientoCAE>2025-06-11</fechaVencimientoCAE>
+        </comprobanteResponse>
+        <resultado xmlns="">A</resultado>
+      </autorizarComprobanteReturn>
+    </autorizarComprobanteResponse>
+  </soap:Body>
+</soap:Envelope>"""
+
+# Malformados o vacíos: los dos backends de afip_utils deben lanzar el mismo tipo de error
+INVALID_XML = ["", "<soap:Envelope", "no es xml", "<a><b></a>"]
+
+
+def xml_request(moneda="PES", cotizacion="1.000000", numero=12):
+    return XML_REQUEST.format(moneda=moneda, cotizacion=cotizacion).replace(
+        "<numeroComprobante>12</numeroComprobante>", "<numeroComprobante>%s</numeroComprobante>" % numero)
+
+
+def xml_response(numero=12):
+    return XML_RESPONSE.replace("<numeroComprobante>12</numeroComprobante>", "<numeroComprobante>%s</numeroComprobante>" % numero)
+
+
+def export_data(**kwargs):
+    """ ``InvoiceExportData`` del comprobante de ``XML_REQUEST``; ``kwargs`` reemplaza sus valores. """
+    values = dict(
+        move_id=1, name="T 00003-00000012", invoice_date=datetime.date(2025, 6, 1), partner_name="John",
+        amount_total=100010, payment_type="1", xml_request=xml_request(), xml_response=xml_response(),
+    )
+    values.update(kwargs)
+    return InvoiceExportData(**values)
+
+
+def as_dict(value):
+    """ Convierte los objetos de afip_utils (con ``__slots__``) en dicts y listas para compararlos. """
+    if isinstance(value, list):
+        return [as_dict(item) for item in value]
+    if hasattr(value, "__slots__"):
+        return {name: as_dict(getattr(value, name)) for name in value.__slots__}
+    return value
@@ -0,0 +1,94 @@
+# l10n_ar_afip_iva_tur/tests/test_afip_utils.py
+
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
+from odoo.tests.common import BaseCase
+from odoo.addons.l10n_ar_afip_iva_tur import afip_utils
+from odoo.addons.l10n_ar_afip_iva_tur.tests.common import INVALID_XML, as_dict, xml_request, xml_response
+
+
+class TestAfipUtilsBackends(BaseCase):
+    """ Los backends stdlib y lxml de afip_utils devuelven lo mismo y fallan igual. """
+
+    def _backends(self):
+        backends = [("etree", afip_utils._parse_autorizar_comprobante_etree, afip_utils._parse_afip_response_etree)]
+        if afip_utils.lxml_etree is not None:
+            backends.append(("lxml", afip_utils._parse_autorizar_comprobante_lxml, afip_utils._parse_afip_response_lxml))
+        return backends
+
+    def test_parse_request(self):
+        request = afip_utils.parse_autorizar_comprobante(xml_request())
+        comprobante = request.comprobante
+        self.assertEqual(request.auth.cuitRepresentada, "20111111112")
+        self.assertEqual(comprobante.numeroPuntoVenta, "3")
+        self.assertEqual(comprobante.numeroComprobante, "12")
+        self.assertEqual(comprobante.importeTotal, 100010)
+        self.assertEqual(comprobante.importeReintegro, -21002)
+        self.assertEqual(comprobante.cotizacionMoneda, 1000000)
+        self.assertEqual([item.importeItem for item in comprobante.items], [100010])
+        self.assertEqual([(iva.codigo, iva.importe) for iva in comprobante.subtotales_iva], [("5", 21002)])
+        self.assertEqual([asociado.numeroComprobante for asociado in comprobante.comprobantes_asociados], ["11"])
+
+    def test_parse_response(self):
+        response = afip_utils.parse_afip_response(xml_response())
+        self.assertEqual(response.tipo_autorizacion, "CAE")
+        self.assertEqual(response.codigo_autorizacion, "75123456789012")
+        self.assertEqual(response.fechaVencimiento, "2025-06-11")
+        self.assertEqual(response.resultado, "A")
+
+    def test_backends_parity(self):
+        backends = self._backends()
+        reference_request = as_dict(backends[0][1](xml_request(moneda="DOL", cotizacion="1234.567890")))
+        reference_response = as_dict(backends[0][2](xml_response()))
+        for name, parse_request, parse_response in backends[1:]:
+            with self.subTest(backend=name):
+                self.assertEqual(as_dict(parse_request(xml_request(moneda="DOL", cotizacion="1234.567890"))), reference_request)
+                self.assertEqual(as_dict(parse_response(xml_response())), reference_response)
+
+    def test_invalid_xml_raises_parse_error(self):
+        for name, parse_request, parse_response in self._backends():
+            for xml in INVALID_XML:
+                with self.subTest(backend=name, xml=xml):
+                    with self.assertRaises(ET.ParseError):
+                        parse_request(xml)
+                    with self.assertRaises(ET.ParseError):
+                        parse_response(xml)
+
+    def test_missing_nodes_raise_value_error(self):
+        for name, parse_request, _parse_response in self._backends():
+            with self.subTest(backend=name):
+                with self.assertRaises(ValueError):
+                    parse_request("<soap:Envelope xmlns:soap='http://schemas.xmlsoap.org/soap/envelope/'/>")
+
+
+class TestScaledAmounts(BaseCase):
+    """ Importes como enteros escalados, sin pasar por float. """
+
+    def test_parse_scaled(self):
+        cases = [
+            ("1234.56", 123456), ("0", 0), ("-210.02", -21002), ("-0.01", -1), ("1.5", 150), (".5", 50),
+            (" 12 ", 1200), ("1e2", 10000),
+            # Nodos vacíos del XML
+            ("", 0), ("  ", 0),
+            # Más decimales que la escala: redondeo desde la mitad, alejándose de cero
+            ("1.005", 101), ("1.004", 100), ("-1.005", -101),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(afip_utils.parse_scaled(text), expected)
+        self.assertEqual(afip_utils.parse_scaled("1.000000", afip_utils.RATE_SCALE), 1000000)
+        self.assertEqual(afip_utils.parse_scaled("1234.5678915", afip_utils.RATE_SCALE), 1234567892)
+
+    def test_parse_scaled_invalid(self):
+        for text in ("abc", "1,50", "1.2.3"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                afip_utils.parse_scaled(text)
+
+    def test_to_scaled(self):
+        self.assertEqual(afip_utils.to_scaled(Decimal("1000.10")), 100010)
+        self.assertEqual(afip_utils.to_scaled(Decimal("1.005")), 101)
+        self.assertEqual(afip_utils.to_scaled(Decimal("-1.005")), -101)
+        self.assertEqual(afip_utils.to_scaled(0), 0)
+        self.assertEqual(afip_utils.to_scaled(Decimal("1234.567891"), afip_utils.RATE_SCALE), 1234567891)
+        self.assertEqual(afip_utils.format_fixed_decimal(1234567891), "000000001234567891")
@@ -0,0 +1,70 @@
+# l10n_ar_afip_iva_tur/tests/test_cli.py
+
+import contextlib
+import datetime
+import io
+import types
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+from odoo.tools import config
+from odoo.addons.l10n_ar_afip_iva_tur.cli import iva_tur_export
+from odoo.addons.l10n_ar_afip_iva_tur.cli.iva_tur_export import EXIT_CONFLICT, EXIT_EMPTY, EXIT_USAGE, IvaTurExport
+
+
+class TestIvaTurExportCommand(TransactionCase):
+    """ Códigos de salida del subcomando ``iva_tur_export``. """
+
+    def setUp(self):
+        super().setUp()
+        # El comando abre su propio cursor y confirma: dentro del test usa el del test
+        registry = types.SimpleNamespace(cursor=lambda: contextlib.nullcontext(self.env.cr))
+        self.patch(iva_tur_export, 'odoo', types.SimpleNamespace(registry=lambda dbname: registry))
+        self.patch(self.env.cr, 'commit', lambda: None)
+        self.patch(self.env.cr, 'rollback', lambda: None)
+        self.stderr = io.StringIO()
+        self.startPatcher(patch('sys.stderr', self.stderr))
+
+    def _run(self, *cmdargs):
+        with self.assertRaises(SystemExit) as context:
+            IvaTurExport().run(list(cmdargs))
+        return context.exception.code
+
+    def _export(self, **kwargs):
+        values = {
+            'company': str(self.env.company.id),
+            'period': (datetime.date(2025, 6, 1), datetime.date(2025, 6, 30)),
+            'output': '-',
+            'rebuild': False,
+        }
+        args = types.SimpleNamespace(**dict(values, **kwargs))
+        return IvaTurExport().export(self.env.cr.dbname, args)
+
+    def test_usage_errors(self):
+        self.assertEqual(self._run('--period', '2025-06'), EXIT_USAGE) # falta --company
+        self.assertEqual(self._run('--company', '1', '--period', '2025-13'), EXIT_USAGE)
+        self.assertIn("período inválido", self.stderr.getvalue())
+        with patch.object(config, 'parse_config'), patch.dict(config.options, {'db_name': False}):
+            self.assertEqual(self._run('--company', '1', '--period', '2025-06'), EXIT_USAGE)
+        self.assertIn("falta la base de datos (-d)", self.stderr.getvalue())
+
+    def test_unknown_company(self):
+        self.assertEqual(self._export(company='no existe'), EXIT_USAGE)
+
+    def test_empty_period(self):
+        self.assertEqual(self._export(), EXIT_EMPTY)
+        self.assertEqual(self._export(rebuild=True), EXIT_EMPTY)
+        # La segunda corrida usa el reporte que creó la primera
+        self.assertEqual(self.env['afip.iva.tur.report'].search_count([
+            ('company_id', '=', self.env.company.id), ('date_from', '=', '2025-06-01'),
+        ]), 1)
+
+    def test_conflict(self):
+        report = self.env['afip.iva.tur.report'].create({
+            'company_id': self.env.company.id,
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+        })
+        report.action_enqueue_update_invoices()
+        self.assertEqual(self._export(), EXIT_CONFLICT) # el reporte tiene un proceso activo
+        self.assertTrue(self.stderr.getvalue())
@@ -0,0 +1,43 @@
+# l10n_ar_afip_iva_tur/tests/test_export_attachment.py
+
+import datetime
+import tempfile
+
+from odoo.tests.common import TransactionCase
+
+
+class TestExportAttachment(TransactionCase):
+    """ Guardado del exportable como adjunto sin pasar el contenido completo por memoria. """
+
+    def setUp(self):
+        super().setUp()
+        self.report = self.env['afip.iva.tur.report'].create({
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+        })
+
+    def _store(self, content):
+        with tempfile.TemporaryFile() as tmp:
+            tmp.write(content)
+            tmp.seek(0)
+            self.report._store_export_file(tmp)
+        return self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self.report._name),
+            ('res_field', '=', 'exported_file'),
+            ('res_id', '=', self.report.id),
+        ])
+
+    def test_store_and_replace(self):
+        # Más grande que un bloque de copia, para recorrer más de una vuelta
+        content = b"01" + b"x" * 38 + b"\r\n" + b"02" + b"9" * 183 * 10000 + b"\r\n"
+        attachment = self._store(content)
+        self.assertEqual(len(attachment), 1)
+        self.assertEqual(attachment.raw, content)
+        self.assertEqual(attachment.file_size, len(content))
+        with self.report._open_export_file() as buffer:
+            self.assertEqual(bytes(buffer), content)
+
+        replacement = b"01" + b"y" * 38 + b"\r\n"
+        self.assertEqual(self._store(replacement), attachment)
+        self.assertEqual(attachment.raw, replacement)
+        self.assertEqual(attachment.checksum, attachment._compute_checksum(replacement))
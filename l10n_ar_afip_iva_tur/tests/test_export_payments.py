@@ -0,0 +1,49 @@
+# l10n_ar_afip_iva_tur/tests/test_export_payments.py
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestExportPayments(AccountTestInvoicingCommon):
+    """ Importes de los pagos (registro 08) leídos por ``_query_export_payments``. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.currency_data = cls.setup_multi_currency_data()
+        cls.bank_journal = cls.company_data['default_journal_bank']
+        cls.bank_journal.l10n_ar_afip_wsct_payment_type = '3'
+
+    def _pay(self, invoice, amount, currency):
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=invoice.ids,
+        ).create({
+            'payment_date': invoice.invoice_date,
+            'journal_id': self.bank_journal.id,
+            'currency_id': currency.id,
+            'amount': amount,
+        })._create_payments()
+
+    def test_payments_in_invoice_currency(self):
+        """ Una factura en moneda extranjera informa los pagos en esa moneda, no en la de la compañía. """
+        currency = self.currency_data['currency']
+        invoice = self.init_invoice(
+            'out_invoice', amounts=[1000.0], currency=currency, invoice_date=fields.Date.from_string('2017-01-01'),
+            post=True,
+        )
+        self._pay(invoice, 600.0, currency)
+        self._pay(invoice, invoice.amount_total - 600.0, currency)
+
+        payments = self.env['afip.iva.tur.report']._query_export_payments(invoice.ids)[invoice.id]
+        self.assertEqual(payments, [('3', 60000), ('3', round(invoice.amount_total * 100) - 60000)])
+        self.assertNotEqual(invoice.amount_total, invoice.amount_total_signed) # la cotización no es 1
+
+    def test_payments_in_company_currency(self):
+        invoice = self.init_invoice(
+            'out_invoice', amounts=[500.0], invoice_date=fields.Date.from_string('2017-01-01'), post=True,
+        )
+        self._pay(invoice, invoice.amount_total, invoice.currency_id)
+        payments = self.env['afip.iva.tur.report']._query_export_payments(invoice.ids)[invoice.id]
+        self.assertEqual(payments, [('3', round(invoice.amount_total * 100))])
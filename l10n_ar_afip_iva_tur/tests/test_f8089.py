@@ -0,0 +1,91 @@
+# l10n_ar_afip_iva_tur/tests/test_f8089.py
+
+from odoo.tests.common import BaseCase
+from odoo.addons.l10n_ar_afip_iva_tur import f8089
+from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import parse_afip_response, parse_autorizar_comprobante
+from odoo.addons.l10n_ar_afip_iva_tur.fixed_width import FieldOverflowError
+from odoo.addons.l10n_ar_afip_iva_tur.tests.common import CUIT, export_data, xml_request, xml_response
+
+# Registros del comprobante de ``tests.common`` tal como los armaba el exportable antes del motor de ancho fijo
+EXPECTED_BLOCK = [
+    "0209100003000000122025060191AB123456            02120901000000000100010000000000000000000000000000000-00000000021002"
+    "PES000000000001000000CAE75123456789012      0000000000000000000100010",
+    "0311000000000000000000000000021002",
+    "0491AB123456            0212John                                              02120212",
+    "05201111111120910000300000012CAE7512345678901220250601      0000000000-00000000021002",
+    "061950000300000011",
+    "07000001HAB" + " " * 76 + "Habitacion" + " " * 213 + "11000000000021002000000000100010",
+    "081" + " " * 39 + "000000000100010",
+]
+
+
+class TestF8089Render(BaseCase):
+    """ Registros del exportable F8089 armados con los diseños de ``f8089``. """
+
+    def test_header(self):
+        header = f8089.render_header(CUIT, "202506", "0003", "0")
+        self.assertEqual(header, "0120111111112202506000301038588089001000")
+        self.assertEqual(len(header), f8089.RECORD_01.width)
+
+    def test_invoice_block(self):
+        block = f8089.render_invoice_block(export_data(), CUIT)
+        self.assertTrue(block.endswith("\r\n"))
+        lines = block[:-2].split("\r\n")
+        self.assertEqual(lines, EXPECTED_BLOCK)
+        for line in lines:
+            self.assertEqual(len(line), f8089.RECORD_LAYOUTS[line[:2]].width)
+
+    def test_parsed_data(self):
+        # Con el comprobante ya parseado (snapshot) se arma lo mismo que leyendo el XML
+        data = export_data(
+            xml_request=None, xml_response=None,
+            comprobante=parse_autorizar_comprobante(xml_request()).comprobante,
+            response=parse_afip_response(xml_response()),
+        )
+        self.assertEqual(f8089.render_invoice_block(data, CUIT), f8089.render_invoice_block(export_data(), CUIT))
+
+    def test_one_record_08_per_payment(self):
+        data = export_data(payments=[("3", 60000), ("1", 40010)])
+        records = [line for line in f8089.render_invoice(data, CUIT) if line.startswith("08")]
+        self.assertEqual(records, [
+            "083" + " " * 39 + "000000000060000",
+            "081" + " " * 39 + "000000000040010",
+        ])
+
+    def test_overflow_names_invoice(self):
+        data = export_data(partner_name="X" * 51)
+        with self.assertRaises(FieldOverflowError) as context:
+            f8089.render_invoice_block(data, CUIT)
+        self.assertEqual(context.exception.invoice_name, "T 00003-00000012")
+        self.assertEqual(context.exception.field_name, "nombre_turista")
+
+    def test_validate(self):
+        self.assertEqual(f8089.validate_invoice(export_data(), CUIT), [])
+        issues = f8089.validate_invoices([
+            export_data(),
+            export_data(name="T 00003-00000013", partner_name="X" * 51, payment_type=False),
+            export_data(name="T 00003-00000014", xml_request="no es xml"),
+        ], CUIT)
+        self.assertEqual(
+            [(issue.invoice_name, issue.record_code, issue.field_name) for issue in issues],
+            [
+                ("T 00003-00000013", "04", "nombre_turista"),
+                ("T 00003-00000013", "08", "tipo_forma_pago"),
+                ("T 00003-00000014", None, None),
+            ],
+        )
+        self.assertIn("no se pudo leer el XML", str(issues[-1]))
+
+    def test_validate_missing_xml(self):
+        for values in ({"xml_request": None}, {"xml_response": None}, {"xml_request": None, "xml_response": ""}):
+            with self.subTest(values=values):
+                issues = f8089.validate_invoice(export_data(**values), CUIT)
+                self.assertEqual(len(issues), 1)
+                self.assertIn("no tiene los datos de la autorización de AFIP", str(issues[0]))
+        # Con el snapshot no hace falta el XML
+        data = export_data(
+            xml_request=None, xml_response=None,
+            comprobante=parse_autorizar_comprobante(xml_request()).comprobante,
+            response=parse_afip_response(xml_response()),
+        )
+        self.assertEqual(f8089.validate_invoice(data, CUIT), [])
@@ -0,0 +1,132 @@
+# l10n_ar_afip_iva_tur/tests/test_f8089_reader.py
+
+import tempfile
+
+from odoo.tests.common import BaseCase
+from odoo.addons.l10n_ar_afip_iva_tur import f8089, f8089_reader
+from odoo.addons.l10n_ar_afip_iva_tur.tests.common import CUIT, export_data, xml_request, xml_response
+
+
+def render_file(datas, cuit=CUIT):
+    header = f8089.render_header(cuit, "202506", "0000", "0" if datas else "1") + "\r\n"
+    return (header + "".join(f8089.render_invoice_block(data, CUIT) for data in datas)).encode("utf-8")
+
+
+class TestF8089Reader(BaseCase):
+    """ Lectura, comparación y verificación de archivos armados por ``f8089``. """
+
+    def setUp(self):
+        super().setUp()
+        self.first = export_data()
+        self.second = export_data(
+            move_id=2, name="T 00003-00000013", xml_request=xml_request(numero=13), xml_response=xml_response(numero=13),
+            payments=[("1", 50000), ("2", 50010)],
+        )
+
+    def test_scan_round_trip(self):
+        content = render_file([self.first, self.second])
+        with tempfile.TemporaryFile() as file:
+            file.write(content)
+            file.flush()
+            with f8089_reader.map_file(file) as buffer:
+                result = f8089_reader.scan(buffer)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.header["cuit_informante"], CUIT)
+        self.assertEqual(list(result.invoices), ["00003-00000012-75123456789012", "00003-00000013-75123456789012"])
+        self.assertEqual(dict(result.record_counts), {"01": 1, "02": 2, "03": 2, "04": 2, "05": 2, "06": 2, "07": 2, "08": 3})
+        self.assertEqual(result.line_count, 16)
+        self.assertEqual((result.importe_total, result.payments_total), (200020, 200020))
+        # La ubicación de cada bloque en el archivo es la de su texto armado
+        invoice = result.invoices["00003-00000013-75123456789012"]
+        self.assertEqual(content[invoice.start:invoice.end].decode(), f8089.render_invoice_block(self.second, CUIT))
+
+    def test_scan_empty_file(self):
+        with tempfile.TemporaryFile() as file, f8089_reader.map_file(file) as buffer:
+            self.assertEqual(buffer, b"")
+            result = f8089_reader.scan(buffer)
+        self.assertEqual((result.errors, result.line_count), ([], 0))
+
+    def test_scan_errors(self):
+        content = render_file([self.first])
+        lines = content.split(b"\r\n")
+        broken = b"\r\n".join([lines[1], lines[0], b"99xx", lines[2][:-1], b"08" + b"x" * 55]) # sin CRLF final
+        errors = f8089_reader.scan(broken).errors
+        for message in ("el archivo no empieza con el registro 01", "el registro 01 debe ser la primera línea",
+                        "tipo de registro desconocido '99'", "el registro 03 tiene 33 caracteres",
+                        "el registro 08 tiene un importe que no es numérico", "no tiene registro 08",
+                        "la última línea no termina en CRLF"):
+            with self.subTest(message=message):
+                self.assertTrue(any(message in error for error in errors), errors)
+
+    def test_scan_record_order(self):
+        lines = render_file([self.first, self.second]).split(b"\r\n")
+        # Primer bloque (líneas 2 a 8) con el 05 antes que el 04 y sin el 08
+        broken = b"\r\n".join(lines[:3] + [lines[4], lines[3]] + lines[5:7] + lines[8:])
+        errors = f8089_reader.scan(broken).errors
+        self.assertEqual(errors, [
+            "Línea 5: el registro 04 no puede ir después del registro 05",
+            "Línea 7: el comprobante 00003-00000012-75123456789012 no tiene registro 08",
+        ])
+        # Un registro que no se repite, repetido; y un bloque sin 04 al final del archivo
+        broken = b"\r\n".join(lines[:4] + [lines[4], lines[4]] + lines[5:10] + lines[11:])
+        errors = f8089_reader.scan(broken).errors
+        self.assertEqual(errors, [
+            "Línea 6: el registro 05 no puede ir después del registro 05",
+            "Línea 16: el comprobante 00003-00000013-75123456789012 no tiene registro 04",
+        ])
+
+    def test_diff(self):
+        old = render_file([self.first])
+        new = render_file([export_data(partner_name="Jane"), self.second])
+        changes = f8089_reader.diff(old, f8089_reader.scan(old), new, f8089_reader.scan(new))
+        self.assertEqual(changes["added"], ["00003-00000013-75123456789012"])
+        self.assertEqual(changes["removed"], [])
+        self.assertEqual(changes["changed_count"], 1)
+        self.assertEqual(changes["changed"][0]["changes"], [
+            {"record": "04", "index": 0, "field": "nombre_turista", "old": "John", "new": "Jane"},
+        ])
+        self.assertEqual(changes["record_counts"]["08"], [1, 3])
+        self.assertEqual(changes["importe_total"], [100010, 200020])
+
+    def test_diff_same_file(self):
+        content = render_file([self.first, self.second])
+        result = f8089_reader.scan(content)
+        changes = f8089_reader.diff(content, result, content, result)
+        self.assertEqual((changes["added"], changes["removed"], changes["changed_count"]), ([], [], 0))
+
+    def test_verify(self):
+        datas = [self.first, self.second]
+        result = f8089_reader.scan(render_file(datas))
+        self.assertEqual(f8089_reader.verify(result, f8089_reader.expected_invoices(datas, CUIT), CUIT), [])
+
+    def test_verify_mismatch(self):
+        result = f8089_reader.scan(render_file([self.first, self.second]))
+        expected = f8089_reader.expected_invoices([
+            export_data(payments=[("1", 7)]),
+            export_data(name="T 00003-00000099", xml_request=xml_request(numero=99), xml_response=xml_response(numero=99)),
+            export_data(name="T roto", xml_request="no es xml"),
+        ], CUIT)
+        issues = f8089_reader.verify(result, expected, "20999999992")
+        self.assertEqual(len(issues), 5, issues)
+        self.assertIn("La cabecera informa el CUIT 20111111112", issues[0])
+        self.assertIn("T 00003-00000012: los pagos del archivo suman 1000.10 y deberían sumar 0.07", issues[1])
+        self.assertIn("T 00003-00000099: no está en el archivo", issues[2])
+        self.assertIn("T roto: no se pudieron armar sus datos", issues[3])
+        self.assertIn("00003-00000013-75123456789012", issues[4])
+
+    def test_verify_record_counts(self):
+        result = f8089_reader.scan(render_file([self.first, self.second]))
+        self.assertEqual(dict(result.invoices["00003-00000013-75123456789012"].record_counts),
+                         {"02": 1, "03": 1, "04": 1, "05": 1, "06": 1, "07": 1, "08": 2})
+        # Mismo total de pagos en un solo registro 08
+        expected = f8089_reader.expected_invoices([self.first, export_data(
+            move_id=2, name="T 00003-00000013", xml_request=xml_request(numero=13), xml_response=xml_response(numero=13),
+            payments=[("1", 100010)],
+        )], CUIT)
+        self.assertEqual(f8089_reader.verify(result, expected, CUIT), [
+            "T 00003-00000013: el archivo tiene 2 registros 08 y debería tener 1",
+        ])
+
+    def test_expected_invoices_without_xml(self):
+        expected = list(f8089_reader.expected_invoices([export_data(xml_request=None, xml_response=None)], CUIT))
+        self.assertEqual(expected, [("T 00003-00000012", None, None, None, None)])
@@ -0,0 +1,69 @@
+# l10n_ar_afip_iva_tur/tests/test_fixed_width.py
+
+import pickle
+
+from odoo.tests.common import BaseCase
+from odoo.addons.l10n_ar_afip_iva_tur.fixed_width import Field, FieldOverflowError, RecordLayout
+
+LAYOUT = RecordLayout("99", [
+    Field.text("nombre", 6),
+    Field.number("numero", 4),
+    Field.const("AB"),
+    Field.amount("importe", 8),
+    Field.text("codigo", 3, align="right", pad="*"),
+])
+
+
+class TestFixedWidth(BaseCase):
+    """ Formato, lectura y validación de registros de ancho fijo. """
+
+    def test_format(self):
+        self.assertEqual(LAYOUT.width, 2 + 6 + 4 + 2 + 8 + 3)
+        line = LAYOUT.format({"nombre": "Ana", "numero": 12, "importe": 12345, "codigo": "X"})
+        self.assertEqual(line, "99Ana   0012AB00012345**X")
+        self.assertEqual(len(line), LAYOUT.width)
+
+    def test_format_empty_and_negative(self):
+        # Los valores vacíos (None/False) se rellenan y el signo queda delante de los ceros
+        line = LAYOUT.format({"nombre": False, "importe": -21002})
+        self.assertEqual(line, "99      0000AB-0021002***")
+
+    def test_overflow(self):
+        with self.assertRaises(FieldOverflowError) as context:
+            LAYOUT.format({"nombre": "Demasiado largo"})
+        error = context.exception
+        self.assertEqual((error.record_code, error.field_name, error.width), ("99", "nombre", 6))
+        self.assertIsInstance(error, ValueError)
+        with self.assertRaises(FieldOverflowError):
+            LAYOUT.format({"importe": 10 ** 8})
+        with self.assertRaises(FieldOverflowError):
+            RecordLayout("98", [Field.const("ABC"), Field("x", 2, value="XYZ")])
+
+    def test_overflow_error_pickles(self):
+        # Los procesos del pool devuelven el error al proceso principal
+        error = FieldOverflowError("02", "importe_total", 15, 10 ** 16, "1" * 17, "T 00003-00000012")
+        copy = pickle.loads(pickle.dumps(error))
+        self.assertEqual(str(copy), str(error))
+        self.assertEqual(copy.invoice_name, "T 00003-00000012")
+
+    def test_parse(self):
+        values = {"nombre": "Ana", "numero": 12, "importe": -21002, "codigo": "X"}
+        parsed = LAYOUT.parse(LAYOUT.format(values))
+        self.assertEqual(parsed, {"nombre": "Ana   ", "numero": "0012", "importe": -21002, "codigo": "**X"})
+        self.assertEqual([name for name, _start, _end, _amount in LAYOUT.slices], ["nombre", "numero", "importe", "codigo"])
+        with self.assertRaises(ValueError):
+            LAYOUT.parse("99Ana   0012ABimporte!**X")
+
+    def test_validate(self):
+        self.assertEqual(LAYOUT.validate({"nombre": "Ana", "numero": 12, "importe": 100}), [])
+        issues = dict(LAYOUT.validate({
+            "nombre": "Demasiado largo", "numero": "12a", "importe": 1.5, "codigo": "ABCD",
+        }))
+        self.assertEqual(set(issues), {"nombre", "numero", "importe", "codigo"})
+        self.assertIn("no es numérico", issues["numero"])
+        self.assertIn("no es un entero escalado", issues["importe"])
+        issues = dict(LAYOUT.validate({"importe": 10 ** 8}))
+        self.assertIn("1000000.00", issues["importe"])
+        # Los importes negativos pierden un dígito por el signo
+        self.assertEqual(LAYOUT.validate({"importe": -(10 ** 7 - 1)}), [])
+        self.assertEqual(len(LAYOUT.validate({"importe": -(10 ** 7)})), 1)
@@ -0,0 +1,129 @@
+# l10n_ar_afip_iva_tur/tests/test_report_invoices.py
+
+import datetime
+
+from psycopg2 import IntegrityError
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReportInvoices(AccountTestInvoicingCommon):
+    """ Comprobantes de cada reporte: conflictos entre reportes y actualización incremental. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.document_type = cls.env['l10n_latam.document.type'].search([('code', '=', '195'), ('l10n_ar_letter', '=', 'T')], limit=1)
+        if not cls.document_type:
+            cls.document_type = cls.env['l10n_latam.document.type'].create({
+                'name': 'FACTURAS T', 'code': '195', 'l10n_ar_letter': 'T', 'internal_type': 'invoice',
+                'country_id': cls.env.ref('base.ar').id,
+            })
+        cls.Line = cls.env['afip.iva.tur.report.line']
+        cls.first, cls.second = cls._invoice(1), cls._invoice(2)
+
+    @classmethod
+    def _invoice(cls, day, month=6):
+        """ Factura publicada con tipo de documento T (sin pasar por la autorización de WSCT). """
+        move = cls.init_invoice('out_invoice', amounts=[100.0], invoice_date=datetime.date(2025, month, day), post=True)
+        cls.env.cr.execute("UPDATE account_move SET l10n_latam_document_type_id = %s WHERE id = %s", [cls.document_type.id, move.id])
+        move.invalidate_recordset(['l10n_latam_document_type_id'])
+        return move
+
+    def _report(self, **values):
+        return self.env['afip.iva.tur.report'].create(dict({
+            'company_id': self.env.company.id,
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+        }, **values))
+
+    def _move_ids(self, report):
+        return set(self.Line._get_move_ids(report))
+
+    def test_conflicts_across_reports(self):
+        report = self._report()
+        report.action_rebuild_invoices()
+        self.assertEqual(self._move_ids(report), {self.first.id, self.second.id})
+        other = self._report(date_from=datetime.date(2025, 6, 2))
+
+        self.assertEqual(self.Line._get_conflicts((self.first | self.second).ids, report), [])
+        self.assertEqual(self.Line._get_conflicts([], other), [])
+        self.assertEqual(self.Line._get_conflicts(self.second.ids, other), [
+            (self.second.id, self.second.name, report.id, report.name),
+        ])
+        # Un reporte nuevo (todavía sin guardar) también ve los comprobantes de los demás
+        self.assertEqual(len(self.Line._get_conflicts(self.second.ids, self.env['afip.iva.tur.report'])), 1)
+
+        with self.assertRaises(UserError) as context:
+            other.action_rebuild_invoices()
+        self.assertIn("La factura %s ya está incluida en el reporte(s): %s (ID: %s)" % (self.second.name, report.name, report.id),
+                      context.exception.args[0])
+        self.assertFalse(self._move_ids(other))
+
+        # Liberado del primer reporte (al volverlo a borrador), el comprobante puede pasar al otro
+        report.action_set_to_draft()
+        other.action_rebuild_invoices()
+        self.assertEqual(self._move_ids(other), {self.second.id})
+
+    @mute_logger('odoo.sql_db')
+    def test_single_owner(self):
+        report, other = self._report(), self._report()
+        self.Line.create({'report_id': report.id, 'move_id': self.first.id})
+        with self.assertRaises(IntegrityError), self.env.cr.savepoint():
+            self.Line.create({'report_id': other.id, 'move_id': self.first.id})
+
+    def _set_write_date(self, moves, delta):
+        self.env.flush_all()
+        self.env.cr.execute("UPDATE account_move SET write_date = now() at time zone 'UTC' + %s WHERE id IN %s",
+                            [delta, tuple(moves.ids)])
+        moves.invalidate_recordset(['write_date'])
+
+    def test_incremental_add_and_remove(self):
+        report = self._report()
+        report.action_update_invoices() # la primera vez busca todo el período
+        self.assertEqual(self._move_ids(report), {self.first.id, self.second.id})
+
+        self.first.button_draft()
+        self.first.button_cancel()
+        third = self._invoice(3)
+        self._invoice(1, month=7) # modificado pero fuera del período
+        report.action_update_invoices()
+        self.assertEqual(self._move_ids(report), {self.second.id, third.id})
+        self.assertEqual(report.invoice_count, 2)
+
+    def test_incremental_conflict(self):
+        report, other = self._report(), self._report(date_from=datetime.date(2025, 5, 1))
+        report.action_update_invoices()
+        moved = self._invoice(4)
+        self.Line.create({'report_id': other.id, 'move_id': moved.id})
+        with self.assertRaises(UserError):
+            report.action_update_invoices()
+        self.assertEqual(self._move_ids(report), {self.first.id, self.second.id})
+        self.assertEqual(self._move_ids(other), {moved.id})
+
+    def test_incremental_watermark(self):
+        report = self._report()
+        report.action_update_invoices()
+        # Todo lo anterior queda antes de la marca de la última actualización (hace una hora)
+        report.last_refresh_date = fields.Datetime.now() - datetime.timedelta(hours=1)
+        self._set_write_date(self.first | self.second, datetime.timedelta(hours=-2))
+        before, within_margin = self._invoice(5), self._invoice(6)
+        # Modificado antes del margen: ya lo vio la actualización anterior y no se vuelve a mirar
+        self._set_write_date(before, -datetime.timedelta(hours=1, minutes=10))
+        # Modificado dentro del margen (transacción que terminó después de la actualización anterior)
+        self._set_write_date(within_margin, -datetime.timedelta(hours=1, minutes=2))
+        report.action_update_invoices()
+        self.assertEqual(self._move_ids(report), {self.first.id, self.second.id, within_margin.id})
+        self.assertEqual(report.last_refresh_date, self.env.cr.now().replace(microsecond=0))
+
+    def test_active_job_blocks_clearing(self):
+        report = self._report()
+        report.action_enqueue_update_invoices()
+        for action in (report.action_clear_invoices, report.action_set_to_draft):
+            with self.subTest(action=action.__name__), self.assertRaises(UserError):
+                action()
@@ -0,0 +1,60 @@
+# l10n_ar_afip_iva_tur/tests/test_report_jobs.py
+
+import datetime
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+
+class TestReportJobs(TransactionCase):
+    """ Procesos en segundo plano de los reportes, de la cola al cierre. """
+
+    def setUp(self):
+        super().setUp()
+        self.report = self.env['afip.iva.tur.report'].create({
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+        })
+        # El cron confirma cada paso; dentro del test todo queda en la transacción del test
+        self.patch(self.env.cr, 'commit', lambda: None)
+        self.patch(self.env.cr, 'rollback', lambda: None)
+
+    def test_update_job_done(self):
+        self.report.action_enqueue_update_invoices()
+        job = self.report.job_ids
+        self.assertEqual(job.state, 'queued')
+        with self.assertRaises(UserError):
+            self.report.action_enqueue_generate_file() # sin comprobantes
+        with self.assertRaises(UserError):
+            self.report.action_update_invoices() # el reporte tiene un proceso activo
+
+        self.env['afip.iva.tur.report.job']._cron_process_jobs()
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.progress, 100.0)
+        self.assertTrue(job.date_start and job.date_end)
+        self.assertEqual(self.report.job_state, 'done')
+        # Terminado el proceso se puede volver a encolar
+        self.report.action_enqueue_rebuild_invoices()
+        self.assertEqual(self.report.job_ids[0].state, 'queued')
+
+    def test_failed_job(self):
+        job = self.env['afip.iva.tur.report.job'].create({'report_id': self.report.id, 'job_action': 'generate'})
+        self.env['afip.iva.tur.report.job']._cron_process_jobs()
+        self.assertEqual(job.state, 'failed')
+        self.assertIn("No hay comprobantes", job.message)
+
+    def test_stale_job_failed(self):
+        job = self.env['afip.iva.tur.report.job'].create({
+            'report_id': self.report.id,
+            'job_action': 'update',
+            'state': 'running',
+            'date_start': datetime.datetime.now() - datetime.timedelta(hours=3),
+        })
+        self.env['afip.iva.tur.report.job']._cron_process_jobs()
+        self.assertEqual(job.state, 'failed')
+        self.assertIn("Interrumpido", job.message)
+
+    def test_enqueue_requires_single_report(self):
+        other = self.report.copy()
+        with self.assertRaises(ValueError):
+            (self.report | other).action_enqueue_update_invoices()
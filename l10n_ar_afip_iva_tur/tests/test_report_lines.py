@@ -0,0 +1,88 @@
+# l10n_ar_afip_iva_tur/tests/test_report_lines.py
+
+import datetime
+
+from odoo.tests import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+MARGIN = datetime.timedelta(minutes=5)
+
+
+@tagged('post_install', '-at_install')
+class TestReportLines(AccountTestInvoicingCommon):
+    """ Bloques de registros guardados en las líneas y cuándo se vuelven a armar. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.report = cls.env['afip.iva.tur.report'].create({
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+        })
+        cls.invoices = (
+            cls.init_invoice('out_invoice', amounts=[100.0], post=True)
+            | cls.init_invoice('out_invoice', amounts=[200.0], post=True)
+        )
+        cls.Line = cls.env['afip.iva.tur.report.line']
+        cls.Line.create([{'report_id': cls.report.id, 'move_id': move.id} for move in cls.invoices])
+
+    def _store_blocks(self):
+        self.Line._store_export_values(self.report, [
+            (move.id, 3, index + 1, '75123456789012', 1000 * (index + 1), 'bloque %s\r\n' % move.id)
+            for index, move in enumerate(self.invoices)
+        ])
+        # Bloques armados hace una hora sobre datos modificados hace dos
+        self.env.flush_all()
+        self.env.cr.execute("UPDATE afip_iva_tur_report_line SET block_date = now() at time zone 'UTC' - interval '1 hour'")
+        for table in ('account_move', 'res_partner'):
+            self.env.cr.execute("UPDATE %s SET write_date = now() at time zone 'UTC' - interval '2 hours'" % table)
+
+    def _touch(self, table, record_id):
+        self.env.cr.execute("UPDATE %s SET write_date = now() at time zone 'UTC' WHERE id = %%s" % table, [record_id])
+
+    def test_stale_lines(self):
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), self.invoices.ids) # sin bloque
+        self._store_blocks()
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), [])
+
+        first, second = self.invoices
+        self._touch('account_move', first.id)
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), first.ids)
+        self._store_blocks()
+        self._touch('res_partner', second.partner_id.id)
+        self.assertEqual(set(self.Line._get_stale_move_ids(self.report, MARGIN)),
+                         {move.id for move in self.invoices if move.partner_id == second.partner_id})
+        self._store_blocks()
+        self._touch('res_partner', self.report.company_id.partner_id.id)
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), self.invoices.ids)
+
+    def test_payment_change_clears_block(self):
+        self._store_blocks()
+        first, second = self.invoices
+        self.Line._store_payments(self.report, {first.id: [('3', 11700)]}, self.invoices.ids)
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), first.ids)
+        self._store_blocks()
+        # Los mismos pagos no invalidan el bloque
+        self.Line._store_payments(self.report, {first.id: [('3', 11700)]}, self.invoices.ids)
+        self.assertEqual(self.Line._get_stale_move_ids(self.report, MARGIN), [])
+
+    def test_record_blocks_in_order(self):
+        self._store_blocks()
+        move_ids = list(reversed(self.invoices.ids))
+        blocks = list(self.Line._iter_record_blocks(self.report, move_ids, batch_size=1))
+        self.assertEqual(blocks, [(move_id, 'bloque %s\r\n' % move_id) for move_id in move_ids])
+
+    def test_expected_invoices(self):
+        self._store_blocks()
+        first, second = self.invoices
+        self.Line._store_payments(self.report, {first.id: [('3', 500), ('1', 500)]}, self.invoices.ids)
+        block = "\r\n".join(["02x", "03x", "03y", "04x", "05x", "07x", "08x", "08y"]) + "\r\n"
+        self.Line._store_export_values(self.report, [
+            (first.id, 3, 1, '75123456789012', 1000, block),
+            (second.id, None, None, None, None, None),
+        ])
+        expected = {name: values for name, *values in self.Line._iter_expected_invoices(self.report)}
+        self.assertEqual(expected, {
+            first.name: ['00003-00000001-75123456789012', 1000, 1000, {'03': 2, '06': 0, '07': 1, '08': 2}],
+            second.name: [None, None, None, None],
+        })
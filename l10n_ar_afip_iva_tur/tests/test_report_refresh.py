@@ -0,0 +1,30 @@
+# l10n_ar_afip_iva_tur/tests/test_report_refresh.py
+
+import datetime
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestReportRefresh(TransactionCase):
+    """ Marca de la última actualización usada por la actualización incremental. """
+
+    def setUp(self):
+        super().setUp()
+        self.report = self.env['afip.iva.tur.report'].create({
+            'date_from': datetime.date(2025, 6, 1),
+            'date_to': datetime.date(2025, 6, 30),
+            'last_refresh_date': fields.Datetime.now(),
+        })
+
+    def test_scope_change_resets_refresh_date(self):
+        for vals in ({'date_from': datetime.date(2025, 5, 1)}, {'date_to': datetime.date(2025, 7, 31)},
+                     {'company_id': self.env.company.id}):
+            with self.subTest(vals=vals):
+                self.report.last_refresh_date = fields.Datetime.now()
+                self.report.write(vals)
+                self.assertFalse(self.report.last_refresh_date)
+
+    def test_other_fields_keep_refresh_date(self):
+        self.report.date_payment = datetime.date(2025, 7, 10)
+        self.assertTrue(self.report.last_refresh_date)
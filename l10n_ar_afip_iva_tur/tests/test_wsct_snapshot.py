@@ -0,0 +1,35 @@
+# l10n_ar_afip_iva_tur/tests/test_wsct_snapshot.py
+
+from odoo.tests import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.addons.l10n_ar_afip_iva_tur.afip_utils import parse_afip_response, parse_autorizar_comprobante
+from odoo.addons.l10n_ar_afip_iva_tur.tests.common import as_dict, xml_request, xml_response
+
+
+@tagged('post_install', '-at_install')
+class TestWsctSnapshot(AccountTestInvoicingCommon):
+    """ El snapshot ``afip.wsct.comprobante`` devuelve lo mismo que volver a parsear el XML. """
+
+    def test_snapshot_round_trip(self):
+        invoice = self.init_invoice('out_invoice', amounts=[1000.0])
+        request, response = xml_request(moneda="DOL", cotizacion="1234.567891"), xml_response()
+        Snapshot = self.env['afip.wsct.comprobante']
+        Snapshot._create_from_xml(invoice, request, response)
+
+        comprobante, comprobante_response = Snapshot._read_snapshots(invoice.ids)[invoice.id]
+        self.assertEqual(as_dict(comprobante), as_dict(parse_autorizar_comprobante(request).comprobante))
+        self.assertEqual(as_dict(comprobante_response), as_dict(parse_afip_response(response)))
+        self.assertEqual(comprobante.cotizacionMoneda, 1234567891)
+
+    def test_snapshot_replaced(self):
+        invoice = self.init_invoice('out_invoice', amounts=[1000.0])
+        Snapshot = self.env['afip.wsct.comprobante']
+        Snapshot._create_from_xml(invoice, xml_request(), xml_response())
+        Snapshot._create_from_xml(invoice, xml_request(numero=13), xml_response(numero=13))
+        self.assertEqual(Snapshot.search_count([('move_id', '=', invoice.id)]), 1)
+        self.assertEqual(Snapshot._read_snapshots(invoice.ids)[invoice.id][0].numeroComprobante, "13")
+
+    def test_read_without_snapshot(self):
+        self.assertEqual(self.env['afip.wsct.comprobante']._read_snapshots([]), {})
+        invoice = self.init_invoice('out_invoice', amounts=[1000.0])
+        self.assertEqual(self.env['afip.wsct.comprobante']._read_snapshots(invoice.ids), {})
@@ -14,9 +14,12 @@
         "l10n_ar_afipws_fe",
     ],
     "data": [
+        "security/ir.model.access.csv",
         "views/product_category_view.xml",
         "views/account_move_views.xml",
         "views/res_partner_view.xml",
+        "views/account_journal_view.xml",
+        "wizard/wsct_batch_authorize_views.xml",
     ],
 }
 
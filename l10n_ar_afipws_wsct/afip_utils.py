@@ -1,14 +1,28 @@
-from pysimplesoap.client import SimpleXMLElement
+import io
+import logging
+import xml.etree.ElementTree as ET
 
-def _get_response_info(xml_response):
-    return SimpleXMLElement(xml_response)
+_logger = logging.getLogger(__name__)
 
 
 def get_invoice_number_from_response(xml_response):
+    """ Devuelve el ``numeroComprobante`` de la respuesta de CTService, o False si no se puede leer.
+
+    Recorre el XML en modo streaming y se detiene en el primer ``numeroComprobante``
+    (el de ``comprobanteResponse``), sin armar el documento completo. """
     if not xml_response:
         return False
+    if isinstance(xml_response, str):
+        xml_response = xml_response.encode("utf-8")
     try:
-        xml = _get_response_info(xml_response)
-        return int(xml('numeroComprobante'))         
-    except:
+        for _event, element in ET.iterparse(io.BytesIO(xml_response), events=("end",)):
+            if element.tag == "numeroComprobante" or element.tag.endswith("}numeroComprobante"):
+                return int(element.text)
+    except ET.ParseError as error:
+        _logger.warning("No se pudo leer la respuesta de WSCT: XML inválido (%s)", error)
+        return False
+    except (TypeError, ValueError):
+        _logger.warning("No se pudo leer la respuesta de WSCT: numeroComprobante %r no es un número", element.text)
         return False
+    _logger.warning("No se pudo leer la respuesta de WSCT: no contiene numeroComprobante")
+    return False
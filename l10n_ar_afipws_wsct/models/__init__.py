@@ -7,4 +7,6 @@ from . import account_move
 from . import account_move_ws
 from . import account_tax
 from . import afipws_connection
+from . import afip_wsct_catalog_cache
+from . import afip_wsct_sequence
 from . import res_partner
\ No newline at end of file
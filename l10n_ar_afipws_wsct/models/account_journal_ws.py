@@ -1,18 +1,38 @@
-from odoo import models
+from odoo import _, models
 
 class AccountJournalWs(models.Model):
     _inherit = "account.journal"
 
     def wsct_pyafipws_cuit_document_classes(self, ws):
-        # RD: Convertir respuesta al formato esperado
-        doc_types = ws.ConsultarTiposComprobante()
-        res = [s.replace(':', ',') for s in doc_types]
-        return res
+        def fetch():
+            # RD: Convertir respuesta al formato esperado
+            doc_types = ws.ConsultarTiposComprobante()
+            return [s.replace(':', ',') for s in doc_types]
+        return self.env["afip.wsct.catalog.cache"]._get_or_fetch(self.company_id, "document_classes", fetch)
     
     def wsct_pyafipws_point_of_sales(self, ws):
-        return ws.ConsultarPuntosVenta()
+        return self.env["afip.wsct.catalog.cache"]._get_or_fetch(
+            self.company_id, "points_of_sale", lambda: list(ws.ConsultarPuntosVenta()))
     
     def wsct_get_pyafipws_last_invoice(
         self, l10n_ar_afip_pos_number, document_type, ws
     ):
-        return ws.ConsultarUltimoComprobanteAutorizado(document_type.code, l10n_ar_afip_pos_number)
\ No newline at end of file
+        # Registro local de la secuencia: en las autorizaciones por lotes evita consultar a AFIP en cada comprobante
+        return self.env["afip.wsct.sequence"]._get_last_number(
+            self.company_id, l10n_ar_afip_pos_number, document_type,
+            lambda: ws.ConsultarUltimoComprobanteAutorizado(document_type.code, l10n_ar_afip_pos_number),
+        )
+
+    def action_wsct_clear_catalog_cache(self):
+        """ Borra los catálogos WSCT en caché de la compañía para que se vuelvan a consultar a AFIP. """
+        self.env["afip.wsct.catalog.cache"]._invalidate(self.company_id)
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Catálogos WSCT"),
+                "message": _("Se borró la caché de tipos de comprobante y puntos de venta. La próxima consulta se hará a AFIP."),
+                "type": "info",
+                "sticky": False,
+            },
+        }
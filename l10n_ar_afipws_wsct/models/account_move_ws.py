@@ -1,7 +1,14 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from odoo import _, models
+from odoo import _, api, models
 from odoo.exceptions import UserError
+from odoo.addons.l10n_ar_afipws_wsct.afip_utils import get_invoice_number_from_response
 from datetime import datetime
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
 
 class AccountMove(models.Model):
     _inherit = "account.move"
@@ -13,6 +20,13 @@ class AccountMove(models.Model):
             parsed_date = datetime.strptime(ws_date_str, "%Y/%m/%d")
             formatted_date = parsed_date.strftime("%Y%m%d")
             ws.Vencimiento = formatted_date
+            number = get_invoice_number_from_response(ws.XmlResponse)
+            sequence_key = (self.company_id, self.journal_id.l10n_ar_afip_pos_number, self.l10n_latam_document_type_id)
+            if number:
+                self.env["afip.wsct.sequence"]._set_authorized(*sequence_key, number)
+            else:
+                # Sin el número autorizado el registro local quedaría atrasado: el próximo comprobante consulta a AFIP
+                self.env["afip.wsct.sequence"]._mark_unsynced(*sequence_key)
 
     def wsct_map_invoice_info(self):
         invoice_info = self.base_map_invoice_info()
@@ -94,8 +108,16 @@ class AccountMove(models.Model):
         )
 
     def wsct_invoice_map_info_lines(self):
+        product_lines = self.invoice_line_ids.filtered(lambda x: x.display_type == 'product')
+        # Lectura por lotes de lo que se usa por línea (productos, categorías, unidades e impuestos)
+        product_lines.product_id.categ_id.mapped('item_type_t')
+        product_lines.product_uom_id.mapped('l10n_ar_afip_code')
+        product_lines.tax_ids.tax_group_id.mapped('l10n_ar_vat_afip_code')
+
+        vat_taxes_by_set = {}   # impuestos de la línea -> impuestos de IVA (sin IVA reintegro turismo)
+        vat_amount_by_args = {} # argumentos de compute_all -> IVA de la línea
         lines = []
-        for line in self.invoice_line_ids.filtered(lambda x: x.display_type == 'product'):
+        for line in product_lines:
             line_temp = {}
             line_temp["codigo"] = line.product_id.default_code
             # unidad de referencia del producto si se comercializa
@@ -122,19 +144,30 @@ class AccountMove(models.Model):
                 )
                 or None
             )
-            tax_lines = line.tax_ids.filtered(lambda x: not x.l10n_ar_afipws_wsct_is_tourism_vat and x.tax_group_id.l10n_ar_vat_afip_code)
+            tax_key = tuple(line.tax_ids.ids)
+            tax_lines = vat_taxes_by_set.get(tax_key)
+            if tax_lines is None:
+                tax_lines = vat_taxes_by_set[tax_key] = line.tax_ids.filtered(
+                    lambda x: not x.l10n_ar_afipws_wsct_is_tourism_vat and x.tax_group_id.l10n_ar_vat_afip_code)
             line_temp["iva_id"] = tax_lines.tax_group_id.l10n_ar_vat_afip_code
-            vat_taxes_amounts = tax_lines.compute_all(
-                line.price_unit,
-                self.currency_id,
-                line.quantity,
-                product=line.product_id,
-                partner=self.partner_id,
-            )
-            
-            vat_amount = sum(
-                [x["amount"] for x in vat_taxes_amounts["taxes"]]
-            )
+
+            # Las líneas de estadías suelen repetir impuestos, precio y cantidad: se calcula una vez por combinación
+            args_key = (tax_key, line.price_unit, line.quantity, line.product_id.id)
+            vat_amount = vat_amount_by_args.get(args_key)
+            if vat_amount is None:
+                vat_amount = 0.0
+                if tax_lines:
+                    vat_taxes_amounts = tax_lines.compute_all(
+                        line.price_unit,
+                        self.currency_id,
+                        line.quantity,
+                        product=line.product_id,
+                        partner=self.partner_id,
+                    )
+                    vat_amount = sum(
+                        [x["amount"] for x in vat_taxes_amounts["taxes"]]
+                    )
+                vat_amount_by_args[args_key] = vat_amount
 
             line_temp["imp_iva"] = "%.2f" % vat_amount
             line_temp["importe"] = "%.2f" % (line.price_total + vat_amount)
@@ -145,4 +178,80 @@ class AccountMove(models.Model):
 
             lines.append(line_temp)
 
-        return lines
\ No newline at end of file
+        return lines
+
+    def _wsct_get_batch_groups(self):
+        """ Agrupa los comprobantes a autorizar por secuencia de numeración AFIP (compañía, diario/punto
+        de venta y tipo de documento), cada grupo ordenado como se numeraría al validarlo de a uno. """
+        groups = defaultdict(list)
+        for move in self.sorted(lambda m: (m.invoice_date or m.date, m.id)):
+            groups[(move.company_id.id, move.journal_id.id, move.l10n_latam_document_type_id.id)].append(move.id)
+        return list(groups.values())
+
+    def _wsct_authorize_group(self, move_ids):
+        """ Valida (y así autoriza en WSCT) ``move_ids`` en orden, con un cursor propio y confirmando
+        después de cada comprobante. Corre en un hilo del pool de ``_wsct_authorize_batch``: el cliente
+        WSCT que devuelve ``afipws.connection.connect()`` es propio de cada hilo.
+
+        El último número autorizado se consulta a AFIP solo al empezar y después de un error; en el resto
+        del grupo se usa el registro local ``afip.wsct.sequence``. """
+        results = []
+        with self.env.registry.cursor() as cr:
+            threading.current_thread().dbname = cr.dbname # para el log, como en los hilos de Odoo
+            env = api.Environment(cr, self.env.uid, dict(self.env.context, wsct_trust_local_sequence=True))
+            moves = env["account.move"].browse(move_ids)
+            Sequence = env["afip.wsct.sequence"]
+            sequence_key = (moves[:1].company_id, moves[:1].journal_id.l10n_ar_afip_pos_number, moves[:1].l10n_latam_document_type_id)
+            Sequence._mark_unsynced(*sequence_key)
+            cr.commit()
+            for move in moves:
+                label = "%s (ID: %s)" % (move.partner_id.display_name, move.id)
+                try:
+                    move.action_post()
+                    cr.commit()
+                except Exception as error:
+                    cr.rollback()
+                    env.invalidate_all(flush=False)
+                    # Puede haber sido un error de numeración: el próximo comprobante vuelve a consultar a AFIP
+                    Sequence._mark_unsynced(*sequence_key)
+                    cr.commit()
+                    _logger.warning("No se pudo autorizar el comprobante %s: %s", label, error)
+                    message = error.args[0] if isinstance(error, UserError) and error.args else str(error)
+                    results.append({"move_id": move.id, "name": label, "state": "error", "message": message})
+                    continue
+                results.append({
+                    "move_id": move.id,
+                    "name": move.name,
+                    "state": "authorized" if move.afip_auth_code else "posted",
+                    "cae": move.afip_auth_code,
+                    "message": False,
+                })
+        return results
+
+    def _wsct_authorize_batch(self, max_workers=None):
+        """ Autoriza en WSCT los comprobantes en borrador de ``self``.
+
+        La numeración de AFIP es correlativa por punto de venta y tipo de comprobante, así que cada
+        secuencia se autoriza en serie y las secuencias distintas en paralelo, en hasta ``max_workers``
+        hilos (parámetro del sistema ``l10n_ar_afipws_wsct.batch_authorize_workers``, 4 por defecto).
+        Devuelve una lista de dicts por comprobante con ``move_id``, ``name``, ``state``
+        (``authorized``, ``posted``, ``skipped`` o ``error``), ``cae`` y ``message``. """
+        to_authorize = self.filtered(lambda m: m.state == "draft" and m.journal_id.afip_ws == "wsct")
+        results = [
+            {"move_id": move.id, "name": move.display_name, "state": "skipped", "cae": move.afip_auth_code,
+             "message": _("No es un comprobante de turismo en borrador.")}
+            for move in self - to_authorize
+        ]
+        groups = to_authorize._wsct_get_batch_groups()
+        if not groups:
+            return results
+        if max_workers is None:
+            max_workers = int(self.env["ir.config_parameter"].sudo().get_param("l10n_ar_afipws_wsct.batch_authorize_workers", 4))
+        max_workers = max(1, min(max_workers, len(groups)))
+        # Los hilos confirman sus propias transacciones: no deben quedar cambios sin escribir en esta
+        self.env.flush_all()
+        _logger.info("Autorizando %s comprobantes WSCT en %s secuencias con %s hilos", len(to_authorize), len(groups), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wsct_batch") as executor:
+            for group_results in executor.map(self._wsct_authorize_group, groups):
+                results.extend(group_results)
+        return results
@@ -0,0 +1,74 @@
+import datetime
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AfipWsctCatalogCache(models.Model):
+    _name = "afip.wsct.catalog.cache"
+    _description = "Respuestas de catálogos WSCT en caché"
+
+    company_id = fields.Many2one("res.company", string="Compañía", required=True, ondelete="cascade", index=True)
+    environment_type = fields.Selection(
+        [("production", "Producción"), ("homologation", "Homologación")],
+        string="Ambiente",
+        required=True,
+    )
+    catalog = fields.Selection(
+        [
+            ("document_classes", "Tipos de Comprobante"),
+            ("points_of_sale", "Puntos de Venta"),
+        ],
+        string="Catálogo",
+        required=True,
+    )
+    value = fields.Json(string="Respuesta")
+    fetch_date = fields.Datetime(string="Consultado", required=True)
+
+    _sql_constraints = [
+        ("catalog_uniq", "unique(company_id, environment_type, catalog)", "Ya existe una caché para este catálogo."),
+    ]
+
+    @api.model
+    def _get_ttl(self):
+        """ Vigencia de la caché (parámetro del sistema ``l10n_ar_afipws_wsct.catalog_cache_ttl_hours``,
+        24 horas por defecto; 0 desactiva la caché). """
+        hours = float(self.env["ir.config_parameter"].sudo().get_param("l10n_ar_afipws_wsct.catalog_cache_ttl_hours", 24))
+        return datetime.timedelta(hours=hours)
+
+    @api.model
+    def _get_or_fetch(self, company, catalog, fetch):
+        """ Devuelve la respuesta en caché de ``catalog`` para ``company`` si está vigente; si no llama a
+        ``fetch()`` (la consulta a AFIP), guarda el resultado y lo devuelve. """
+        ttl = self._get_ttl()
+        if not ttl:
+            return fetch()
+        environment_type = company._get_environment_type()
+        cache = self.sudo().search([
+            ("company_id", "=", company.id),
+            ("environment_type", "=", environment_type),
+            ("catalog", "=", catalog),
+        ], limit=1)
+        now = fields.Datetime.now()
+        if cache and cache.fetch_date + ttl > now:
+            return cache.value
+
+        value = fetch()
+        _logger.info("Catálogo WSCT %s de %s actualizado desde AFIP", catalog, company.name)
+        if cache:
+            cache.write({"value": value, "fetch_date": now})
+        else:
+            self.sudo().create({
+                "company_id": company.id,
+                "environment_type": environment_type,
+                "catalog": catalog,
+                "value": value,
+                "fetch_date": now,
+            })
+        return value
+
+    @api.model
+    def _invalidate(self, companies):
+        self.sudo().search([("company_id", "in", companies.ids)]).unlink()
@@ -0,0 +1,72 @@
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AfipWsctSequence(models.Model):
+    _name = "afip.wsct.sequence"
+    _description = "Último número WSCT autorizado (registro local)"
+    _rec_name = "document_type_id"
+
+    company_id = fields.Many2one("res.company", string="Compañía", required=True, ondelete="cascade")
+    pos_number = fields.Integer(string="Punto de Venta", required=True)
+    document_type_id = fields.Many2one("l10n_latam.document.type", string="Tipo de Documento", required=True, ondelete="cascade")
+    last_number = fields.Integer(string="Último Número Autorizado")
+    synced = fields.Boolean(
+        string="Sincronizado",
+        help="Si está marcado, las autorizaciones por lotes usan el último número local sin consultar a AFIP.",
+    )
+    sync_date = fields.Datetime(string="Última Consulta a AFIP")
+
+    _sql_constraints = [
+        ("sequence_uniq", "unique(company_id, pos_number, document_type_id)", "Ya existe un registro para esta secuencia."),
+    ]
+
+    @api.model
+    def _lock(self, company, pos_number, document_type):
+        """ Devuelve el registro de la secuencia (creándolo si no existe) bloqueado hasta el fin de la transacción.
+        El upsert devuelve la fila y la bloquea en una sola sentencia, aunque la haya creado otra transacción
+        después de la foto de esta (con REPEATABLE READ un SELECT posterior no la vería). """
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute("""
+            INSERT INTO afip_wsct_sequence (company_id, pos_number, document_type_id, last_number, synced,
+                                            create_uid, create_date, write_uid, write_date)
+                 VALUES (%s, %s, %s, 0, false, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+            ON CONFLICT (company_id, pos_number, document_type_id) DO UPDATE SET id = afip_wsct_sequence.id
+              RETURNING id
+        """, [company.id, pos_number, document_type.id, self.env.uid, self.env.uid])
+        sequence = self.sudo().browse(cr.fetchone()[0])
+        sequence.invalidate_recordset()
+        return sequence
+
+    @api.model
+    def _get_last_number(self, company, pos_number, document_type, fetch):
+        """ Último número autorizado de la secuencia. Dentro de una autorización por lotes (contexto
+        ``wsct_trust_local_sequence``) se usa el número local si está sincronizado; si no se consulta a
+        AFIP con ``fetch()`` y se guarda. """
+        sequence = self._lock(company, pos_number, document_type)
+        if self.env.context.get("wsct_trust_local_sequence") and sequence.synced:
+            return sequence.last_number
+        last_number = int(fetch() or 0)
+        sequence.write({"last_number": last_number, "synced": True, "sync_date": fields.Datetime.now()})
+        return last_number
+
+    @api.model
+    def _set_authorized(self, company, pos_number, document_type, number):
+        """ Registra ``number`` como último autorizado después de obtener el CAE. """
+        sequence = self._lock(company, pos_number, document_type)
+        if number > sequence.last_number:
+            sequence.last_number = number
+
+    @api.model
+    def _mark_unsynced(self, company, pos_number, document_type):
+        """ Obliga a consultar a AFIP en la próxima autorización (inicio de lote o error de numeración). """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE afip_wsct_sequence SET synced = false
+             WHERE company_id = %s AND pos_number = %s AND document_type_id = %s
+        """, [company.id, pos_number, document_type.id])
+        self.invalidate_model(["synced"])
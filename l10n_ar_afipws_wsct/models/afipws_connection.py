@@ -1,4 +1,32 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
 from odoo import fields, models
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+_WSCT_WSDL_URLS = {
+    "production": "https://serviciosjava.afip.gob.ar/wsct/CTService?wsdl",
+    "homologation": "https://fwshomo.afip.gov.ar/wsct/CTService?wsdl",
+}
+
+# Clientes WSCT ya conectados, por hilo: pysimplesoap no es seguro para compartir entre hilos
+_clients = threading.local()
+_MAX_CLIENTS_PER_THREAD = 8
+
+
+def _get_thread_clients():
+    clients = getattr(_clients, "clients", None)
+    if clients is None:
+        clients = _clients.clients = {}
+    return clients
+
 
 class AfipwsConnection(models.Model):
     _inherit = "afipws.connection"
@@ -20,11 +48,76 @@ class AfipwsConnection(models.Model):
             ws = WSCT()
         return ws
 
+    def connect(self):
+        """ Para WSCT reutiliza el cliente ya conectado (WSDL descargado y procesado) mientras no cambie
+        la conexión, el ambiente o el vencimiento del ticket de acceso. """
+        self.ensure_one()
+        if self.afip_ws != "wsct":
+            return super().connect()
+        key = (self.env.cr.dbname, self.id, self.type, self.expirationtime)
+        clients = _get_thread_clients()
+        ws = clients.pop(key, None)
+        if ws is None:
+            ws = super().connect()
+            # Los clientes de tickets anteriores de la misma conexión ya no sirven
+            for stale_key in [k for k in clients if k[:2] == key[:2]]:
+                del clients[stale_key]
+            while len(clients) >= _MAX_CLIENTS_PER_THREAD:
+                del clients[next(iter(clients))]
+        clients[key] = ws # Al final: el diccionario queda ordenado del menos al más usado
+        return ws
+
     def get_afip_ws_url(self, afip_ws, environment_type):
+        """ Para WSCT usa la copia local del WSDL (ver ``_get_wsct_cached_wsdl``). En homologación el parámetro
+        del sistema ``l10n_ar_afipws_wsct.wsct_url_override`` reemplaza la URL, para apuntar a un CTService de
+        prueba (``benchmarks/ctservice_stub.py``); en producción se ignora. """
         afip_ws_url = super().get_afip_ws_url(afip_ws, environment_type)
         if afip_ws == "wsct":
-            if environment_type == "production":
-                afip_ws_url = "https://serviciosjava.afip.gob.ar/wsct/CTService?wsdl"
-            else:
-                afip_ws_url = "https://fwshomo.afip.gov.ar/wsct/CTService?wsdl"
-        return afip_ws_url
\ No newline at end of file
+            override_url = self.env["ir.config_parameter"].sudo().get_param("l10n_ar_afipws_wsct.wsct_url_override")
+            if override_url and environment_type != "production":
+                _logger.info("WSCT en homologación apunta a %s (l10n_ar_afipws_wsct.wsct_url_override)", override_url)
+                return override_url
+            if override_url:
+                _logger.warning("Se ignora l10n_ar_afipws_wsct.wsct_url_override en producción")
+            afip_ws_url = _WSCT_WSDL_URLS["production" if environment_type == "production" else "homologation"]
+            afip_ws_url = self._get_wsct_cached_wsdl(environment_type, afip_ws_url)
+        return afip_ws_url
+
+    def _get_wsct_wsdl_cache_path(self, environment_type):
+        return os.path.join(
+            config["data_dir"], "l10n_ar_afipws_wsct", "wsdl",
+            "production" if environment_type == "production" else "homologation", "CTService.wsdl",
+        )
+
+    def _get_wsct_cached_wsdl(self, environment_type, url):
+        """ Devuelve la ruta de una copia local del WSDL de CTService, descargándola si no existe o tiene
+        más días que el parámetro ``l10n_ar_afipws_wsct.wsdl_cache_days`` (30 por defecto; 0 desactiva la copia).
+        Si la descarga falla se usa la copia anterior o, si no hay, la URL remota. """
+        max_age_days = int(self.env["ir.config_parameter"].sudo().get_param("l10n_ar_afipws_wsct.wsdl_cache_days", 30))
+        if max_age_days <= 0:
+            return url
+        path = self._get_wsct_wsdl_cache_path(environment_type)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            age = None
+        if age is not None and age < max_age_days * 86400:
+            return path
+
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Se escribe en un temporal y se renombra para que otro proceso nunca lea un WSDL a medias
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(response.content)
+            os.replace(tmp_path, path)
+            _logger.info("WSDL de WSCT (%s) guardado en %s", environment_type, path)
+            return path
+        except (requests.RequestException, OSError) as error:
+            if age is not None:
+                _logger.warning("No se pudo actualizar el WSDL de WSCT (%s), se usa la copia local: %s", environment_type, error)
+                return path
+            _logger.warning("No se pudo descargar el WSDL de WSCT (%s), se usa la URL remota: %s", environment_type, error)
+            return url
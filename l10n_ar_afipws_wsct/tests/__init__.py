@@ -0,0 +1,7 @@
+# l10n_ar_afipws_wsct/tests/__init__.py
+from . import test_afip_wsct_sequence
+from . import test_wsct_batch_authorize
+from . import test_afip_utils
+from . import test_afip_wsct_catalog_cache
+from . import test_afipws_connection
+from . import test_wsct_invoice_lines
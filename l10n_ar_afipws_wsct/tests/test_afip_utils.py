@@ -0,0 +1,50 @@
+# l10n_ar_afipws_wsct/tests/test_afip_utils.py
+
+from odoo.tests.common import BaseCase
+from odoo.tools import mute_logger
+from odoo.addons.l10n_ar_afipws_wsct.afip_utils import get_invoice_number_from_response
+
+RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns2="http://impl.service.wsct.afip.gov.ar/">
+  <soap:Body>
+    <ns2:autorizarComprobanteResponse>
+      <autorizarComprobanteReturn>
+        <comprobanteResponse>
+          <numeroComprobante>%s</numeroComprobante>
+          <CAE>75123456789012</CAE>
+        </comprobanteResponse>
+        <comprobanteAsociado><numeroComprobante>3</numeroComprobante></comprobanteAsociado>
+      </autorizarComprobanteReturn>
+    </ns2:autorizarComprobanteResponse>
+  </soap:Body>
+</soap:Envelope>"""
+
+
+class TestAfipUtils(BaseCase):
+    """ Lectura del número autorizado de las respuestas de CTService. """
+
+    def test_number(self):
+        self.assertEqual(get_invoice_number_from_response(RESPONSE % 12), 12)
+        self.assertEqual(get_invoice_number_from_response((RESPONSE % " 12 ").encode("utf-8")), 12)
+        # Con espacio de nombres
+        self.assertEqual(get_invoice_number_from_response(
+            '<r xmlns:a="urn:x"><a:numeroComprobante>7</a:numeroComprobante></r>'), 7)
+
+    def test_empty(self):
+        self.assertIs(get_invoice_number_from_response(None), False)
+        self.assertIs(get_invoice_number_from_response(""), False)
+        self.assertIs(get_invoice_number_from_response(b""), False)
+
+    @mute_logger('odoo.addons.l10n_ar_afipws_wsct.afip_utils')
+    def test_malformed(self):
+        self.assertIs(get_invoice_number_from_response("no es xml"), False)
+        self.assertIs(get_invoice_number_from_response("<a><b></a>"), False)
+        # Se detiene en el primer número: lo que sigue no se llega a leer
+        self.assertEqual(get_invoice_number_from_response("<a><numeroComprobante>5</numeroComprobante><b>"), 5)
+        self.assertIs(get_invoice_number_from_response("<a><b>5</b></a>"), False)
+
+    @mute_logger('odoo.addons.l10n_ar_afipws_wsct.afip_utils')
+    def test_not_numeric(self):
+        self.assertIs(get_invoice_number_from_response(RESPONSE % "abc"), False)
+        self.assertIs(get_invoice_number_from_response(RESPONSE % ""), False)
+        self.assertIs(get_invoice_number_from_response(RESPONSE % "1.5"), False)
@@ -0,0 +1,69 @@
+# l10n_ar_afipws_wsct/tests/test_afip_wsct_catalog_cache.py
+
+import datetime
+
+from odoo.tests import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestAfipWsctCatalogCache(AccountTestInvoicingCommon):
+    """ Caché de los catálogos de WSCT: vigencia, alcance por compañía e invalidación. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.Cache = cls.env['afip.wsct.catalog.cache']
+        cls.company_1 = cls.company_data['company']
+        cls.company_2 = cls.company_data_2['company']
+        cls.env['ir.config_parameter'].sudo().set_param('l10n_ar_afipws_wsct.catalog_cache_ttl_hours', 24)
+
+    def _fetch(self, value):
+        """ Consulta a AFIP simulada: devuelve ``value`` y cuenta las llamadas. """
+        def fetch():
+            self.fetch_count += 1
+            return value
+        self.fetch_count = 0
+        return fetch
+
+    def _get(self, company, value, catalog='points_of_sale'):
+        return self.Cache._get_or_fetch(company, catalog, self._fetch(value))
+
+    def test_ttl(self):
+        self.assertEqual(self._get(self.company_1, [1, 2]), [1, 2])
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(self._get(self.company_1, [3]), [1, 2])
+        self.assertEqual(self.fetch_count, 0)
+
+        cache = self.Cache.search([('company_id', '=', self.company_1.id)])
+        cache.fetch_date -= datetime.timedelta(hours=25)
+        self.assertEqual(self._get(self.company_1, [3]), [3])
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(len(self.Cache.search([('company_id', '=', self.company_1.id)])), 1) # se actualiza la misma fila
+
+        # Con vigencia 0 no se usa la caché
+        self.env['ir.config_parameter'].sudo().set_param('l10n_ar_afipws_wsct.catalog_cache_ttl_hours', 0)
+        self.assertEqual(self._get(self.company_1, [4]), [4])
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(cache.value, [3])
+
+    def test_company_and_catalog_scope(self):
+        self._get(self.company_1, [1])
+        self.assertEqual(self._get(self.company_2, [2]), [2])
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(self._get(self.company_1, ["195,T"], catalog='document_classes'), ["195,T"])
+        self.assertEqual(self.fetch_count, 1)
+        self.assertEqual(self._get(self.company_1, [9]), [1])
+        self.assertEqual(self._get(self.company_2, [9]), [2])
+
+    def test_clear_button(self):
+        self._get(self.company_1, [1])
+        self._get(self.company_1, ["195,T"], catalog='document_classes')
+        self._get(self.company_2, [2])
+        action = self.company_data['default_journal_sale'].action_wsct_clear_catalog_cache()
+        self.assertEqual(action['tag'], 'display_notification')
+        self.assertFalse(self.Cache.search([('company_id', '=', self.company_1.id)]))
+        self.assertEqual(self._get(self.company_1, [5]), [5])
+        self.assertEqual(self.fetch_count, 1)
+        # La caché de las otras compañías no se toca
+        self.assertEqual(self._get(self.company_2, [9]), [2])
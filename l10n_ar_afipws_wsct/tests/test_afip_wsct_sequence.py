@@ -0,0 +1,102 @@
+# l10n_ar_afipws_wsct/tests/test_afip_wsct_sequence.py
+
+import types
+
+from psycopg2 import errors
+
+from odoo import api
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<autorizarComprobanteResponse>
+  <comprobanteResponse><numeroComprobante>%s</numeroComprobante></comprobanteResponse>
+</autorizarComprobanteResponse>"""
+
+
+@tagged('post_install', '-at_install')
+class TestAfipWsctSequence(AccountTestInvoicingCommon):
+    """ Registro local del último número autorizado por secuencia WSCT. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.Sequence = cls.env['afip.wsct.sequence']
+        cls.document_type = cls.env['l10n_latam.document.type'].search([], limit=1)
+        cls.key = (cls.env.company, 3, cls.document_type)
+
+    def _fetch(self, number):
+        """ Consulta a AFIP simulada: devuelve ``number`` y cuenta las llamadas. """
+        def fetch():
+            self.fetch_count += 1
+            return number
+        self.fetch_count = 0
+        return fetch
+
+    def test_lock_creates_once(self):
+        sequence = self.Sequence._lock(*self.key)
+        self.assertRecordValues(sequence, [{'last_number': 0, 'synced': False}])
+        self.assertEqual(self.Sequence._lock(*self.key), sequence)
+        self.assertEqual(self.Sequence.search_count([('company_id', '=', self.env.company.id)]), 1)
+
+    @mute_logger('odoo.sql_db')
+    def test_lock_blocks_other_transactions(self):
+        # La secuencia se crea en una compañía ya confirmada para que la otra transacción la vea
+        key = (self.env.ref('base.main_company'), 3, self.document_type)
+        self.Sequence._lock(*key)
+        with self.registry.cursor() as cr:
+            cr.execute("SET LOCAL lock_timeout = '100ms'")
+            with self.assertRaises(errors.LockNotAvailable):
+                api.Environment(cr, self.env.uid, {})['afip.wsct.sequence']._lock(*key)
+            cr.rollback()
+
+    def test_trust_local_sequence(self):
+        fetch = self._fetch(41)
+        # Fuera de un lote siempre se consulta a AFIP
+        self.assertEqual(self.Sequence._get_last_number(*self.key, fetch), 41)
+        self.assertEqual(self.Sequence._get_last_number(*self.key, fetch), 41)
+        self.assertEqual(self.fetch_count, 2)
+
+        Sequence = self.Sequence.with_context(wsct_trust_local_sequence=True)
+        Sequence._set_authorized(*self.key, 42)
+        self.assertEqual(Sequence._get_last_number(*self.key, fetch), 42)
+        self.assertEqual(self.fetch_count, 2)
+        # Un número menor (por ejemplo una respuesta atrasada) no retrocede la secuencia
+        Sequence._set_authorized(*self.key, 40)
+        self.assertEqual(Sequence._get_last_number(*self.key, fetch), 42)
+
+        Sequence._mark_unsynced(*self.key)
+        self.assertEqual(Sequence._get_last_number(*self.key, fetch), 41)
+        self.assertEqual(self.fetch_count, 3)
+        self.assertTrue(Sequence._lock(*self.key).synced)
+
+    def _authorize(self, xml_response):
+        journal = self.company_data['default_journal_sale']
+        journal.l10n_ar_afip_pos_number = 3
+        move = self.env['account.move'].new({
+            'move_type': 'out_invoice',
+            'journal_id': journal.id,
+            'l10n_latam_document_type_id': self.document_type.id,
+        })
+        ws = types.SimpleNamespace(CAESolicitar=lambda: None, CAE="75123456789012", Vencimiento="2025/06/11",
+                                   XmlResponse=xml_response)
+        move.wsct_request_autorization(ws)
+        self.assertEqual(ws.Vencimiento, "20250611")
+
+    def test_authorization_updates_sequence(self):
+        Sequence = self.Sequence.with_context(wsct_trust_local_sequence=True)
+        Sequence._get_last_number(*self.key, self._fetch(6))
+        self._authorize(RESPONSE % 7)
+        self.assertEqual(Sequence._get_last_number(*self.key, self._fetch(7)), 7)
+        self.assertEqual(self.fetch_count, 0)
+
+    @mute_logger('odoo.addons.l10n_ar_afipws_wsct.afip_utils')
+    def test_authorization_without_number(self):
+        Sequence = self.Sequence.with_context(wsct_trust_local_sequence=True)
+        Sequence._get_last_number(*self.key, self._fetch(6))
+        # Con CAE pero sin número legible el registro local quedaría en 6: se vuelve a consultar a AFIP
+        self._authorize(RESPONSE % "")
+        self.assertFalse(Sequence._lock(*self.key).synced)
+        self.assertEqual(Sequence._get_last_number(*self.key, self._fetch(7)), 7)
+        self.assertEqual(self.fetch_count, 1)
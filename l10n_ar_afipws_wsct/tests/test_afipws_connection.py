@@ -0,0 +1,76 @@
+# l10n_ar_afipws_wsct/tests/test_afipws_connection.py
+
+import datetime
+import threading
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+from odoo.addons.l10n_ar_afipws_wsct.models import afipws_connection
+from odoo.addons.l10n_ar_afipws_wsct.models.afipws_connection import AfipwsConnection as WsctConnection
+
+
+class TestAfipwsConnection(TransactionCase):
+    """ Clientes WSCT reutilizados por hilo y URL del servicio. """
+
+    def setUp(self):
+        super().setUp()
+        now = fields.Datetime.now()
+        self.connection = self.env['afipws.connection'].create({
+            'company_id': self.env.company.id,
+            'afip_ws': 'wsct',
+            'type': 'homologation',
+            'uniqueid': '1',
+            'token': 'token',
+            'sign': 'sign',
+            'generationtime': now,
+            'expirationtime': now + datetime.timedelta(hours=12),
+        })
+        # Cada test empieza sin clientes conectados
+        self.patch(afipws_connection, '_clients', threading.local())
+        # La implementación que conecta de verdad (descarga el WSDL y arma el cliente) es la siguiente en la herencia
+        mro = type(self.connection).__mro__
+        parent = next(cls for cls in mro[mro.index(WsctConnection) + 1:] if 'connect' in vars(cls))
+        self.connect_count = 0
+
+        def connect(connection):
+            self.connect_count += 1
+            return object()
+        self.patch(parent, 'connect', connect)
+
+    def test_reuse_client(self):
+        ws = self.connection.connect()
+        self.assertIs(self.connection.connect(), ws)
+        self.assertEqual(self.connect_count, 1)
+
+    def test_rebuild_on_new_ticket(self):
+        ws = self.connection.connect()
+        self.connection.expirationtime += datetime.timedelta(hours=12)
+        new_ws = self.connection.connect()
+        self.assertIsNot(new_ws, ws)
+        self.assertEqual(self.connect_count, 2)
+        # El cliente del ticket anterior se descarta
+        self.assertEqual(list(afipws_connection._get_thread_clients().values()), [new_ws])
+        self.assertIs(self.connection.connect(), new_ws)
+
+    def test_client_per_thread(self):
+        ws = self.connection.connect()
+        self.connection.read(['afip_ws', 'type', 'expirationtime']) # en caché: el otro hilo no usa el cursor
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.connection.connect()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], ws)
+        self.assertEqual(self.connect_count, 2)
+        self.assertIs(self.connection.connect(), ws)
+
+    def test_clients_limit(self):
+        for hours in range(afipws_connection._MAX_CLIENTS_PER_THREAD + 2):
+            connection = self.connection.copy({'expirationtime': self.connection.expirationtime + datetime.timedelta(hours=hours)})
+            connection.connect()
+        self.assertEqual(len(afipws_connection._get_thread_clients()), afipws_connection._MAX_CLIENTS_PER_THREAD)
+
+    def test_url_override(self):
+        self.patch(type(self.connection), '_get_wsct_cached_wsdl', lambda connection, environment_type, url: url)
+        self.env['ir.config_parameter'].sudo().set_param('l10n_ar_afipws_wsct.wsct_url_override', 'http://localhost:8089/wsct/CTService?wsdl')
+        self.assertEqual(self.connection.get_afip_ws_url('wsct', 'homologation'), 'http://localhost:8089/wsct/CTService?wsdl')
+        self.assertEqual(self.connection.get_afip_ws_url('wsct', 'production'), afipws_connection._WSCT_WSDL_URLS['production'])
@@ -0,0 +1,124 @@
+# l10n_ar_afipws_wsct/tests/test_wsct_batch_authorize.py
+
+import collections
+import contextlib
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestWsctBatchAuthorize(AccountTestInvoicingCommon):
+    """ Autorización por lotes: agrupación por secuencia, aislamiento de cada comprobante y nueva consulta
+    a AFIP después de un error. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.posted = cls.init_invoice('out_invoice', amounts=[100.0], post=True)
+        cls.journal_a = cls.company_data['default_journal_sale']
+        cls.journal_a.write({'l10n_ar_afip_pos_system': 'WSCT', 'l10n_ar_afip_pos_number': 3})
+        cls.journal_b = cls.journal_a.copy({'name': 'Turismo 4', 'code': 'WSB', 'l10n_ar_afip_pos_number': 4})
+        cls.type_x, cls.type_y = cls.env['l10n_latam.document.type'].search([], limit=2)
+
+        def invoice(journal, document_type, day):
+            move = cls.init_invoice('out_invoice', amounts=[100.0], journal=journal, invoice_date='2025-06-%02d' % day)
+            move.l10n_latam_document_type_id = document_type
+            return move
+
+        # Creados fuera de orden: dentro de cada secuencia se autorizan por fecha
+        cls.a2 = invoice(cls.journal_a, cls.type_x, 2)
+        cls.a1 = invoice(cls.journal_a, cls.type_x, 1)
+        cls.a3 = invoice(cls.journal_a, cls.type_x, 3)
+        cls.ay = invoice(cls.journal_a, cls.type_y, 1)
+        cls.b1 = invoice(cls.journal_b, cls.type_x, 1)
+
+    def setUp(self):
+        super().setUp()
+        cr = self.env.cr
+        # Cada hilo abre un cursor y confirma por comprobante: en el test usa el del test y cada confirmación
+        # es un savepoint al que vuelve el rollback
+        cr.execute("SAVEPOINT wsct_batch")
+        self.patch(self.registry, 'cursor', lambda: contextlib.nullcontext(cr))
+        self.patch(cr, 'commit', lambda: (self.env.flush_all(), cr.execute("SAVEPOINT wsct_batch")))
+        self.patch(cr, 'rollback', lambda: cr.execute("ROLLBACK TO SAVEPOINT wsct_batch"))
+        self.afip_last = collections.Counter() # último número autorizado en AFIP por (punto de venta, tipo)
+        self.fetches = []
+        self.posted_order = []
+        self.failing = self.env['account.move']
+        self.patch(type(self.env['account.move']), 'action_post', self._fake_action_post)
+
+    def _fake_action_post(self, moves):
+        """ Numera como la autorización real: último número (local o de AFIP) más uno. """
+        for move in moves:
+            key = (move.journal_id.l10n_ar_afip_pos_number, move.l10n_latam_document_type_id.id)
+
+            def fetch():
+                self.fetches.append(key)
+                return self.afip_last[key]
+
+            Sequence = move.env['afip.wsct.sequence']
+            number = Sequence._get_last_number(move.company_id, key[0], move.l10n_latam_document_type_id, fetch) + 1
+            self.posted_order.append(move.id)
+            move.write({'afip_auth_code': '%014d' % number})
+            move.flush_recordset()
+            if move in self.failing:
+                raise UserError("Número %s rechazado" % number)
+            Sequence._set_authorized(move.company_id, key[0], move.l10n_latam_document_type_id, number)
+            self.afip_last[key] = number
+        return True
+
+    def test_batch_groups(self):
+        moves = self.a2 | self.b1 | self.a3 | self.ay | self.a1
+        groups = moves._wsct_get_batch_groups()
+        self.assertEqual(sorted(groups), sorted([
+            [self.a1.id, self.a2.id, self.a3.id],
+            [self.ay.id],
+            [self.b1.id],
+        ]))
+
+    @mute_logger('odoo.addons.l10n_ar_afipws_wsct.models.account_move_ws')
+    def test_failed_invoice_is_isolated(self):
+        self.failing = self.a2
+        moves = self.a1 | self.a2 | self.a3 | self.b1 | self.posted
+        results = {result['move_id']: result for result in moves._wsct_authorize_batch(max_workers=1)}
+        self.env.invalidate_all()
+
+        self.assertEqual({move_id: result['state'] for move_id, result in results.items()}, {
+            self.a1.id: 'authorized',
+            self.a2.id: 'error',
+            self.a3.id: 'authorized',
+            self.b1.id: 'authorized',
+            self.posted.id: 'skipped',
+        })
+        self.assertEqual(results[self.a2.id]['message'], "Número 2 rechazado")
+        # Lo que escribió el comprobante fallido se descarta; los demás quedan confirmados
+        self.assertFalse(self.a2.afip_auth_code)
+        self.assertEqual((self.a1.afip_auth_code, self.a3.afip_auth_code), ('%014d' % 1, '%014d' % 2))
+        self.assertEqual(self.b1.afip_auth_code, '%014d' % 1)
+        # Se consulta a AFIP al empezar cada secuencia y otra vez después del error, no en cada comprobante
+        self.assertEqual(collections.Counter(self.fetches), {
+            (3, self.type_x.id): 2,
+            (4, self.type_x.id): 1,
+        })
+        position = {move_id: index for index, move_id in enumerate(self.posted_order)}
+        self.assertLess(position[self.a1.id], position[self.a2.id])
+        self.assertLess(position[self.a2.id], position[self.a3.id])
+
+    def test_wizard(self):
+        Wizard = self.env['wsct.batch.authorize'].with_context(
+            active_model='account.move', active_ids=(self.a1 | self.ay).ids)
+        wizard = Wizard.create({})
+        self.assertEqual(wizard.move_ids, self.a1 | self.ay)
+        wizard.max_workers = 0
+        with self.assertRaises(UserError):
+            wizard.action_authorize()
+        wizard.max_workers = 1 # los hilos comparten el cursor del test: de a uno
+        wizard.action_authorize()
+        self.assertEqual(wizard.state, 'done')
+        self.assertEqual(set(wizard.line_ids.mapped('result')), {'authorized'})
+        self.assertEqual(wizard.line_ids.move_id, self.a1 | self.ay)
+        with self.assertRaises(UserError):
+            self.env['wsct.batch.authorize'].create({}).action_authorize()
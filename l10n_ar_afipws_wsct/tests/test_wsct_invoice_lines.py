@@ -0,0 +1,101 @@
+# l10n_ar_afipws_wsct/tests/test_wsct_invoice_lines.py
+
+from odoo import Command
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+def per_line_map_info_lines(move):
+    """ Mapeo de las líneas como se hacía antes de agruparlo: filtro de impuestos y ``compute_all`` en cada línea. """
+    lines = []
+    for line in move.invoice_line_ids.filtered(lambda x: x.display_type == 'product'):
+        line_temp = {}
+        line_temp["codigo"] = line.product_id.default_code
+        if not line.product_uom_id:
+            line_temp["umed"] = "7"
+        elif not line.product_uom_id.l10n_ar_afip_code:
+            raise UserError("Not afip code con producto UOM %s" % (line.product_uom_id.name))
+        else:
+            line_temp["umed"] = line.product_uom_id.l10n_ar_afip_code
+        line_temp["ds"] = line.name
+        line_temp["qty"] = line.quantity
+        line_temp["precio"] = line.price_unit
+        line_temp["bonif"] = None
+        tax_lines = line.tax_ids.filtered(lambda x: not x.l10n_ar_afipws_wsct_is_tourism_vat and x.tax_group_id.l10n_ar_vat_afip_code)
+        line_temp["iva_id"] = tax_lines.tax_group_id.l10n_ar_vat_afip_code
+        vat_taxes_amounts = tax_lines.compute_all(
+            line.price_unit,
+            move.currency_id,
+            line.quantity,
+            product=line.product_id,
+            partner=move.partner_id,
+        )
+        vat_amount = sum([x["amount"] for x in vat_taxes_amounts["taxes"]])
+        line_temp["imp_iva"] = "%.2f" % vat_amount
+        line_temp["importe"] = "%.2f" % (line.price_total + vat_amount)
+        line_temp["item_type_t"] = line.product_id.categ_id.item_type_t
+        line_temp["cod_tur"] = line.product_id.categ_id.cod_tur
+        lines.append(line_temp)
+    return lines
+
+
+@tagged('post_install', '-at_install')
+class TestWsctInvoiceLines(AccountTestInvoicingCommon):
+    """ El mapeo agrupado de las líneas de la factura T da lo mismo que el cálculo línea por línea. """
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        Group = cls.env['account.tax.group']
+        group_21 = Group.create({'name': 'IVA 21%', 'l10n_ar_vat_afip_code': '5'})
+        group_105 = Group.create({'name': 'IVA 10.5%', 'l10n_ar_vat_afip_code': '4'})
+        group_perception = Group.create({'name': 'Percepción'})
+
+        def tax(name, amount, group, **values):
+            return cls.env['account.tax'].create(dict({
+                'name': name, 'amount': amount, 'amount_type': 'percent', 'type_tax_use': 'sale', 'tax_group_id': group.id,
+            }, **values))
+
+        cls.iva_21 = tax('IVA 21%', 21, group_21)
+        cls.iva_21_included = tax('IVA 21% incluido', 21, group_21, price_include=True)
+        cls.iva_105 = tax('IVA 10.5%', 10.5, group_105)
+        cls.tourism = tax('IVA Reintegro Turismo', -21, group_21, l10n_ar_afipws_wsct_is_tourism_vat=True)
+        cls.perception = tax('Percepción 3%', 3, group_perception)
+
+        cls.product_a.uom_id.l10n_ar_afip_code = '7'
+        cls.product_a.categ_id.write({'item_type_t': '0', 'cod_tur': '2'})
+
+    def _invoice(self, currency):
+        lines = [
+            (self.product_a, 1000.0, 3, self.iva_21 | self.tourism),
+            (self.product_a, 1000.0, 3, self.iva_21 | self.tourism), # estadía repetida
+            (self.product_b, 1000.0, 3, self.iva_21 | self.tourism),
+            (self.product_a, 500.0, 1, self.iva_105),
+            (self.product_a, 333.33, 2, self.iva_21 | self.perception),
+            (self.product_a, 1210.0, 1, self.iva_21_included),
+            (self.product_a, 200.0, 1, self.env['account.tax']),
+            (self.product_a, 1000.0, 1, self.tourism), # sin IVA fuera del reintegro
+        ]
+        return self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner_a.id,
+            'invoice_date': '2025-06-01',
+            'currency_id': currency.id,
+            'invoice_line_ids': [
+                Command.create({'product_id': product.id, 'price_unit': price, 'quantity': quantity, 'tax_ids': [Command.set(taxes.ids)]})
+                for product, price, quantity, taxes in lines
+            ],
+        })
+
+    def test_same_as_per_line(self):
+        self.product_b.uom_id.l10n_ar_afip_code = '7'
+        for currency in (self.company_data['currency'], self.currency_data['currency']):
+            with self.subTest(currency=currency.name):
+                move = self._invoice(currency)
+                lines = move.wsct_invoice_map_info_lines()
+                self.assertEqual(lines, per_line_map_info_lines(move))
+                self.assertEqual([line['iva_id'] for line in lines], ['5', '5', '5', '4', '5', '5', False, False])
+                self.assertEqual(lines[0]['imp_iva'], '630.00')
+                self.assertEqual(lines[4]['imp_iva'], '140.00')
+                self.assertEqual(lines[7]['imp_iva'], '0.00')
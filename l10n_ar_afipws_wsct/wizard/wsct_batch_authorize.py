@@ -0,0 +1,81 @@
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class WsctBatchAuthorize(models.TransientModel):
+    _name = "wsct.batch.authorize"
+    _description = "Autorización WSCT de comprobantes seleccionados"
+
+    move_ids = fields.Many2many(
+        "account.move",
+        string="Comprobantes",
+        help="Comprobantes de turismo a validar y autorizar en AFIP.",
+    )
+    max_workers = fields.Integer(
+        string="Secuencias en Paralelo",
+        default=lambda self: int(self.env["ir.config_parameter"].sudo().get_param("l10n_ar_afipws_wsct.batch_authorize_workers", 4)),
+        help="Cantidad máxima de secuencias (punto de venta y tipo de comprobante) que se autorizan a la vez. "
+             "Dentro de cada secuencia los comprobantes se autorizan de a uno, en orden.",
+    )
+    state = fields.Selection(
+        [("draft", "Borrador"), ("done", "Terminado")],
+        default="draft",
+    )
+    line_ids = fields.One2many(
+        "wsct.batch.authorize.line",
+        "wizard_id",
+        string="Resultado",
+        readonly=True,
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self.env.context.get("active_model") == "account.move" and "move_ids" in fields_list:
+            res["move_ids"] = [(6, 0, self.env.context.get("active_ids", []))]
+        return res
+
+    def action_authorize(self):
+        self.ensure_one()
+        if not self.move_ids:
+            raise UserError(_("Seleccione al menos un comprobante."))
+        if self.max_workers < 1:
+            raise UserError(_("La cantidad de secuencias en paralelo debe ser al menos 1."))
+        results = self.move_ids._wsct_authorize_batch(max_workers=self.max_workers)
+        self.write({
+            "state": "done",
+            "line_ids": [(0, 0, {
+                "move_id": result["move_id"],
+                "name": result["name"],
+                "result": result["state"],
+                "cae": result.get("cae") or False,
+                "message": result["message"],
+            }) for result in results],
+        })
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "view_mode": "form",
+            "res_id": self.id,
+            "target": "new",
+        }
+
+
+class WsctBatchAuthorizeLine(models.TransientModel):
+    _name = "wsct.batch.authorize.line"
+    _description = "Resultado de la autorización WSCT de un comprobante"
+
+    wizard_id = fields.Many2one("wsct.batch.authorize", required=True, ondelete="cascade")
+    move_id = fields.Many2one("account.move", string="Comprobante", ondelete="cascade")
+    name = fields.Char(string="Número")
+    result = fields.Selection(
+        [
+            ("authorized", "Autorizado"),
+            ("posted", "Validado sin CAE"),
+            ("skipped", "Omitido"),
+            ("error", "Error"),
+        ],
+        string="Resultado",
+    )
+    cae = fields.Char(string="CAE")
+    message = fields.Text(string="Detalle")